@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+decoder-server.py 效能測試
+量測啟動時間（模組匯入）與每個請求的延遲，比較原生 ASGI 熱路徑與完整 FastAPI 版本
+
+不需要啟動伺服器，直接以 ASGI 介面呼叫應用。
+
+使用方法：
+python benchmark-decoder-server.py
+python benchmark-decoder-server.py --requests 20000
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+GOOGLE_URL = "https://www.google.com/url?rct=j&sa=t&url=https://news.cnyes.com/news/id/{i}&ct=ga&usg=AOvVaw0Tn6jC"
+
+STARTUP_SNIPPET = """
+import importlib, sys, time
+t = time.perf_counter()
+importlib.import_module('decoder-server')
+elapsed = time.perf_counter() - t
+print(elapsed, int('fastapi' in sys.modules), int('pydantic' in sys.modules))
+"""
+
+
+def measure_startup(runs: int):
+    """在獨立的 Python 行程中量測匯入 decoder-server 的時間"""
+    timings = []
+    loaded_fastapi = False
+    for _ in range(runs):
+        output = subprocess.check_output(
+            [sys.executable, "-c", STARTUP_SNIPPET], cwd=ROOT, text=True
+        ).split()
+        timings.append(float(output[0]) * 1000)
+        loaded_fastapi = loaded_fastapi or output[1] == "1" or output[2] == "1"
+    return timings, loaded_fastapi
+
+
+async def call_asgi(app, method: str, path: str, query: bytes = b"", body: bytes = b""):
+    """以最小的 ASGI scope 呼叫應用，回傳 (狀態碼, body)"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query,
+        "headers": [(b"host", b"localhost"), (b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 12345),
+        "server": ("127.0.0.1", 8000),
+    }
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    status = 0
+    chunks = []
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, b"".join(chunks)
+
+
+async def measure_requests(app, cases, requests: int):
+    """量測每種請求的延遲（微秒）"""
+    results = {}
+    for name, method, path, make_args in cases:
+        latencies = []
+        for i in range(requests):
+            query, body = make_args(i)
+            start = time.perf_counter()
+            status, _ = await call_asgi(app, method, path, query, body)
+            latencies.append((time.perf_counter() - start) * 1_000_000)
+            if status != 200:
+                raise RuntimeError(f"{name} 回傳 HTTP {status}")
+        latencies.sort()
+        results[name] = {
+            "mean_us": statistics.fmean(latencies),
+            "p50_us": latencies[len(latencies) // 2],
+            "p99_us": latencies[int(len(latencies) * 0.99) - 1],
+            "req_per_sec": 1_000_000 / statistics.fmean(latencies),
+        }
+    return results
+
+
+def build_cases(batch_size: int):
+    def get_args(i):
+        return b"url=" + GOOGLE_URL.format(i=i % 1000).replace("&", "%26").encode(), b""
+
+    def post_args(i):
+        return b"", json.dumps({"url": GOOGLE_URL.format(i=i % 1000)}).encode()
+
+    batch_body = json.dumps({"urls": [GOOGLE_URL.format(i=i) for i in range(batch_size)]}).encode()
+
+    def batch_args(i):
+        return b"", batch_body
+
+    return [
+        ("GET  /api/decode-google-url", "GET", "/api/decode-google-url", get_args),
+        ("POST /api/decode-google-url", "POST", "/api/decode-google-url", post_args),
+        (f"POST /batch ({batch_size} URLs)", "POST", "/api/decode-google-url/batch", batch_args),
+        ("GET  /health", "GET", "/health", lambda i: (b"", b"")),
+    ]
+
+
+def print_table(title: str, results):
+    print(f"\n{title}")
+    print("-" * 80)
+    print(f"{'請求':<34}{'平均(µs)':>10}{'p50(µs)':>10}{'p99(µs)':>10}{'req/s':>12}")
+    for name, r in results.items():
+        print(f"{name:<34}{r['mean_us']:>10.1f}{r['p50_us']:>10.1f}{r['p99_us']:>10.1f}{r['req_per_sec']:>12.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="decoder-server.py 效能測試")
+    parser.add_argument("--requests", type=int, default=5000, help="每種請求的次數（預設 5000）")
+    parser.add_argument("--batch-size", type=int, default=1000, help="批次請求的 URL 數量（預設 1000）")
+    parser.add_argument("--startup-runs", type=int, default=5, help="啟動時間量測次數（預設 5）")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("⚡ decoder-server.py 效能測試")
+    print("=" * 80)
+
+    timings, loaded_fastapi = measure_startup(args.startup_runs)
+    print(f"\n🚀 啟動時間（匯入模組，{args.startup_runs} 次）")
+    print(f"   中位數: {statistics.median(timings):.1f} ms，最快: {min(timings):.1f} ms")
+    print(f"   啟動時載入 FastAPI/pydantic: {'是 ⚠️' if loaded_fastapi else '否 ✅'}")
+
+    module = importlib.import_module("decoder-server")
+    cases = build_cases(args.batch_size)
+    batch_requests = max(1, args.requests // 100)
+
+    hot = asyncio.run(measure_requests(module.app, cases[:2] + cases[3:], args.requests))
+    hot.update(asyncio.run(measure_requests(module.app, cases[2:3], batch_requests)))
+    print_table("⚡ 原生 ASGI 熱路徑", hot)
+
+    start = time.perf_counter()
+    fallback = module.app.fallback
+    print(f"\n🐢 建立完整 FastAPI 應用耗時: {(time.perf_counter() - start) * 1000:.1f} ms")
+    full = asyncio.run(measure_requests(fallback, cases[:2] + cases[3:], args.requests))
+    full.update(asyncio.run(measure_requests(fallback, cases[2:3], batch_requests)))
+    print_table("🐢 完整 FastAPI 應用", full)
+
+    print("\n📈 加速倍數（FastAPI 平均延遲 / 熱路徑平均延遲）")
+    for name in hot:
+        print(f"   {name:<34}{full[name]['mean_us'] / hot[name]['mean_us']:>8.1f}x")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
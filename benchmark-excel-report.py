@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+generate-excel-report.py 效能測試
+比較一般模式與串流模式（--streaming）的 rows/sec 與記憶體峰值
+
+每個測試在獨立的 Python 行程中執行，記憶體峰值取該行程的 ru_maxrss。
+
+使用方法：
+python benchmark-excel-report.py                 # 10k 與 100k 筆
+python benchmark-excel-report.py --rows 10000    # 指定筆數
+python benchmark-excel-report.py --skip-legacy-above 20000
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+CHILD_SNIPPET = """
+import contextlib, importlib, io, resource, sys, time
+sys.path.insert(0, {root!r})
+module = importlib.import_module('generate-excel-report')
+func = getattr(module, {func!r})
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    func({input!r}, {output!r})
+elapsed = time.perf_counter() - start
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+SAMPLE_TEXT = (
+    "台積電今日宣布擴大先進製程投資，預計在亞利桑那州興建第三座晶圓廠。"
+    "TSMC announced an expansion of its advanced process investment today. "
+) * 20
+
+
+def make_result(i: int) -> dict:
+    """產生一筆與 n8n-batch-parser.py 輸出格式相同的假資料"""
+    success = random.random() > 0.1
+    result = {
+        "url": f"https://news.example.com/article/{i}",
+        "id": f"{i:06d}",
+        "success": success,
+        "elapsed_time": random.uniform(0.5, 30),
+        "status_code": 200 if success else 500,
+    }
+    if success:
+        method = random.choice(["static", "playwright"])
+        text = SAMPLE_TEXT[: random.randint(200, len(SAMPLE_TEXT))]
+        result.update({
+            "parsed_data": {
+                "title": f"測試文章 {i}",
+                "author": "記者",
+                "date_published": "2025-11-15",
+                "text_content": text,
+                "word_count": len(text.split()),
+                "rendering_method": method,
+            },
+            "routing_decision": "static_success" if method == "static" else "fallback_to_dynamic",
+            "rendering_method": method,
+            "attempts": 1,
+        })
+    else:
+        result["error"] = "HTTP 403: Forbidden"
+    return result
+
+
+def write_inputs(rows: int, directory: str):
+    """寫出同樣內容的 JSON 陣列（一般模式用）與 JSONL（串流模式用）"""
+    json_path = os.path.join(directory, f"results-{rows}.json")
+    jsonl_path = os.path.join(directory, f"results-{rows}.jsonl")
+    random.seed(rows)
+    with open(json_path, "w", encoding="utf-8") as fa, open(jsonl_path, "w", encoding="utf-8") as fl:
+        fa.write("[")
+        for i in range(rows):
+            line = json.dumps(make_result(i), ensure_ascii=False)
+            fa.write(("," if i else "") + line)
+            fl.write(line + "\n")
+        fa.write("]")
+    return json_path, jsonl_path
+
+
+def run_child(func: str, input_path: str, output_path: str):
+    code = CHILD_SNIPPET.format(root=ROOT, func=func, input=input_path, output=output_path)
+    elapsed, maxrss = subprocess.check_output([sys.executable, "-c", code], text=True).split()
+    # Linux 的 ru_maxrss 單位為 KB，macOS 為 bytes
+    peak_mb = int(maxrss) / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return float(elapsed), peak_mb
+
+
+def main():
+    parser = argparse.ArgumentParser(description="generate-excel-report.py 效能測試")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000], help="測試筆數（預設 10000 100000）")
+    parser.add_argument("--skip-legacy-above", type=int, default=None, help="超過此筆數時不跑一般模式")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("📊 generate-excel-report.py 效能測試")
+    print("=" * 80)
+    print(f"{'筆數':>8}  {'模式':<8}{'耗時(秒)':>10}{'rows/sec':>12}{'記憶體峰值(MB)':>16}")
+    print("-" * 80)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            json_path, jsonl_path = write_inputs(rows, tmp)
+            modes = [("串流", "generate_excel_report_streaming", jsonl_path)]
+            if args.skip_legacy_above is None or rows <= args.skip_legacy_above:
+                modes.insert(0, ("一般", "generate_excel_report", json_path))
+
+            for label, func, input_path in modes:
+                output_path = os.path.join(tmp, f"report-{rows}-{func}.xlsx")
+                elapsed, peak_mb = run_child(func, input_path, output_path)
+                print(f"{rows:>8}  {label:<8}{elapsed:>10.2f}{rows / elapsed:>12.0f}{peak_mb:>16.1f}")
+
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+JSON 序列化效能測試
+比較 /api/parse 回應在不同大小下的序列化時間：
+
+- FastAPI 預設：jsonable_encoder + JSONResponse（標準庫 json）
+- 標準庫 json.dumps（不經過 jsonable_encoder）
+- FastJSONResponse（parser_core.serialization，有 orjson 時使用 orjson）
+
+不需要啟動伺服器，也不需要網路。
+
+使用方法：
+python benchmark-json-serialization.py
+python benchmark-json-serialization.py --sizes 10,50,100,200 --runs 500
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from parser_core import serialization
+from parser_core.responses import FastJSONResponse
+
+PARAGRAPH = (
+    "台積電今日公布第三季財報，營收較去年同期成長 36%，先進製程占比持續提升。"
+    "The company said demand for AI accelerators remains strong, and capacity for "
+    "advanced packaging will double next year. 分析師預估明年資本支出將維持高檔。"
+)
+
+
+def build_payload(size_kb: int):
+    """產生與 /api/parse 回應相同結構、約 size_kb KB 的資料（正文在 content 與 text_content 各一份）"""
+    paragraph_bytes = len(PARAGRAPH.encode("utf-8"))
+    count = max(1, size_kb * 1024 // 2 // paragraph_bytes)
+    paragraphs = [f"{PARAGRAPH} ({i})" for i in range(count)]
+    text = "\n".join(paragraphs)
+    xml = "<doc><main>" + "".join(f"<p>{p}</p>" for p in paragraphs) + "</main></doc>"
+    return {
+        "success": True,
+        "data": {
+            "title": "台積電第三季營收創新高",
+            "author": "記者 王小明",
+            "date_published": "2025-10-16",
+            "url": "https://example.com/news/123456",
+            "domain": "Example News",
+            "description": "台積電今日公布第三季財報",
+            "categories": ["科技", "半導體"],
+            "tags": ["TSMC", "AI", "財報"],
+            "content": xml,
+            "text_content": text,
+            "excerpt": text[:200] + "...",
+            "word_count": len(text.split()),
+            "language": "zh",
+        },
+        "attempt": 1,
+        "retries": 0,
+        "routing_decision": "static_success",
+    }
+
+
+def fastapi_default(payload) -> bytes:
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def stdlib_dumps(payload) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_response(payload) -> bytes:
+    return FastJSONResponse(payload).body
+
+
+SERIALIZERS = [
+    ("FastAPI 預設（jsonable_encoder）", fastapi_default),
+    ("標準庫 json.dumps", stdlib_dumps),
+    ("FastJSONResponse", fast_response),
+]
+
+
+def measure(func, payload, runs: int):
+    """回傳每次序列化的時間（微秒）列表"""
+    func(payload)  # 暖身
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(payload)
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON 序列化效能測試")
+    parser.add_argument("--sizes", default="5,50,100,200", help="回應大小（KB，逗號分隔，預設 5,50,100,200）")
+    parser.add_argument("--runs", type=int, default=300, help="每種大小的序列化次數（預設 300）")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    print("=" * 80)
+    print("⚡ JSON 序列化效能測試")
+    print(f"   序列化器: {'orjson' if serialization.orjson is not None else '標準庫 json（未安裝 orjson）'}")
+    print("=" * 80)
+
+    for size_kb in sizes:
+        payload = build_payload(size_kb)
+
+        # 確認三種輸出解析後內容相同
+        reference = json.loads(fastapi_default(payload))
+        for name, func in SERIALIZERS[1:]:
+            if json.loads(func(payload)) != reference:
+                raise RuntimeError(f"{name} 輸出與 FastAPI 預設不一致")
+
+        actual_kb = len(stdlib_dumps(payload)) / 1024
+        print(f"\n📦 回應大小 {actual_kb:.0f} KB（{args.runs} 次）")
+        print("-" * 80)
+        print(f"{'序列化方式':<36}{'平均(µs)':>10}{'p50(µs)':>10}{'p99(µs)':>10}{'MB/s':>10}")
+
+        baseline = None
+        for name, func in SERIALIZERS:
+            timings = sorted(measure(func, payload, args.runs))
+            mean = statistics.fmean(timings)
+            baseline = baseline or mean
+            throughput = actual_kb / 1024 / (mean / 1_000_000)
+            print(f"{name:<36}{mean:>10.1f}{timings[len(timings) // 2]:>10.1f}"
+                  f"{timings[int(len(timings) * 0.99) - 1]:>10.1f}{throughput:>10.0f}"
+                  f"   {baseline / mean:>5.1f}x")
+
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
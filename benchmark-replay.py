@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+離線重播效能 / 回歸測試
+以錄製的封存（parser_core.replay）重播完整的 /api/parse 流程（路由、重試、Playwright、提取、序列化），
+不需要網路，時間與結果可重現：
+
+1. 錄製（需要網路）：對每個 URL 呼叫一次 /api/parse，錄下所有 httpx / Playwright 回應，
+   並把每篇的結果摘要存成基準（ARCHIVE/baseline.json）
+2. 重播（不需要網路）：以同樣的 URL 重播多輪，量測每篇耗時，並與基準比對
+   （success、routing_decision、標題、字數、正文 hash），任何不一致以結束碼 1 結束
+
+伺服器在本程序內以 ASGI 呼叫（不需要啟動 uvicorn）。
+
+使用方法：
+python benchmark-replay.py record --urls test-120-links.json --archive replay-archive
+python benchmark-replay.py replay --urls test-120-links.json --archive replay-archive --runs 3
+python benchmark-replay.py replay --archive replay-archive --latency 100-300 --seed 1
+python benchmark-replay.py replay --archive replay-archive --latency recorded
+"""
+
+import argparse
+import asyncio
+import hashlib
+import importlib.util
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+import httpx
+
+from parser_core import replay
+from parser_core.jsonstream import iter_json_records
+
+
+def load_app():
+    """載入 parser-server.py 的 FastAPI app（檔名含 '-'，以檔案路徑載入）"""
+    spec = importlib.util.spec_from_file_location("parser_server", os.path.join(ROOT, "parser-server.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_urls(path: str, limit: int) -> List[str]:
+    urls = [record["url"] for record in iter_json_records(path) if record.get("url")]
+    return urls[:limit] if limit else urls
+
+
+def summarize(status: int, body: Dict[str, Any]) -> Dict[str, Any]:
+    """結果摘要（比對用，只取內容相關欄位，不含耗時與重試次數）"""
+    data = body.get("data") or {}
+    text = data.get("text_content") or ""
+    return {
+        "status": status,
+        "success": body.get("success"),
+        "routing_decision": body.get("routing_decision"),
+        "title": data.get("title"),
+        "word_count": data.get("word_count"),
+        "text_sha256": hashlib.sha256(text.encode("utf-8")).hexdigest() if text else None,
+        "detail": body.get("detail") if status != 200 else None,
+    }
+
+
+async def run_once(client: httpx.AsyncClient, urls: List[str], concurrency: int):
+    """對每個 URL 呼叫一次 /api/parse，回傳 {url: (耗時秒數, 摘要)}"""
+    semaphore = asyncio.Semaphore(concurrency)
+    results = {}
+
+    async def one(url: str):
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post("/api/parse", json={"url": url})
+            elapsed = time.perf_counter() - started
+            results[url] = (elapsed, summarize(response.status_code, response.json()))
+
+    await asyncio.gather(*(one(url) for url in urls))
+    return results
+
+
+def percentile(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+async def record(args, urls: List[str]):
+    archive = replay.ReplayArchive(args.archive, "record")
+    replay.set_archive(archive)
+    server = load_app()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app),
+                                 base_url="http://replay", timeout=None) as client:
+        started = time.perf_counter()
+        results = await run_once(client, urls, args.concurrency)
+        elapsed = time.perf_counter() - started
+    await server.SERVER_STATE.close()
+
+    baseline = {url: summary for url, (_, summary) in results.items()}
+    with open(os.path.join(args.archive, "baseline.json"), "w", encoding="utf-8") as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=2)
+
+    success = sum(1 for summary in baseline.values() if summary["success"])
+    print(f"\n📼 錄製完成：{len(urls)} 個 URL，成功 {success}，共 {elapsed:.1f} 秒")
+    print(f"   封存: {archive.stats()}")
+
+
+async def replay_runs(args, urls: List[str]):
+    baseline_path = os.path.join(args.archive, "baseline.json")
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    urls = urls or list(baseline)
+
+    archive = replay.ReplayArchive(args.archive, "replay", latency=args.latency, seed=args.seed)
+    replay.set_archive(archive)
+    server = load_app()
+
+    print("=" * 80)
+    print(f"▶️  重播 {len(urls)} 個 URL × {args.runs} 輪（延遲 {args.latency}，併發 {args.concurrency}）")
+    print("=" * 80)
+
+    mismatches = []
+    totals = []
+    per_url: Dict[str, List[float]] = {url: [] for url in urls}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app),
+                                 base_url="http://replay", timeout=None) as client:
+        for run in range(1, args.runs + 1):
+            archive.reset()
+            started = time.perf_counter()
+            results = await run_once(client, urls, args.concurrency)
+            total = time.perf_counter() - started
+            totals.append(total)
+
+            for url, (elapsed, summary) in results.items():
+                per_url[url].append(elapsed)
+                expected = baseline.get(url)
+                if expected is not None and summary != expected:
+                    mismatches.append((run, url, expected, summary))
+
+            success = sum(1 for _, summary in results.values() if summary["success"])
+            print(f"第 {run} 輪: {total:.2f} 秒，成功 {success}/{len(urls)}，"
+                  f"命中 {archive.hits}，未錄製 {len(archive.misses)}")
+    await server.SERVER_STATE.close()
+
+    latencies = [min(values) * 1000 for values in per_url.values() if values]
+    print("-" * 80)
+    print(f"每輪總時間: 中位數 {statistics.median(totals):.2f} 秒，"
+          f"最快 {min(totals):.2f} 秒，最慢 {max(totals):.2f} 秒")
+    print(f"每篇耗時（各 URL 最快一輪）: p50 {percentile(latencies, 0.5):.1f} ms，"
+          f"p95 {percentile(latencies, 0.95):.1f} ms，最慢 {max(latencies):.1f} ms")
+
+    slowest = sorted(per_url.items(), key=lambda item: min(item[1]), reverse=True)[:args.top]
+    for url, values in slowest:
+        print(f"   {min(values) * 1000:>8.1f} ms  {url[:90]}")
+
+    print("=" * 80)
+    if mismatches:
+        for run, url, expected, summary in mismatches[:20]:
+            diff = {key: (expected.get(key), summary.get(key)) for key in summary if summary.get(key) != expected.get(key)}
+            print(f"❌ 第 {run} 輪 {url}: {diff}")
+        print(f"❌ {len(mismatches)} 筆結果與基準不一致")
+        sys.exit(1)
+    print("✅ 所有結果與錄製時的基準一致")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="離線重播效能 / 回歸測試")
+    parser.add_argument("mode", choices=["record", "replay"], help="record：錄製（需要網路）；replay：離線重播")
+    parser.add_argument("--urls", default=None, help="URL 列表（JSON 陣列或 JSONL，每筆含 url；重播時預設使用基準中的 URL）")
+    parser.add_argument("--archive", default="replay-archive", help="封存目錄（預設 replay-archive）")
+    parser.add_argument("--limit", type=int, default=0, help="只使用前 N 個 URL")
+    parser.add_argument("--concurrency", type=int, default=4, help="同時解析的數量（預設 4）")
+    parser.add_argument("--runs", type=int, default=3, help="重播輪數（預設 3）")
+    parser.add_argument("--latency", default="0", help="重播延遲：毫秒、範圍（100-300）或 recorded（預設 0）")
+    parser.add_argument("--seed", type=int, default=0, help="範圍延遲的亂數種子（預設 0）")
+    parser.add_argument("--top", type=int, default=5, help="列出最慢的前 N 個 URL（預設 5）")
+    args = parser.parse_args()
+
+    if args.mode == "record" and not args.urls:
+        parser.error("record 需要 --urls")
+    urls = load_urls(args.urls, args.limit) if args.urls else []
+
+    if args.mode == "record":
+        asyncio.run(record(args, urls))
+    else:
+        asyncio.run(replay_runs(args, urls))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+伺服器冷啟動（模組匯入）效能測試
+以 python -X importtime 量測匯入 parser-server / decoder-server 的時間，並檢查啟動預算：
+
+- 匯入時間（中位數）不超過 --budget-ms
+- 啟動時不載入 trafilatura / playwright / lxml（第一次需要時才匯入）
+
+任一項不符合時以結束碼 1 結束，可直接放在 CI 或部署前檢查。
+
+不需要啟動伺服器，也不需要網路。
+
+使用方法：
+python benchmark-startup.py
+python benchmark-startup.py --runs 10 --top 15
+python benchmark-startup.py --module decoder-server --budget-ms 50
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# 啟動時不應該載入的重量級套件（第一次解析時才匯入）
+DEFERRED_PACKAGES = ["trafilatura", "playwright", "lxml"]
+
+# 各模組的預設啟動預算（毫秒）
+DEFAULT_BUDGETS = {
+    "parser-server": 500,
+    "decoder-server": 50,
+}
+
+# 使用 __import__（C 實作）才會在 -X importtime 輸出中包含目標模組本身
+IMPORT_SNIPPET = "import sys; __import__(sys.argv[1])"
+
+
+def run_importtime(module: str) -> Dict[str, Tuple[int, int, int]]:
+    """
+    在獨立的 Python 行程中匯入模組並解析 -X importtime 的輸出
+
+    Returns:
+        {模組名稱: (self 微秒, cumulative 微秒, 深度)}，依輸出順序（子模組在父模組之前）
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_SNIPPET, module],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        timings[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return timings
+
+
+def precompile():
+    """先跑一次讓 .pyc 存在（PYTHONDONTWRITEBYTECODE=1 時由 compileall 寫入），只量測匯入本身"""
+    for target in (["-l", ROOT], [os.path.join(ROOT, "parser_core")]):
+        subprocess.run([sys.executable, "-m", "compileall", "-q", *target],
+                       cwd=ROOT, check=False, capture_output=True)
+
+
+def measure(module: str, runs: int) -> Tuple[List[float], Dict[str, Tuple[int, int, int]]]:
+    """回傳每次的匯入時間（毫秒）與最後一次的完整明細"""
+    totals = []
+    timings = {}
+    for _ in range(runs):
+        timings = run_importtime(module)
+        totals.append(timings[module][1] / 1000)
+    return totals, timings
+
+
+def print_top(timings: Dict[str, Tuple[int, int, int]], module: str, top: int):
+    """列出目標模組直接匯入、累計時間最長的套件（不含直譯器啟動時的 site 等）"""
+    children = []
+    for name, (_, cumulative, depth) in timings.items():
+        if name == module:
+            break
+        if depth == 0:
+            # 目標模組之前的頂層項目屬於直譯器啟動，重新開始收集
+            children = []
+        elif depth == 1:
+            children.append((name, cumulative))
+    children.sort(key=lambda item: item[1], reverse=True)
+    print(f"   {'套件':<40}{'累計(ms)':>10}")
+    for name, cumulative in children[:top]:
+        print(f"   {name:<40}{cumulative / 1000:>10.1f}")
+
+
+def measure_deferred(runs: int):
+    """量測延遲匯入的套件本身的成本（第一次解析 / 啟動預熱時才付出）"""
+    print("\n⏳ 延遲到第一次使用時才匯入的套件")
+    for package in ("trafilatura", "playwright.async_api"):
+        try:
+            totals, _ = measure(package, runs)
+        except subprocess.CalledProcessError:
+            print(f"   {package:<40}{'未安裝':>10}")
+            continue
+        print(f"   {package:<40}{statistics.median(totals):>10.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="伺服器冷啟動（模組匯入）效能測試")
+    parser.add_argument("--module", action="append", default=None,
+                        help="要量測的模組（可重複，預設 parser-server 與 decoder-server）")
+    parser.add_argument("--runs", type=int, default=5, help="每個模組的量測次數（預設 5）")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="啟動預算（毫秒，預設 parser-server 500、decoder-server 50）")
+    parser.add_argument("--top", type=int, default=10, help="列出累計時間最長的前 N 個套件（預設 10）")
+    args = parser.parse_args()
+    modules = args.module or list(DEFAULT_BUDGETS)
+
+    print("=" * 80)
+    print("🚀 冷啟動效能測試（python -X importtime）")
+    print("=" * 80)
+
+    precompile()
+    failures = []
+
+    for module in modules:
+        budget = args.budget_ms if args.budget_ms is not None else DEFAULT_BUDGETS.get(module, 500)
+        totals, timings = measure(module, args.runs)
+        median = statistics.median(totals)
+        loaded = [package for package in DEFERRED_PACKAGES if package in timings]
+
+        print(f"\n📦 {module}（{args.runs} 次）")
+        print(f"   匯入時間中位數: {median:.1f} ms，最快: {min(totals):.1f} ms，預算: {budget:.0f} ms "
+              f"{'✅' if median <= budget else '❌'}")
+        print(f"   啟動時載入 {'/'.join(DEFERRED_PACKAGES)}: "
+              f"{'是 ❌ ' + ', '.join(loaded) if loaded else '否 ✅'}")
+        print_top(timings, module, args.top)
+
+        if median > budget:
+            failures.append(f"{module} 匯入 {median:.1f} ms 超過預算 {budget:.0f} ms")
+        if loaded:
+            failures.append(f"{module} 啟動時載入了 {', '.join(loaded)}")
+
+    measure_deferred(args.runs)
+
+    print("\n" + "=" * 80)
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ 所有模組都在啟動預算內")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,12 @@ Google URL Decoder API - 輕量級版本
 - 輕量級、快速、低資源消耗
 - 專門給 n8n workflow 使用
 
+架構：
+- 熱路徑（/api/decode-google-url、/api/decode-google-url/batch、/health）
+  由原生 ASGI handler 直接處理，不經過 FastAPI 路由、pydantic 驗證
+- 其他請求（首頁、/docs、CORS 預檢、格式錯誤的請求）才延遲載入完整的
+  FastAPI 應用，因此啟動時不需要匯入 FastAPI/pydantic
+
 安裝套件：
 pip install fastapi uvicorn
 
@@ -14,240 +20,429 @@ pip install fastapi uvicorn
 python decoder-server.py
 或
 uvicorn decoder-server:app --reload --port 3000
+
+效能測試：
+python benchmark-decoder-server.py
 """
 
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional
-from datetime import datetime
-import uvicorn
 import os
-from urllib.parse import urlparse, parse_qs, unquote
+import re
+from datetime import datetime
+from urllib.parse import unquote_plus
 
-# 建立 FastAPI 應用
-app = FastAPI(
-    title="Google URL Decoder API (輕量版)",
-    description="專門用於解碼 Google Alert/RSS 重定向 URL，輕量級部署到 Railway",
-    version="2.0.0"
+from parser_core.google_url import (
+    MAX_BATCH_SIZE,
+    build_decode_result,
+    decode_cache_info,
+    decode_google_urls,
 )
+from parser_core.serialization import dumps, loads
 
-# CORS 設定
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
+# ==================== 完整 FastAPI 應用（延遲載入） ====================
 
-# ==================== 資料模型 ====================
+def create_app():
+    """
+    建立完整的 FastAPI 應用
 
-class DecodeRequest(BaseModel):
-    """解碼請求"""
-    url: str
+    只有熱路徑處理不了的請求才會用到，第一次需要時才匯入 FastAPI/pydantic。
+    """
+    from fastapi import FastAPI, HTTPException
+    from fastapi.middleware.cors import CORSMiddleware
+    from pydantic import BaseModel, validator
+    from typing import List
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "url": "https://www.google.com/url?url=https://example.com/article&..."
+    app = FastAPI(
+        title="Google URL Decoder API (輕量版)",
+        description="專門用於解碼 Google Alert/RSS 重定向 URL，輕量級部署到 Railway",
+        version="2.0.0"
+    )
+
+    # CORS 設定
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # ==================== 資料模型 ====================
+
+    class DecodeRequest(BaseModel):
+        """解碼請求"""
+        url: str
+
+        class Config:
+            json_schema_extra = {
+                "example": {
+                    "url": "https://www.google.com/url?url=https://example.com/article&..."
+                }
             }
+
+    class DecodeBatchRequest(BaseModel):
+        """批次解碼請求"""
+        urls: List[str]
+
+        @validator('urls')
+        def validate_urls(cls, v):
+            if len(v) > MAX_BATCH_SIZE:
+                raise ValueError(f'單次最多 {MAX_BATCH_SIZE} 個 URL')
+            return v
+
+        class Config:
+            json_schema_extra = {
+                "example": {
+                    "urls": [
+                        "https://www.google.com/url?url=https://example.com/article&...",
+                        "https://news.google.com/rss/articles/CBMi..."
+                    ]
+                }
+            }
+
+    # ==================== API 端點 ====================
+
+    @app.get("/")
+    async def root():
+        """API 首頁"""
+        return {
+            "service": "Google URL Decoder API",
+            "version": "2.0.0",
+            "description": "輕量級 Google URL 解碼服務（專門部署到 Railway）",
+            "features": [
+                "🔗 解碼 Google Alert/RSS 重定向 URL",
+                "📰 離線解碼 news.google.com/rss/articles 文章 ID",
+                "📦 批次解碼端點（單次數千個 URL）",
+                "⚡ 輕量級、快速、低資源消耗",
+                "🎯 專門給 n8n workflow 使用",
+                "❌ 不包含重量級的網頁解析功能"
+            ],
+            "endpoints": {
+                "health": {
+                    "method": "GET",
+                    "path": "/health",
+                    "description": "健康檢查"
+                },
+                "decode_post": {
+                    "method": "POST",
+                    "path": "/api/decode-google-url",
+                    "body": {"url": "Google 重定向 URL"},
+                    "description": "解碼 Google URL (POST)"
+                },
+                "decode_get": {
+                    "method": "GET",
+                    "path": "/api/decode-google-url?url=YOUR_URL",
+                    "description": "解碼 Google URL (GET)"
+                },
+                "decode_batch": {
+                    "method": "POST",
+                    "path": "/api/decode-google-url/batch",
+                    "body": {"urls": ["Google 重定向 URL", "..."]},
+                    "description": f"批次解碼 Google URL（單次最多 {MAX_BATCH_SIZE} 個）"
+                }
+            },
+            "examples": [
+                'POST /api/decode-google-url with body: {"url": "https://www.google.com/url?url=https://example.com/..."}',
+                'GET /api/decode-google-url?url=https://www.google.com/url?url=https://example.com/...'
+            ],
+            "note": "此版本不包含 /api/parse 功能，如需解析文章內容請使用本地 API"
         }
 
+    @app.get("/health")
+    async def health_check():
+        """健康檢查端點"""
+        return _health_payload()
+
+    @app.post("/api/decode-google-url")
+    async def decode_url_post(request: DecodeRequest):
+        """
+        POST 方法：解碼 Google 重定向 URL
+
+        Args:
+            request: 包含 url 的請求
+
+        Returns:
+            解碼結果
+
+        Example:
+            POST /api/decode-google-url
+            {
+                "url": "https://www.google.com/url?url=https://example.com/article&..."
+            }
+
+            Response:
+            {
+                "success": true,
+                "original_url": "https://www.google.com/url?url=...",
+                "decoded_url": "https://example.com/article",
+                "is_google_url": true,
+                "changed": true
+            }
+        """
+        try:
+            return _decode_payload(request.url)
+
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"解碼 URL 時發生錯誤: {str(e)}"
+            )
+
+    @app.get("/api/decode-google-url")
+    async def decode_url_get(url: str):
+        """
+        GET 方法：解碼 Google 重定向 URL
+
+        Args:
+            url: Google 重定向 URL（查詢參數）
+
+        Returns:
+            解碼結果
+
+        Example:
+            GET /api/decode-google-url?url=https://www.google.com/url?url=https://example.com/...
+        """
+        if not url:
+            raise HTTPException(
+                status_code=400,
+                detail="請提供 URL 參數"
+            )
+
+        try:
+            return _decode_payload(url)
+
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"解碼 URL 時發生錯誤: {str(e)}"
+            )
+
+    @app.post("/api/decode-google-url/batch")
+    async def decode_url_batch(request: DecodeBatchRequest):
+        """
+        POST 方法：批次解碼 Google 重定向 URL
+
+        單次最多處理 GOOGLE_URL_MAX_BATCH（預設 10000）個 URL，
+        同一批次內重複的 URL 只解碼一次，結果依輸入順序回傳。
+
+        Args:
+            request: 包含 urls 列表的請求
+
+        Returns:
+            批次解碼結果
+
+        Example:
+            POST /api/decode-google-url/batch
+            {
+                "urls": [
+                    "https://www.google.com/url?url=https://example.com/article&...",
+                    "https://news.google.com/rss/articles/CBMi..."
+                ]
+            }
+
+            Response:
+            {
+                "success": true,
+                "count": 2,
+                "changed_count": 2,
+                "results": [{"original_url": ..., "decoded_url": ..., ...}, ...]
+            }
+        """
+        try:
+            return _batch_payload(request.urls)
+
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"批次解碼 URL 時發生錯誤: {str(e)}"
+            )
+
+    return app
+
+
+# ==================== 熱路徑（原生 ASGI） ====================
+
+HOT_DECODE_PATH = "/api/decode-google-url"
+HOT_BATCH_PATH = "/api/decode-google-url/batch"
+HOT_HEALTH_PATH = "/health"
+
+# 預先編譯的查詢參數擷取器：取最後一個 url=（與 FastAPI 的行為一致）
+_URL_PARAM_RE = re.compile(rb'(?:^|&)url=([^&]*)')
+
+_JSON_HEADER = (b"content-type", b"application/json")
 
-# ==================== 核心功能 ====================
 
-def decode_google_url(google_url: str) -> str:
+def extract_url_param(query_string: bytes):
     """
-    從 Google 重定向 URL 中提取真實的目標 URL
-    
-    支援的格式：
-    - Google News/Alerts: https://www.google.com/url?url=...
-    - Google RSS: https://news.google.com/rss/articles/...
-    
-    Args:
-        google_url: Google 重定向 URL
-        
+    從原始 query string 取出 url 參數
+
     Returns:
-        真實的目標 URL，如果解析失敗則返回原 URL
-        
-    Examples:
-        >>> decode_google_url('https://www.google.com/url?url=https://example.com&...')
-        'https://example.com'
+        解碼後的 url；沒有 url 參數時回傳 None
     """
-    try:
-        # 解析 URL
-        parsed = urlparse(google_url)
-        
-        # 檢查是否為 Google URL
-        if 'google.com' not in parsed.netloc:
-            # 不是 Google URL，直接返回原 URL
-            return google_url
-        
-        # 解析查詢參數
-        query_params = parse_qs(parsed.query)
-        
-        # 嘗試從不同的參數中提取 URL
-        # 常見參數：url, q, u
-        for param in ['url', 'q', 'u']:
-            if param in query_params and query_params[param]:
-                decoded_url = unquote(query_params[param][0])
-                # 確保是完整的 URL
-                if decoded_url.startswith(('http://', 'https://')):
-                    return decoded_url
-        
-        # 如果沒有找到，返回原 URL
-        return google_url
-        
-    except Exception as e:
-        # 解析失敗，返回原 URL
-        print(f"⚠️  解析失敗: {str(e)}")
-        return google_url
-
-
-# ==================== API 端點 ====================
-
-@app.get("/")
-async def root():
-    """API 首頁"""
-    return {
-        "service": "Google URL Decoder API",
-        "version": "2.0.0",
-        "description": "輕量級 Google URL 解碼服務（專門部署到 Railway）",
-        "features": [
-            "🔗 解碼 Google Alert/RSS 重定向 URL",
-            "⚡ 輕量級、快速、低資源消耗",
-            "🎯 專門給 n8n workflow 使用",
-            "❌ 不包含重量級的網頁解析功能"
-        ],
-        "endpoints": {
-            "health": {
-                "method": "GET",
-                "path": "/health",
-                "description": "健康檢查"
-            },
-            "decode_post": {
-                "method": "POST",
-                "path": "/api/decode-google-url",
-                "body": {"url": "Google 重定向 URL"},
-                "description": "解碼 Google URL (POST)"
-            },
-            "decode_get": {
-                "method": "GET",
-                "path": "/api/decode-google-url?url=YOUR_URL",
-                "description": "解碼 Google URL (GET)"
-            }
-        },
-        "examples": [
-            'POST /api/decode-google-url with body: {"url": "https://www.google.com/url?url=https://example.com/..."}',
-            'GET /api/decode-google-url?url=https://www.google.com/url?url=https://example.com/...'
-        ],
-        "note": "此版本不包含 /api/parse 功能，如需解析文章內容請使用本地 API"
-    }
+    if not query_string:
+        return None
+    matches = _URL_PARAM_RE.findall(query_string)
+    if not matches:
+        return None
+    return unquote_plus(matches[-1].decode("latin-1"), encoding="utf-8")
 
 
-@app.get("/health")
-async def health_check():
-    """健康檢查端點"""
+def _health_payload():
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
         "service": "decoder-api",
         "version": "2.0.0",
-        "type": "lightweight"
+        "type": "lightweight",
+        "decode_cache": decode_cache_info()
     }
 
 
-@app.post("/api/decode-google-url")
-async def decode_url_post(request: DecodeRequest):
-    """
-    POST 方法：解碼 Google 重定向 URL
-    
-    Args:
-        request: 包含 url 的請求
-        
-    Returns:
-        解碼結果
-        
-    Example:
-        POST /api/decode-google-url
-        {
-            "url": "https://www.google.com/url?url=https://example.com/article&..."
-        }
-        
-        Response:
-        {
-            "success": true,
-            "original_url": "https://www.google.com/url?url=...",
-            "decoded_url": "https://example.com/article",
-            "is_google_url": true,
-            "changed": true
-        }
-    """
-    try:
-        original_url = request.url
-        decoded_url = decode_google_url(original_url)
-        
-        # 檢查是否為 Google URL
-        is_google_url = 'google.com' in original_url
-        
-        return {
-            "success": True,
-            "original_url": original_url,
-            "decoded_url": decoded_url,
-            "is_google_url": is_google_url,
-            "changed": original_url != decoded_url,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"解碼 URL 時發生錯誤: {str(e)}"
-        )
+def _decode_payload(url: str):
+    return {
+        "success": True,
+        **build_decode_result(url),
+        "timestamp": datetime.now().isoformat()
+    }
 
 
-@app.get("/api/decode-google-url")
-async def decode_url_get(url: str):
+def _batch_payload(urls):
+    results = decode_google_urls(urls)
+    return {
+        "success": True,
+        "count": len(results),
+        "changed_count": sum(1 for r in results if r["changed"]),
+        "results": results,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+class DecoderApp:
     """
-    GET 方法：解碼 Google 重定向 URL
-    
-    Args:
-        url: Google 重定向 URL（查詢參數）
-        
-    Returns:
-        解碼結果
-        
-    Example:
-        GET /api/decode-google-url?url=https://www.google.com/url?url=https://example.com/...
+    原生 ASGI 應用
+
+    熱路徑直接在這裡處理；其餘請求（或格式不符、需要回傳驗證錯誤的請求）
+    交給延遲建立的 FastAPI 應用，確保回應格式與完整版一致。
     """
-    if not url:
-        raise HTTPException(
-            status_code=400,
-            detail="請提供 URL 參數"
-        )
-    
-    try:
-        decoded_url = decode_google_url(url)
-        
-        # 檢查是否為 Google URL
-        is_google_url = 'google.com' in url
-        
-        return {
-            "success": True,
-            "original_url": url,
-            "decoded_url": decoded_url,
-            "is_google_url": is_google_url,
-            "changed": url != decoded_url,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"解碼 URL 時發生錯誤: {str(e)}"
-        )
+
+    def __init__(self):
+        self._fallback = None
+
+    @property
+    def fallback(self):
+        if self._fallback is None:
+            self._fallback = create_app()
+        return self._fallback
+
+    async def __call__(self, scope, receive, send):
+        scope_type = scope["type"]
+        if scope_type == "http":
+            handled = await self._handle_hot_path(scope, receive, send)
+            if handled is not True:
+                # handled 為已讀取的 body（或 None），重新提供給 FastAPI
+                await self.fallback(scope, _replay_receive(handled, receive), send)
+        elif scope_type == "lifespan":
+            await self._handle_lifespan(receive, send)
+        else:
+            await self.fallback(scope, receive, send)
+
+    async def _handle_lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _handle_hot_path(self, scope, receive, send):
+        """
+        處理熱路徑
+
+        Returns:
+            True 表示已回應；否則回傳已讀取的 body（bytes 或 None）交給 FastAPI
+        """
+        path = scope["path"]
+        method = scope["method"]
+
+        if path == HOT_HEALTH_PATH and method == "GET":
+            await _send_json(scope, send, _health_payload())
+            return True
+
+        if path == HOT_DECODE_PATH and method == "GET":
+            url = extract_url_param(scope.get("query_string", b""))
+            if not url:
+                return None
+            await _send_json(scope, send, _decode_payload(url))
+            return True
+
+        if method == "POST" and path in (HOT_DECODE_PATH, HOT_BATCH_PATH):
+            body = await _read_body(receive)
+            try:
+                data = loads(body)
+            except ValueError:
+                return body
+            if not isinstance(data, dict):
+                return body
+
+            if path == HOT_DECODE_PATH:
+                url = data.get("url")
+                if not isinstance(url, str):
+                    return body
+                await _send_json(scope, send, _decode_payload(url))
+                return True
+
+            urls = data.get("urls")
+            if (not isinstance(urls, list) or len(urls) > MAX_BATCH_SIZE
+                    or not all(isinstance(u, str) for u in urls)):
+                return body
+            await _send_json(scope, send, _batch_payload(urls))
+            return True
+
+        return None
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    more_body = True
+    while more_body:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        more_body = message.get("more_body", False)
+    return b"".join(chunks)
+
+
+def _replay_receive(body, receive):
+    """已讀取過 body 時，產生一個會先回放 body 的 receive"""
+    if body is None:
+        return receive
+    replayed = False
+
+    async def replay():
+        nonlocal replayed
+        if not replayed:
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replay
+
+
+async def _send_json(scope, send, data, status: int = 200):
+    body = dumps(data)
+    headers = [_JSON_HEADER, (b"content-length", str(len(body)).encode())]
+    # CORS：與 FastAPI 版 CORSMiddleware(allow_origins=["*"], allow_credentials=True) 相同
+    for name, value in scope.get("headers", ()):
+        if name == b"origin":
+            headers.append((b"access-control-allow-origin", value))
+            headers.append((b"access-control-allow-credentials", b"true"))
+            headers.append((b"vary", b"Origin"))
+            break
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+app = DecoderApp()
 
 
 # ==================== 啟動設定 ====================
@@ -261,10 +456,13 @@ if __name__ == "__main__":
     print(f"🌐 API 文件: http://localhost:{port}/docs")
     print(f"💚 健康檢查: http://localhost:{port}/health")
     print(f"🔗 解碼端點: http://localhost:{port}/api/decode-google-url")
+    print(f"📦 批次解碼: http://localhost:{port}/api/decode-google-url/batch")
     print("=" * 60)
     print("⚡ 輕量級版本 - 不包含重量級的 Playwright 解析功能")
     print("=" * 60)
     
+    import uvicorn
+
     uvicorn.run(
         app,
         host="0.0.0.0",
@@ -2,16 +2,93 @@
 """
 從批次測試結果生成 Excel 報告
 可以處理新舊兩種 JSON 格式
+
+串流模式（--streaming）：
+- 逐筆讀取 JSON 陣列或 JSONL，不需一次載入整個結果檔
+- 使用 openpyxl write-only 工作表 + 共用的 NamedStyle，記憶體用量與筆數無關
+- 適合數萬筆以上的報告（效能比較見 benchmark-excel-report.py）
 """
 
 import json
 import sys
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
 from datetime import datetime
 import os
 
+from parser_core.jsonstream import iter_json_records
+
+# Master 分頁表頭
+MASTER_HEADERS = [
+    "編號",
+    "連結",
+    "解析文字（前500字）",
+    "爬蟲類型",
+    "耗時（秒）",
+    "錯誤原因",
+    "標題",
+    "作者",
+    "發布日期",
+    "字數",
+    "中文字數",
+    "路由決策",
+    "嘗試次數",
+    "HTTP狀態碼",
+    "解析成功"
+]
+
+# Master 分頁列寬
+MASTER_COLUMN_WIDTHS = [10, 60, 70, 30, 12, 40, 40, 20, 15, 10, 12, 15, 12, 15, 12]
+
+# Summary 分頁中的區塊標題列
+SUMMARY_SECTION_TITLES = ["📈 整體統計", "🔧 爬蟲方法", "⏱️ 效能統計", "📝 內容統計"]
+
+METHOD_DISPLAY = {
+    'static': '靜態爬蟲 (Trafilatura)',
+    'playwright': '動態爬蟲 (Playwright)',
+    'unknown': '未知'
+}
+
+
+def get_rendering_method(result: dict) -> str:
+    """取得爬蟲方法（新格式在最外層，舊格式在 parsed_data 裡）"""
+    parsed_data = result.get('parsed_data') or {}
+    return result.get('rendering_method') or parsed_data.get('rendering_method', 'unknown')
+
+
+def build_master_row(result: dict) -> list:
+    """產生 Master 分頁的一列資料"""
+    parsed_data = result.get('parsed_data') or {}
+    success = result.get('success', False)
+    elapsed_time = result.get('elapsed_time', 0)
+
+    # 處理中文字數統計（防止 None）
+    text_content = parsed_data.get('text_content') or ''
+    chinese_chars = sum(1 for c in text_content if '\u4e00' <= c <= '\u9fff')
+
+    method = get_rendering_method(result)
+
+    return [
+        result.get('id', '???'),                         # 編號
+        result.get('url', ''),                           # 連結
+        text_content[:500] if text_content else '',      # 解析文字（前500字）
+        METHOD_DISPLAY.get(method, method),              # 爬蟲類型
+        round(elapsed_time, 2) if elapsed_time else 0,   # 耗時（秒）
+        result.get('error', '') if not success else '',  # 錯誤原因
+        parsed_data.get('title') or '',                  # 標題
+        parsed_data.get('author') or '',                 # 作者
+        parsed_data.get('date_published') or '',         # 發布日期
+        len(text_content),                               # 字數
+        chinese_chars,                                   # 中文字數
+        result.get('routing_decision', 'N/A'),           # 路由決策
+        result.get('attempts', 1),                       # 嘗試次數
+        result.get('status_code', ''),                   # HTTP狀態碼
+        '是' if success else '否'                        # 解析成功
+    ]
+
+
 def generate_excel_report(json_file: str, output_file: str = None):
     """
     從 JSON 結果生成 Excel 報告
@@ -32,23 +109,7 @@ def generate_excel_report(json_file: str, output_file: str = None):
     ws_master.title = "詳細資料 (Master)"
     
     # 定義表頭
-    headers_master = [
-        "編號",
-        "連結",
-        "解析文字（前500字）",
-        "爬蟲類型",
-        "耗時（秒）",
-        "錯誤原因",
-        "標題",
-        "作者",
-        "發布日期",
-        "字數",
-        "中文字數",
-        "路由決策",
-        "嘗試次數",
-        "HTTP狀態碼",
-        "解析成功"
-    ]
+    headers_master = MASTER_HEADERS
     
     # 設定表頭樣式
     header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
@@ -72,47 +133,8 @@ def generate_excel_report(json_file: str, output_file: str = None):
     
     # 填充資料
     for idx, result in enumerate(results, start=2):
-        url = result.get('url', '')
-        id_num = result.get('id', '???')
         success = result.get('success', False)
-        parsed_data = result.get('parsed_data', {})
-        error = result.get('error', '')
-        elapsed_time = result.get('elapsed_time', 0)
-        status_code = result.get('status_code', '')
-        routing_decision = result.get('routing_decision', 'N/A')
-        attempts = result.get('attempts', 1)
-        
-        # 處理中文字數統計（防止 None）
-        text_content = parsed_data.get('text_content') or ''
-        total_chars = len(text_content)
-        chinese_chars = len([c for c in text_content if '\u4e00' <= c <= '\u9fff'])
-        
-        # 爬蟲類型（中英文）
-        method = result.get('rendering_method') or parsed_data.get('rendering_method', 'unknown')
-        method_display = {
-            'static': '靜態爬蟲 (Trafilatura)',
-            'playwright': '動態爬蟲 (Playwright)',
-            'unknown': '未知'
-        }.get(method, method)
-        
-        # 填充每一列
-        row_data = [
-            id_num,                                      # 編號
-            url,                                         # 連結
-            text_content[:500] if text_content else '',  # 解析文字（前500字）
-            method_display,                              # 爬蟲類型
-            round(elapsed_time, 2) if elapsed_time else 0,  # 耗時（秒）
-            error if not success else '',                # 錯誤原因
-            parsed_data.get('title') or '',              # 標題
-            parsed_data.get('author') or '',             # 作者
-            parsed_data.get('date_published') or '',     # 發布日期
-            total_chars,                                 # 字數
-            chinese_chars,                               # 中文字數
-            routing_decision,                            # 路由決策
-            attempts,                                    # 嘗試次數
-            status_code,                                 # HTTP狀態碼
-            '是' if success else '否'                    # 解析成功
-        ]
+        row_data = build_master_row(result)
         
         for col_num, value in enumerate(row_data, 1):
             cell = ws_master.cell(row=idx, column=col_num)
@@ -125,8 +147,7 @@ def generate_excel_report(json_file: str, output_file: str = None):
                 cell.fill = PatternFill(start_color="FFE6E6", end_color="FFE6E6", fill_type="solid")
     
     # 調整列寬
-    column_widths = [10, 60, 70, 30, 12, 40, 40, 20, 15, 10, 12, 15, 12, 15, 12]
-    for col_num, width in enumerate(column_widths, 1):
+    for col_num, width in enumerate(MASTER_COLUMN_WIDTHS, 1):
         ws_master.column_dimensions[get_column_letter(col_num)].width = width
     
     # 凍結首列
@@ -194,7 +215,7 @@ def generate_excel_report(json_file: str, output_file: str = None):
             cell.border = thin_border
             
             # 標題列樣式
-            if row_data[0] in ["📈 整體統計", "🔧 爬蟲方法", "⏱️ 效能統計", "📝 內容統計"]:
+            if row_data[0] in SUMMARY_SECTION_TITLES:
                 cell.fill = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
                 cell.font = Font(bold=True, size=11)
             
@@ -296,18 +317,275 @@ def generate_excel_report(json_file: str, output_file: str = None):
     print("=" * 80)
 
 
+def register_report_styles(wb: Workbook):
+    """註冊報告用的 NamedStyle（串流模式每個儲存格只引用樣式名稱，不建立新物件）"""
+    thin_border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    styles = [
+        NamedStyle(
+            name="report_header",
+            fill=PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid"),
+            font=Font(bold=True, color="FFFFFF", size=11),
+            alignment=Alignment(horizontal="center", vertical="center", wrap_text=True),
+            border=thin_border
+        ),
+        NamedStyle(
+            name="report_cell",
+            alignment=Alignment(vertical="top", wrap_text=True),
+            border=thin_border
+        ),
+        NamedStyle(
+            name="report_cell_failed",
+            fill=PatternFill(start_color="FFE6E6", end_color="FFE6E6", fill_type="solid"),
+            alignment=Alignment(vertical="top", wrap_text=True),
+            border=thin_border
+        ),
+        NamedStyle(
+            name="report_title",
+            font=Font(bold=True, size=16, color="1F4E78"),
+            alignment=Alignment(horizontal="left", vertical="center")
+        ),
+        NamedStyle(
+            name="report_section",
+            fill=PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid"),
+            font=Font(bold=True, size=11),
+            border=thin_border
+        ),
+        NamedStyle(
+            name="report_summary_label",
+            alignment=Alignment(horizontal="left", vertical="center"),
+            border=thin_border
+        ),
+        NamedStyle(
+            name="report_summary_value",
+            alignment=Alignment(horizontal="center", vertical="center"),
+            border=thin_border
+        ),
+        NamedStyle(name="report_fail_title", font=Font(bold=True, size=12, color="C00000")),
+        NamedStyle(
+            name="report_fail_header",
+            fill=PatternFill(start_color="F4B084", end_color="F4B084", fill_type="solid"),
+            font=Font(bold=True),
+            alignment=Alignment(horizontal="center", vertical="center"),
+            border=thin_border
+        ),
+        NamedStyle(name="report_success_title", font=Font(bold=True, size=12, color="008000")),
+        NamedStyle(
+            name="report_success_header",
+            fill=PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid"),
+            font=Font(bold=True),
+            alignment=Alignment(horizontal="center", vertical="center"),
+            border=thin_border
+        ),
+    ]
+    for style in styles:
+        wb.add_named_style(style)
+
+
+class ReportStats:
+    """逐筆累計 Summary 分頁需要的統計資料"""
+
+    def __init__(self, max_success_samples: int = 10):
+        self.total = 0
+        self.success_count = 0
+        self.static_count = 0
+        self.dynamic_count = 0
+        self.total_time = 0
+        self.max_time = 0
+        self.min_success_time = None
+        self.success_chars = 0
+        self.failed_items = []      # (編號, 連結, 錯誤原因)
+        self.success_samples = []   # 成功案例（前 N 個）
+        self.max_success_samples = max_success_samples
+
+    def add(self, result: dict):
+        self.total += 1
+        elapsed_time = result.get('elapsed_time', 0)
+        self.total_time += elapsed_time
+        self.max_time = max(self.max_time, elapsed_time)
+
+        method = get_rendering_method(result)
+        if method == 'static':
+            self.static_count += 1
+        elif method == 'playwright':
+            self.dynamic_count += 1
+
+        if result.get('success'):
+            parsed_data = result.get('parsed_data') or {}
+            self.success_count += 1
+            self.success_chars += len(parsed_data.get('text_content') or '')
+            if self.min_success_time is None or elapsed_time < self.min_success_time:
+                self.min_success_time = elapsed_time
+            if len(self.success_samples) < self.max_success_samples:
+                self.success_samples.append([
+                    result.get('id', '???'),
+                    parsed_data.get('title') or '無標題',
+                    parsed_data.get('author') or '未知',
+                    parsed_data.get('word_count') or 0,
+                    '動態' if method == 'playwright' else '靜態'
+                ])
+        else:
+            self.failed_items.append([
+                result.get('id', '???'),
+                result.get('url', ''),
+                result.get('error', '未知錯誤')
+            ])
+
+
+def _styled_row(ws, values, style: str):
+    """產生一列套用同一個 NamedStyle 的 write-only 儲存格"""
+    row = []
+    for value in values:
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style
+        row.append(cell)
+    return row
+
+
+def generate_excel_report_streaming(json_file: str, output_file: str = None) -> str:
+    """
+    串流模式：從 JSON/JSONL 結果生成 Excel 報告
+
+    內容與 generate_excel_report 相同，但逐筆讀取輸入、逐列寫出，
+    不會把整個結果檔或整張工作表保留在記憶體中。
+
+    Args:
+        json_file: 輸入的 JSON 陣列或 JSONL 檔案路徑
+        output_file: 輸出的 Excel 檔案名稱（可選）
+
+    Returns:
+        輸出的 Excel 檔案路徑
+    """
+    wb = Workbook(write_only=True)
+    register_report_styles(wb)
+    stats = ReportStats()
+
+    # ========== MASTER 分頁 ==========
+    ws_master = wb.create_sheet(title="詳細資料 (Master)")
+    for col_num, width in enumerate(MASTER_COLUMN_WIDTHS, 1):
+        ws_master.column_dimensions[get_column_letter(col_num)].width = width
+    ws_master.freeze_panes = "A2"
+
+    ws_master.append(_styled_row(ws_master, MASTER_HEADERS, "report_header"))
+    for result in iter_json_records(json_file):
+        stats.add(result)
+        style = "report_cell" if result.get('success', False) else "report_cell_failed"
+        ws_master.append(_styled_row(ws_master, build_master_row(result), style))
+
+    # ========== SUMMARY 分頁 ==========
+    ws_summary = wb.create_sheet(title="測試總結 (Summary)")
+    for column, width in zip("ABCDE", (15, 60, 20, 10, 12)):
+        ws_summary.column_dimensions[column].width = width
+
+    total = stats.total
+    success_count = stats.success_count
+    fail_count = total - success_count
+    success_rate = (success_count / total * 100) if total > 0 else 0
+    avg_time = stats.total_time / total if total > 0 else 0
+    min_time = stats.min_success_time or 0
+    avg_chars = stats.success_chars / success_count if success_count > 0 else 0
+
+    title_cell = WriteOnlyCell(ws_summary, value=f"📊 {total} 個連結批次測試總結報告")
+    title_cell.style = "report_title"
+    ws_summary.append([title_cell])
+    ws_summary.merged_cells.add('A1:C1')
+
+    ws_summary.append(["測試時間：", datetime.now().strftime("%Y-%m-%d %H:%M:%S")])
+    ws_summary.append(["資料來源：", os.path.basename(json_file)])
+    ws_summary.append([])
+
+    summary_data = [
+        ["📈 整體統計", "數值", "百分比/說明"],
+        ["總連結數", total, ""],
+        ["✅ 成功數", success_count, f"{success_rate:.1f}%"],
+        ["❌ 失敗數", fail_count, f"{100-success_rate:.1f}%"],
+        ["", "", ""],
+        ["🔧 爬蟲方法", "數量", "百分比"],
+        ["靜態爬蟲 (Trafilatura)", stats.static_count, f"{stats.static_count/total*100:.1f}%" if total > 0 else "0%"],
+        ["動態爬蟲 (Playwright)", stats.dynamic_count, f"{stats.dynamic_count/total*100:.1f}%" if total > 0 else "0%"],
+        ["", "", ""],
+        ["⏱️ 效能統計", "數值", "單位"],
+        ["平均耗時", round(avg_time, 2), "秒"],
+        ["最長耗時", round(stats.max_time, 2), "秒"],
+        ["最短耗時", round(min_time, 2), "秒"],
+        ["", "", ""],
+        ["📝 內容統計", "數值", "單位"],
+        ["平均字數", int(avg_chars), "字元"],
+    ]
+    for row_data in summary_data:
+        if row_data[0] in SUMMARY_SECTION_TITLES:
+            ws_summary.append(_styled_row(ws_summary, row_data, "report_section"))
+        else:
+            row = _styled_row(ws_summary, row_data, "report_summary_value")
+            row[0].style = "report_summary_label"
+            ws_summary.append(row)
+
+    # 失敗項目列表
+    ws_summary.append([])
+    ws_summary.append([])
+    fail_title = WriteOnlyCell(ws_summary, value="❌ 失敗項目詳情")
+    fail_title.style = "report_fail_title"
+    ws_summary.append([fail_title])
+    ws_summary.append(_styled_row(ws_summary, ["編號", "連結", "錯誤原因"], "report_fail_header"))
+    for fail_data in stats.failed_items:
+        ws_summary.append(_styled_row(ws_summary, fail_data, "report_cell_failed"))
+
+    # 成功案例展示（前10個）
+    ws_summary.append([])
+    ws_summary.append([])
+    success_title = WriteOnlyCell(ws_summary, value="✅ 成功案例展示（前10個）")
+    success_title.style = "report_success_title"
+    ws_summary.append([success_title])
+    ws_summary.append(_styled_row(ws_summary, ["編號", "標題", "作者", "字數", "爬蟲方法"], "report_success_header"))
+    for success_data in stats.success_samples:
+        ws_summary.append(_styled_row(ws_summary, success_data, "report_cell"))
+
+    # 儲存檔案
+    if not output_file:
+        output_file = f"測試報告_{total}連結_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+
+    wb.save(output_file)
+
+    print("=" * 80)
+    print("✅ Excel 報告生成成功！（串流模式）")
+    print("=" * 80)
+    print(f"📁 檔案名稱：{output_file}")
+    print(f"📂 儲存位置：{os.path.abspath(output_file)}")
+    print()
+    print(f"📈 統計摘要：")
+    print(f"   • 成功率：{success_rate:.1f}% ({success_count}/{total})")
+    print(f"   • 靜態爬蟲：{stats.static_count} 個")
+    print(f"   • 動態爬蟲：{stats.dynamic_count} 個")
+    print(f"   • 平均耗時：{avg_time:.2f} 秒")
+    print("=" * 80)
+
+    return output_file
+
+
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("使用方法：python generate-excel-report.py <json檔案> [輸出檔名]")
+    args = [a for a in sys.argv[1:] if a != "--streaming"]
+    streaming = "--streaming" in sys.argv[1:]
+    
+    if len(args) < 1:
+        print("使用方法：python generate-excel-report.py <json檔案> [輸出檔名] [--streaming]")
         print("範例：python generate-excel-report.py results-120-raw.json")
+        print("      python generate-excel-report.py results.jsonl report.xlsx --streaming")
+        print("（JSONL 輸入會自動使用串流模式）")
         sys.exit(1)
     
-    json_file = sys.argv[1]
-    output_file = sys.argv[2] if len(sys.argv) > 2 else None
+    json_file = args[0]
+    output_file = args[1] if len(args) > 1 else None
     
     if not os.path.exists(json_file):
         print(f"❌ 找不到檔案：{json_file}")
         sys.exit(1)
     
-    generate_excel_report(json_file, output_file)
+    if streaming or json_file.endswith('.jsonl'):
+        generate_excel_report_streaming(json_file, output_file)
+    else:
+        generate_excel_report(json_file, output_file)
 
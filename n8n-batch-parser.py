@@ -2,220 +2,560 @@
 n8n 批次處理腳本 (Python 版本)
 用途：批次解析 n8n 產出的文章列表
 
+特色：
+- 併發處理（可設定 worker 數量），同一域名之間保持禮貌間隔
+- 串流讀取輸入（JSON 陣列或 JSONL），不需一次載入整個檔案
+- 每完成一篇就寫入 checkpoint（JSONL，append-only），中斷後重跑會跳過已成功的 ID
+  （沒有 id 時以正規化網址為鍵：只差在 utm_* 等追蹤參數的網址只解析一次）
+- 最後合併輸出與舊版相同格式的結果檔（以及 -failed.json）
+- 選用 --parquet DIR：另外輸出依日期分區的 Parquet 檔（需要 pyarrow）
+- 選用 --local：不經過 HTTP API，直接在本程序內執行相同的路由、下載與提取流程
+  （自帶瀏覽器池，trafilatura 提取在程序池中執行），結果格式與 API 模式相同
+- 近似重複偵測（--dedup，預設 flag）：同一篇通訊社稿件出現在多個網域時，
+  後來的文章標記 duplicate_of（最早那篇的 ID）；skip 模式另外移除重複文章的正文
+
 使用方式：
 python n8n-batch-parser.py input.json output.json
+python n8n-batch-parser.py input.jsonl output.json --workers 8
+python n8n-batch-parser.py input.jsonl output.json --local --browsers 4
 
 輸入格式 (input.json)：
 [
   {"url": "https://example.com/article1", "id": "001"},
   {"url": "https://example.com/article2", "id": "002"}
 ]
+或 JSONL（每行一個物件）
 """
 
 import sys
 import json
 import asyncio
+import argparse
+import time
 import httpx
+from contextlib import asynccontextmanager
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import Dict, Any, Iterator, Optional, Tuple
 import os
 
+from parser_core.canonical_url import canonicalize_url
+from parser_core.dedup import DEDUP_MODES, NearDuplicateIndex, drop_duplicate_content
+from parser_core.jsonstream import iter_json_records
+from parser_core.routing import extract_domain
+
 # 設定
 API_URL = os.getenv('PARSER_API_URL', 'http://localhost:3000/api/parse')
-DELAY_MS = int(os.getenv('DELAY_MS', '2000'))
+DELAY_MS = int(os.getenv('DELAY_MS', '2000'))          # 同一域名的請求間隔
 MAX_RETRIES = int(os.getenv('MAX_RETRIES', '3'))
+CONCURRENCY = int(os.getenv('CONCURRENCY', '4'))       # 同時處理的文章數
+REQUEST_TIMEOUT = 30.0                                  # HTTP 模式單次請求逾時（秒）
+# 伺服器端的時間預算比客戶端逾時短，逾時前就能拿到 deadline_exceeded 結果而不是斷線
+SERVER_DEADLINE_MS = int((REQUEST_TIMEOUT - 2) * 1000)
+# checkpoint 格式版本（第一行記錄）：2 起沒有 id 的紀錄以正規化網址為鍵；沒有版本行的是舊版（原始網址為鍵）
+CHECKPOINT_VERSION = 2
+
+
+def record_key(article: Dict[str, Any]) -> str:
+    """checkpoint 使用的識別鍵：優先使用 id，沒有 id 時使用正規化後的 url"""
+    article_id = article.get('id')
+    return str(article_id) if article_id is not None else canonicalize_url(article['url'])
+
+
+class DomainThrottle:
+    """
+    每個域名的禮貌間隔
+
+    同一域名的兩次請求開始時間至少相隔 delay 秒；不同域名互不影響
+    （www. 與埠號不同仍視為同一域名，見 routing.extract_domain）。
+    """
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._next_allowed: Dict[str, float] = {}
+
+    async def wait(self, url: str):
+        if self.delay <= 0:
+            return
+        domain = extract_domain(url)
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        # 先預約時段再等待，避免多個 worker 同時搶到同一個時段
+        slot = max(now, self._next_allowed.get(domain, now))
+        self._next_allowed[domain] = slot + self.delay
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class Checkpoint:
+    """
+    append-only 的 JSONL checkpoint
+
+    每完成一篇文章就寫入一行並 flush，程式中斷最多只損失正在處理的文章。
+    第一行是版本紀錄 {"checkpoint_version": N}；舊版 checkpoint 在載入時轉換成目前的格式。
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = None
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """
+        讀取既有的結果（同一個鍵以最後一筆為準）
+
+        舊版（沒有版本行）沒有 id 的紀錄以原始網址為鍵：每筆結果都保有輸入的 url，
+        這裡重新以正規化網址為鍵；多個網址寫法對應到同一個鍵時保留成功的那筆，
+        轉換後改寫 checkpoint 並加上版本行，之後不必再轉換。
+
+        Raises:
+            ValueError: checkpoint 由較新版本的工具寫入
+        """
+        results = {}
+        if not self.path.exists():
+            return results
+        version = 1
+        legacy_rows = 0
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    result = json.loads(line)
+                except json.JSONDecodeError:
+                    # 中斷時可能留下寫到一半的最後一行
+                    continue
+                if 'checkpoint_version' in result:
+                    version = result['checkpoint_version']
+                    if version > CHECKPOINT_VERSION:
+                        raise ValueError(
+                            f"checkpoint 版本 {version} 比本工具支援的 {CHECKPOINT_VERSION} 新，"
+                            f"請更新 n8n-batch-parser.py 或使用 --fresh 重新解析: {self.path}"
+                        )
+                    continue
+                key = record_key(result)
+                if version < CHECKPOINT_VERSION:
+                    legacy_rows += 1
+                    previous = results.get(key)
+                    if previous is not None and previous.get('success') and not result.get('success'):
+                        continue
+                results[key] = result
+
+        if legacy_rows:
+            self._rewrite(results)
+            print(f'♻️  舊版 checkpoint 已轉換為第 {CHECKPOINT_VERSION} 版'
+                  f'（{legacy_rows} 筆 → {len(results)} 筆，沒有 id 的紀錄改以正規化網址為鍵）: {self.path}')
+        return results
+
+    def _rewrite(self, results: Dict[str, Dict[str, Any]]):
+        """以目前的格式整份改寫（先寫暫存檔再取代，中斷時保留原檔）"""
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'checkpoint_version': CHECKPOINT_VERSION}) + '\n')
+            for result in results.values():
+                f.write(json.dumps(result, ensure_ascii=False) + '\n')
+        os.replace(tmp_path, self.path)
+
+    def append(self, result: Dict[str, Any]):
+        if self._file is None:
+            is_new = not self.path.exists() or self.path.stat().st_size == 0
+            self._file = open(self.path, 'a', encoding='utf-8')
+            if is_new:
+                self._file.write(json.dumps({'checkpoint_version': CHECKPOINT_VERSION}) + '\n')
+        self._file.write(json.dumps(result, ensure_ascii=False) + '\n')
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
 
-print('📋 n8n 批次文章解析器 (Python 版本)')
-print('=' * 60)
-print(f'🔗 API 端點: {API_URL}')
-print(f'⏱️  請求間隔: {DELAY_MS}ms')
-print(f'🔄 最大重試: {MAX_RETRIES} 次\n')
+
+class HttpEngine:
+    """透過 Parser API（PARSER_API_URL）解析"""
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+
+    async def parse(self, url: str) -> Tuple[int, Any]:
+        """回傳 (HTTP 狀態碼, 成功時為回應 JSON / 失敗時為回應內容)"""
+        response = await self.client.post(
+            API_URL, json={'url': url, 'deadline_ms': SERVER_DEADLINE_MS}, timeout=REQUEST_TIMEOUT
+        )
+        if response.status_code != 200:
+            return response.status_code, response.text
+        return response.status_code, response.json()
+
+
+class LocalEngine:
+    """
+    在本程序內直接呼叫 parser_core.pipeline.parse（與 /api/parse 相同的流程）
+
+    ParseError 轉成與伺服器相同的狀態碼與 {"detail": ...} 內容，
+    因此重試邏輯與輸出格式和 API 模式完全一致。
+    """
+
+    def __init__(self, browser_pool=None, executor=None):
+        from parser_core.pipeline import ParseOptions
+        self.browser_pool = browser_pool
+        self.executor = executor
+        self.options = ParseOptions()
+
+    async def parse(self, url: str) -> Tuple[int, Any]:
+        from parser_core.pipeline import ParseError, parse
+        try:
+            result = await parse(url, self.options, browser_pool=self.browser_pool, executor=self.executor)
+        except ParseError as e:
+            return e.status_code, json.dumps({'detail': e.detail}, ensure_ascii=False, separators=(',', ':'))
+        return 200, result.to_dict()
+
+
+@asynccontextmanager
+async def open_engine(workers: int, local: bool = False, browsers: int = 2, extract_processes: int = 0):
+    """
+    建立解析引擎（結束時釋放連線、瀏覽器與程序池）
+
+    Args:
+        workers: 同時處理的文章數（HTTP 模式的連線數）
+        local: True 時使用 LocalEngine，否則使用 HttpEngine
+        browsers: LocalEngine 瀏覽器池大小
+        extract_processes: LocalEngine 提取用的程序數（0 則在主程序內提取）
+    """
+    if not local:
+        limits = httpx.Limits(max_connections=workers, max_keepalive_connections=workers)
+        async with httpx.AsyncClient(limits=limits) as client:
+            yield HttpEngine(client)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+    from parser_core.browser_pool import BrowserPool
+
+    pool = BrowserPool(size=browsers)
+    executor = ProcessPoolExecutor(max_workers=extract_processes) if extract_processes > 0 else None
+    try:
+        yield LocalEngine(browser_pool=pool, executor=executor)
+    finally:
+        await pool.close()
+        if executor is not None:
+            executor.shutdown(wait=True)
 
 
 async def parse_article(
-    client: httpx.AsyncClient,
+    engine,
     article_data: Dict[str, Any],
-    retry_count: int = 0
+    max_retries: int = MAX_RETRIES
 ) -> Dict[str, Any]:
     """
-    解析單一文章
-    
+    解析單一文章（失敗時以指數退避重試）
+
     Args:
-        client: httpx 客戶端
+        engine: HttpEngine 或 LocalEngine
         article_data: 文章資料（包含 url）
-        retry_count: 當前重試次數
-        
+        max_retries: 最大重試次數
+
     Returns:
         解析結果
     """
-    start_time = datetime.now()
-    try:
-        response = await client.post(
-            API_URL,
-            json={'url': article_data['url']},
-            timeout=30.0
-        )
-        elapsed_time = (datetime.now() - start_time).total_seconds()
-        
-        if response.status_code != 200:
-            raise Exception(f"HTTP {response.status_code}: {response.text}")
-        
-        result = response.json()
-        
-        if result.get('success'):
+    status_code = None
+    for retry_count in range(max_retries + 1):
+        start_time = datetime.now()
+        try:
+            status_code, result = await engine.parse(article_data['url'])
+            elapsed_time = (datetime.now() - start_time).total_seconds()
+
+            if status_code != 200:
+                raise Exception(f"HTTP {status_code}: {result}")
+
+            if result.get('success'):
+                return {
+                    **article_data,
+                    'success': True,
+                    'parsed_data': result['data'],
+                    'elapsed_time': elapsed_time,
+                    'status_code': status_code,
+                    'canonical_url': result.get('canonical_url'),
+                    'routing_decision': result.get('routing_decision'),
+                    'rendering_method': result.get('data', {}).get('rendering_method'),
+                    'attempts': result.get('attempts', 1),
+                    'parsed_at': datetime.now().isoformat()
+                }
+            else:
+                raise Exception('解析失敗')
+
+        except Exception as e:
+            elapsed_time = (datetime.now() - start_time).total_seconds()
+            print(f"❌ 解析失敗 (第 {retry_count + 1} 次): {article_data['url']}")
+            print(f"   錯誤: {str(e)}")
+
+            if retry_count < max_retries:
+                wait_ms = DELAY_MS * (2 ** (retry_count + 1))
+                print(f"   ⏳ 等待 {wait_ms}ms 後重試...")
+                await asyncio.sleep(wait_ms / 1000)
+                continue
+
             return {
                 **article_data,
-                'success': True,
-                'parsed_data': result['data'],
+                'success': False,
+                'error': str(e),
                 'elapsed_time': elapsed_time,
-                'status_code': response.status_code,
-                'routing_decision': result.get('routing_decision'),
-                'rendering_method': result.get('data', {}).get('rendering_method'),
-                'attempts': result.get('attempts', 1),
-                'parsed_at': datetime.now().isoformat()
+                'status_code': status_code,
+                'failed_at': datetime.now().isoformat()
             }
-        else:
-            raise Exception('解析失敗')
-            
-    except Exception as e:
-        elapsed_time = (datetime.now() - start_time).total_seconds()
-        print(f"❌ 解析失敗 (第 {retry_count + 1} 次): {article_data['url']}")
-        print(f"   錯誤: {str(e)}")
-        
-        # 重試邏輯
-        if retry_count < MAX_RETRIES:
-            print(f"   ⏳ 等待 {DELAY_MS * 2}ms 後重試...")
-            await asyncio.sleep((DELAY_MS * 2) / 1000)
-            return await parse_article(client, article_data, retry_count + 1)
-        
-        return {
-            **article_data,
-            'success': False,
-            'error': str(e),
-            'elapsed_time': elapsed_time,
-            'status_code': getattr(response, 'status_code', None) if 'response' in locals() else None,
-            'failed_at': datetime.now().isoformat()
-        }
-
-
-async def batch_parse(input_file: str, output_file: str):
+
+
+def iter_pending(input_file: str, completed: Dict[str, Dict[str, Any]], stats: Dict[str, int]) -> Iterator[Dict[str, Any]]:
+    """串流產生尚未成功的文章（已在 checkpoint 中成功的會被跳過）"""
+    for article in iter_json_records(input_file):
+        stats['total'] += 1
+        previous = completed.get(record_key(article))
+        if previous is not None and previous.get('success'):
+            stats['skipped'] += 1
+            continue
+        yield article
+
+
+async def batch_parse(
+    input_file: str,
+    output_file: str,
+    workers: int = CONCURRENCY,
+    domain_delay_ms: int = DELAY_MS,
+    checkpoint_file: Optional[str] = None,
+    fresh: bool = False,
+    parquet_dir: Optional[str] = None,
+    local: bool = False,
+    browsers: int = 2,
+    extract_processes: int = 0,
+    dedup: str = 'flag'
+):
     """
     批次處理文章
-    
+
     Args:
-        input_file: 輸入檔案路徑
+        input_file: 輸入檔案路徑（JSON 陣列或 JSONL）
         output_file: 輸出檔案路徑
+        workers: 同時處理的文章數
+        domain_delay_ms: 同一域名的請求間隔（毫秒）
+        checkpoint_file: checkpoint 路徑（預設為 <輸出檔>.checkpoint.jsonl）
+        fresh: 忽略既有的 checkpoint，全部重新解析
+        parquet_dir: 另外輸出 Parquet 資料集的根目錄（依抓取日期分區）
+        local: 不經過 HTTP API，在本程序內解析
+        browsers: --local 的瀏覽器池大小
+        extract_processes: --local 提取用的程序數（0 則在主程序內提取）
+        dedup: 近似重複文章的處理方式：off / flag（標記 duplicate_of）/ skip（另外移除正文）
     """
+    input_path = Path(input_file)
+    if not input_path.exists():
+        print(f"❌ 找不到輸入檔案: {input_file}")
+        sys.exit(1)
+
+    output_path = Path(output_file)
+    checkpoint = Checkpoint(Path(checkpoint_file or f"{output_file}.checkpoint.jsonl"))
+    if fresh and checkpoint.path.exists():
+        checkpoint.path.unlink()
+
     try:
-        # 讀取輸入檔案
-        input_path = Path(input_file)
-        if not input_path.exists():
-            print(f"❌ 找不到輸入檔案: {input_file}")
-            sys.exit(1)
-        
-        with open(input_path, 'r', encoding='utf-8') as f:
-            input_data = json.load(f)
-        
-        if not isinstance(input_data, list):
-            print('❌ 輸入檔案格式錯誤：必須是陣列')
-            sys.exit(1)
-        
-        print(f'📥 載入 {len(input_data)} 篇文章待解析\n')
-        
-        results = []
-        success_count = 0
-        fail_count = 0
-        
-        # 建立 HTTP 客戶端
-        async with httpx.AsyncClient() as client:
-            # 逐一處理每篇文章
-            for i, article in enumerate(input_data):
-                progress = f"[{i + 1}/{len(input_data)}]"
-                
-                print(f"{progress} 🔍 解析中: {article['url']}")
-                
-                result = await parse_article(client, article)
-                results.append(result)
-                
-                if result['success']:
-                    success_count += 1
-                    parsed_data = result['parsed_data']
-                    title = parsed_data.get('title', '無標題')
-                    word_count = parsed_data.get('word_count', 0)
-                    author = parsed_data.get('author', '未知')
-                    elapsed = result.get('elapsed_time', 0)
-                    method = result.get('rendering_method', 'static')
-                    method_display = '動態' if method == 'playwright' else '靜態'
-                    
-                    print(f"{progress} ✅ 成功: {title}")
-                    print(f"{progress}    字數: {word_count}, 作者: {author}, 耗時: {elapsed:.2f}秒 ({method_display})")
-                else:
-                    fail_count += 1
-                    print(f"{progress} ❌ 失敗")
-                
-                # 避免請求過快（最後一個不需要延遲）
-                if i < len(input_data) - 1:
-                    await asyncio.sleep(DELAY_MS / 1000)
-                
-                print()  # 空行分隔
-        
-        # 儲存結果
-        output_path = Path(output_file)
+        results = checkpoint.load()
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    if results:
+        done = sum(1 for r in results.values() if r.get('success'))
+        print(f'♻️  從 checkpoint 載入 {len(results)} 筆結果（{done} 筆成功將被跳過）: {checkpoint.path}\n')
+
+    stats = {'total': 0, 'skipped': 0, 'processed': 0, 'success': 0, 'failed': 0}
+
+    # 近似重複索引：先放入 checkpoint 中已成功的文章，續跑時也能比對到
+    dedup_index = NearDuplicateIndex() if dedup != 'off' else None
+    if dedup_index is not None:
+        for key, previous in results.items():
+            if previous.get('success') and not previous.get('duplicate_of'):
+                dedup_index.seed(key, previous.get('simhash'))
+    throttle = DomainThrottle(domain_delay_ms / 1000)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+    started = time.monotonic()
+
+    async def producer():
+        for article in iter_pending(input_file, results, stats):
+            await queue.put(article)
+        for _ in range(workers):
+            await queue.put(None)
+
+    async def worker(engine):
+        while True:
+            article = await queue.get()
+            if article is None:
+                return
+
+            await throttle.wait(article['url'])
+            print(f"🔍 解析中: {article['url']}")
+            result = await parse_article(engine, article)
+
+            if dedup_index is not None and result['success']:
+                match = dedup_index.check(record_key(article), result['parsed_data'].get('text_content'))
+                result['simhash'] = match['simhash']
+                if match['duplicate_of'] is not None:
+                    result['duplicate_of'] = match['duplicate_of']
+                    result['duplicate_distance'] = match['distance']
+                    if dedup == 'skip':
+                        result['parsed_data'] = drop_duplicate_content(result['parsed_data'])
+
+            results[record_key(article)] = result
+            checkpoint.append(result)
+            stats['processed'] += 1
+            progress = f"[{stats['processed']}/{max(stats['total'] - stats['skipped'], stats['processed'])}]"
+
+            if result['success']:
+                stats['success'] += 1
+                parsed_data = result['parsed_data']
+                title = parsed_data.get('title', '無標題')
+                word_count = parsed_data.get('word_count', 0)
+                author = parsed_data.get('author', '未知')
+                elapsed = result.get('elapsed_time', 0)
+                method = result.get('rendering_method', 'static')
+                method_display = '動態' if method == 'playwright' else '靜態'
+
+                print(f"{progress} ✅ 成功: {title}")
+                print(f"{progress}    字數: {word_count}, 作者: {author}, 耗時: {elapsed:.2f}秒 ({method_display})")
+                if result.get('duplicate_of') is not None:
+                    print(f"{progress}    🔁 近似重複（距離 {result['duplicate_distance']}）: 同 {result['duplicate_of']}")
+            else:
+                stats['failed'] += 1
+                print(f"{progress} ❌ 失敗: {article['url']}")
+
+    try:
+        print(f'📥 開始串流讀取: {input_file}（{workers} 個 worker）\n')
+
+        async with open_engine(workers, local, browsers, extract_processes) as engine:
+            await asyncio.gather(producer(), *(worker(engine) for _ in range(workers)))
+
+        checkpoint.close()
+
+        # 合併輸出：依輸入順序，格式與舊版相同
+        merged = []
+        for article in iter_json_records(input_file):
+            result = results.get(record_key(article))
+            if result is not None:
+                merged.append(result)
+
         with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(results, f, ensure_ascii=False, indent=2)
-        
+            json.dump(merged, f, ensure_ascii=False, indent=2)
+
+        total = len(merged)
+        success_count = sum(1 for r in merged if r['success'])
+        fail_count = total - success_count
+        elapsed = time.monotonic() - started
+
+        print()
         print('=' * 60)
         print('✨ 批次處理完成！')
         print(f'📊 統計資訊:')
-        print(f'   總計: {len(input_data)} 篇')
-        print(f'   成功: {success_count} 篇 ({success_count/len(input_data)*100:.1f}%)')
-        print(f'   失敗: {fail_count} 篇 ({fail_count/len(input_data)*100:.1f}%)')
+        print(f'   總計: {total} 篇（本次解析 {stats["processed"]} 篇，跳過已完成 {stats["skipped"]} 篇）')
+        if total:
+            print(f'   成功: {success_count} 篇 ({success_count/total*100:.1f}%)')
+            print(f'   失敗: {fail_count} 篇 ({fail_count/total*100:.1f}%)')
+        if dedup_index is not None:
+            duplicate_count = sum(1 for r in merged if r.get('duplicate_of') is not None)
+            print(f'   近似重複: {duplicate_count} 篇（{"已移除正文" if dedup == "skip" else "已標記 duplicate_of"}）')
+        print(f'   耗時: {elapsed:.1f} 秒')
         print(f'\n💾 結果已儲存至: {output_file}')
-        
+        if parquet_dir:
+            from parser_core.columnar import write_batch_results_parquet
+            written = write_batch_results_parquet(merged, parquet_dir)
+            print(f'🧱 Parquet 已儲存至: {written["path"]}（{written["rows"]} 筆）')
+        print(f'📝 Checkpoint: {checkpoint.path}')
+
         # 如果有失敗的項目，另外儲存失敗清單
         if fail_count > 0:
-            failed_items = [r for r in results if not r['success']]
+            failed_items = [r for r in merged if not r['success']]
             failed_file = str(output_path).replace('.json', '-failed.json')
-            
+
             with open(failed_file, 'w', encoding='utf-8') as f:
                 json.dump(failed_items, f, ensure_ascii=False, indent=2)
-            
+
             print(f'⚠️  失敗項目已儲存至: {failed_file}')
-        
+
     except Exception as e:
+        checkpoint.close()
         print(f'\n❌ 批次處理發生錯誤: {str(e)}')
+        print(f'   已完成的結果保存在 checkpoint，重新執行即可從中斷處繼續: {checkpoint.path}')
         sys.exit(1)
 
 
 def main():
     """主程式"""
-    if len(sys.argv) < 3:
-        print('使用方式：')
-        print('  python n8n-batch-parser.py <輸入檔案.json> <輸出檔案.json>')
-        print('')
-        print('範例：')
-        print('  python n8n-batch-parser.py articles.json results.json')
-        print('')
-        print('環境變數：')
-        print('  PARSER_API_URL - Parser API 位址（預設: http://localhost:3000/api/parse）')
-        print('  DELAY_MS - 請求間隔毫秒數（預設: 2000）')
-        print('  MAX_RETRIES - 最大重試次數（預設: 3）')
-        print('')
-        print('輸入檔案格式：')
-        print('  [')
-        print('    {"url": "https://example.com/article1", "id": "001"},')
-        print('    {"url": "https://example.com/article2", "id": "002"}')
-        print('  ]')
-        sys.exit(1)
-    
-    input_file = sys.argv[1]
-    output_file = sys.argv[2]
-    
+    parser = argparse.ArgumentParser(
+        description='n8n 批次文章解析器 (Python 版本)',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''範例：
+  python n8n-batch-parser.py articles.json results.json
+  python n8n-batch-parser.py articles.jsonl results.json --workers 8
+  python n8n-batch-parser.py articles.json results.json --parquet history/
+  python n8n-batch-parser.py articles.jsonl results.json --local --workers 8 --browsers 4
+
+環境變數：
+  PARSER_API_URL - Parser API 位址（預設: http://localhost:3000/api/parse）
+  DELAY_MS - 同一域名的請求間隔毫秒數（預設: 2000）
+  MAX_RETRIES - 最大重試次數（預設: 3）
+  CONCURRENCY - 同時處理的文章數（預設: 4）
+  PLAYWRIGHT_CONCURRENCY - --local 的預設瀏覽器池大小（預設: 2）
+  PLAYWRIGHT_PAGES_PER_BROWSER - --local 每個瀏覽器同時渲染的頁面數（預設: 1）
+
+輸入檔案格式（JSON 陣列或 JSONL）：
+  [
+    {"url": "https://example.com/article1", "id": "001"},
+    {"url": "https://example.com/article2", "id": "002"}
+  ]'''
+    )
+    parser.add_argument('input_file', help='輸入檔案（JSON 陣列或 JSONL）')
+    parser.add_argument('output_file', help='輸出檔案（JSON）')
+    parser.add_argument('--workers', '-w', type=int, default=CONCURRENCY, help=f'同時處理的文章數（預設: {CONCURRENCY}）')
+    parser.add_argument('--domain-delay-ms', type=int, default=DELAY_MS, help=f'同一域名的請求間隔毫秒數（預設: {DELAY_MS}）')
+    parser.add_argument('--checkpoint', default=None, help='checkpoint 檔案路徑（預設: <輸出檔>.checkpoint.jsonl）')
+    parser.add_argument('--fresh', action='store_true', help='忽略既有的 checkpoint，全部重新解析')
+    parser.add_argument('--parquet', default=None, metavar='DIR', help='另外輸出 Parquet 資料集到 DIR（依抓取日期分區，需要 pyarrow）')
+    parser.add_argument('--local', action='store_true', help='不經過 HTTP API，在本程序內解析（需要 trafilatura 與 playwright）')
+    parser.add_argument('--browsers', type=int, default=None, help='--local 的瀏覽器池大小（預設: PLAYWRIGHT_CONCURRENCY 或 2）')
+    parser.add_argument('--extract-processes', type=int, default=os.cpu_count() or 1,
+                        help='--local 執行 trafilatura 提取的程序數，0 表示在主程序內提取（預設: CPU 核心數）')
+    parser.add_argument('--dedup', choices=DEDUP_MODES, default='flag',
+                        help='近似重複文章：off 不檢查、flag 標記 duplicate_of、skip 另外移除正文（預設: flag）')
+    args = parser.parse_args()
+
+    if args.parquet:
+        from parser_core.columnar import parquet_available
+        if not parquet_available():
+            print('❌ --parquet 需要 pyarrow：pip install pyarrow')
+            sys.exit(1)
+
+    print('📋 n8n 批次文章解析器 (Python 版本)')
+    print('=' * 60)
+    if args.local:
+        from parser_core.fetch import PLAYWRIGHT_CONCURRENCY, PLAYWRIGHT_PAGES_PER_BROWSER
+        browsers = max(1, args.browsers or PLAYWRIGHT_CONCURRENCY)
+        print(f'🏠 本機模式: {browsers} 個瀏覽器 × {max(1, PLAYWRIGHT_PAGES_PER_BROWSER)} 個分頁, '
+              f'{args.extract_processes} 個提取程序')
+    else:
+        browsers = 0
+        print(f'🔗 API 端點: {API_URL}')
+    print(f'👷 併發數: {args.workers}')
+    print(f'⏱️  同域名間隔: {args.domain_delay_ms}ms')
+    print(f'🔄 最大重試: {MAX_RETRIES} 次\n')
+
     # 執行批次處理
-    asyncio.run(batch_parse(input_file, output_file))
+    asyncio.run(batch_parse(
+        args.input_file,
+        args.output_file,
+        workers=max(1, args.workers),
+        domain_delay_ms=args.domain_delay_ms,
+        checkpoint_file=args.checkpoint,
+        fresh=args.fresh,
+        parquet_dir=args.parquet,
+        local=args.local,
+        browsers=browsers,
+        extract_processes=max(0, args.extract_processes),
+        dedup=args.dedup
+    ))
 
 
 if __name__ == '__main__':
     main()
-
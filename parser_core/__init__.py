@@ -0,0 +1,22 @@
+"""
+parser_core - 解析器共用核心模組
+
+decoder-server.py、parser-server.py、parser-api/parser-server.py 與批次工具共用的程式碼都放在這裡，
+避免同一份邏輯在多個伺服器中各自維護。
+
+- google_url: Google 重定向 / RSS 文章網址解碼
+- canonical_url: 網址正規化（追蹤參數、域名大小寫、預設埠、IDN）
+- feeds:      RSS / Atom / sitemap 匯入（只解析新文章，黑名單網域使用 feed 摘要）
+- storage_state: 每個域名的瀏覽器狀態快取（動態渲染沿用 cookie 同意等狀態）
+- routing:    依域名決定解析方式（黑名單、動態、靜態）
+- fetch:      靜態（httpx）與 Playwright 下載
+- extract:    trafilatura 內容提取
+- pipeline:   parse(url, options) -> ParseResult（路由 + 重試 + 自動降級）
+- browser_pool: 重用已啟動的 Chromium（批次工具 --local 模式）
+- compression: 回應 gzip / br 壓縮 middleware
+- server:     FastAPI app（create_app()；兩個 parser-server.py 只建立 app 與啟動）
+- serialization: JSON 序列化（orjson，沒有時退回標準庫）；responses: FastJSONResponse
+
+各子模組獨立匯入（例如 from parser_core.pipeline import parse），
+decoder-server.py 只匯入 google_url，不會載入 trafilatura 與 Playwright。
+"""
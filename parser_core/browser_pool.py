@@ -0,0 +1,270 @@
+"""
+Playwright 瀏覽器池
+
+每次動態解析都啟動一個新的 Chromium 要花 1-3 秒。瀏覽器池保留最多 size 個已啟動的
+瀏覽器，每次請求只開新的 context（cookie/storage 互不共用），用完即關閉。
+
+- 瀏覽器在第一次需要時才啟動（lazy）
+- 斷線或使用超過 max_uses 次的瀏覽器會被關閉，下次借用時重新啟動（避免記憶體累積）
+- 同時借出的頁面數量不超過 size × pages_per_browser，取代每次啟動時的信號量
+- 借用中的請求被取消（客戶端斷線）時，context 關閉後立即歸還瀏覽器
+
+分頁模式（pages_per_browser > 1，PLAYWRIGHT_PAGES_PER_BROWSER）：每個 Chromium 程序的記憶體成本
+遠高於一個分頁，同一個瀏覽器同時借給多個請求，各自在獨立的 context 中渲染。
+已啟動且還有空位的瀏覽器優先借出，都滿了才啟動下一個；瀏覽器改用多進程啟動參數（TAB_CHROMIUM_ARGS），
+每個頁面的記憶體由 render_page 的看門狗監控（page_memory_mb，單頁模式為 0 不監控）。1 GB 的容器可以用 1 個瀏覽器 × 8 個分頁取代 2 個單頁瀏覽器。
+
+使用方式：
+
+    pool = BrowserPool(size=2)
+    async with pool.browser() as browser:
+        html = await render_page(browser, url)
+    await pool.close()
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+from parser_core.fetch import (CHROMIUM_ARGS, PLAYWRIGHT_CONCURRENCY, PLAYWRIGHT_PAGE_MEMORY_MB,
+                               PLAYWRIGHT_PAGES_PER_BROWSER, TAB_CHROMIUM_ARGS, WATCHDOG_STATS,
+                               cleanup_chromium_temp)
+
+
+class _Slot:
+    """池中的一個瀏覽器位置"""
+
+    def __init__(self):
+        self.browser = None
+        # 借出過的頁面數（達到 max_uses 後不再借出，最後一個頁面歸還時關閉瀏覽器）
+        self.uses = 0
+        # 目前借出中的頁面數
+        self.active = 0
+        # 啟動瀏覽器時持有（同一位置的其他請求等待同一次啟動）
+        self.lock = asyncio.Lock()
+
+
+class BrowserPool:
+    """固定大小的 Chromium 瀏覽器池（每個瀏覽器可同時服務 pages_per_browser 個頁面）"""
+
+    def __init__(self, size: int = PLAYWRIGHT_CONCURRENCY, max_uses: int = 50,
+                 launch_args: Optional[List[str]] = None, pages_per_browser: int = PLAYWRIGHT_PAGES_PER_BROWSER):
+        """
+        Args:
+            size: 最多同時啟動的瀏覽器數量
+            max_uses: 每個瀏覽器最多服務幾次請求後重新啟動
+            launch_args: Chromium 啟動參數（預設 CHROMIUM_ARGS；分頁模式為 TAB_CHROMIUM_ARGS）
+            pages_per_browser: 每個瀏覽器同時渲染的頁面數
+        """
+        self.size = max(1, size)
+        self.pages_per_browser = max(1, pages_per_browser)
+        self.max_uses = max_uses
+        if launch_args is None:
+            launch_args = CHROMIUM_ARGS if self.pages_per_browser == 1 else TAB_CHROMIUM_ARGS
+        self.launch_args = launch_args
+        # 分頁模式才監控頁面記憶體（fetch_with_playwright 傳給 render_page）
+        self.page_memory_mb = PLAYWRIGHT_PAGE_MEMORY_MB if self.pages_per_browser > 1 else 0
+        self.launches = 0
+        self.last_launch_error: Optional[str] = None
+        self._playwright = None
+        self._start_lock = asyncio.Lock()
+        self._slots = [_Slot() for _ in range(self.size)]
+        # 等待空位的請求（有頁面歸還時全部喚醒重新挑選）
+        self._waiters: List[asyncio.Future] = []
+        self._in_use = 0
+        self._closed = False
+        # 借用中的任務 → 借到瀏覽器的時間（取消時用來計算佔用了多久）
+        self._holders: Dict[asyncio.Task, float] = {}
+        self.cancelled = 0
+
+    async def _ensure_playwright(self):
+        async with self._start_lock:
+            if self._playwright is None:
+                # 第一次啟動瀏覽器時才匯入 Playwright
+                from playwright.async_api import async_playwright
+                self._playwright = await async_playwright().start()
+        return self._playwright
+
+    async def _launch(self):
+        playwright = await self._ensure_playwright()
+        print(f"[BrowserPool] 啟動瀏覽器...")
+        started = time.monotonic()
+        try:
+            browser = await playwright.chromium.launch(headless=True, args=self.launch_args)
+        except Exception as e:
+            self.last_launch_error = f"{type(e).__name__}: {e}"
+            raise
+        self.launches += 1
+        self.last_launch_error = None
+        print(f"[BrowserPool] ✅ 瀏覽器已啟動（{time.monotonic() - started:.1f} 秒）")
+        return browser
+
+    @staticmethod
+    async def _close_browser(browser):
+        try:
+            await browser.close()
+        except Exception:
+            pass
+
+    def _pick(self) -> Optional[_Slot]:
+        """挑選還有空位的位置：已啟動（或啟動中）的瀏覽器優先（借出中頁面最少的），都滿了才用未啟動的位置"""
+        available = [slot for slot in self._slots
+                     if slot.active < self.pages_per_browser and slot.uses < self.max_uses]
+        launched = [slot for slot in available if slot.browser is not None or slot.active]
+        candidates = launched or available
+        return min(candidates, key=lambda slot: slot.active) if candidates else None
+
+    async def _acquire(self, timeout: Optional[float] = None) -> _Slot:
+        """
+        等到有空位為止（挑選與登記之間沒有 await，不會被其他請求搶走）
+
+        逾時只會發生在等待喚醒時，此時還沒有登記任何位置；不用 wait_for 包住整個 _acquire，
+        否則可能在登記之後才逾時取消，位置就永遠不會歸還。
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self._closed:
+                raise RuntimeError("BrowserPool 已關閉")
+            slot = self._pick()
+            if slot is not None:
+                slot.active += 1
+                slot.uses += 1
+                return slot
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise TimeoutError(f"{timeout:.1f} 秒內沒有可用的瀏覽器")
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter, remaining)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"{timeout:.1f} 秒內沒有可用的瀏覽器")
+            finally:
+                self._waiters.remove(waiter)
+
+    def _wake(self):
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def _release(self, slot: _Slot):
+        """歸還一個頁面；瀏覽器沒有借出中的頁面且需要淘汰時關閉"""
+        slot.active -= 1
+        if slot.active == 0:
+            browser = slot.browser
+            if browser is None:
+                # 啟動失敗：下次借用時重新啟動
+                slot.uses = 0
+            elif self._closed or slot.uses >= self.max_uses or not browser.is_connected():
+                slot.browser = None
+                slot.uses = 0
+                await self._close_browser(browser)
+                # 其他瀏覽器還在執行時不清理 /tmp（會刪掉它們的設定檔目錄）
+                if not any(other.browser is not None for other in self._slots):
+                    cleanup_chromium_temp()
+        self._wake()
+
+    @asynccontextmanager
+    async def browser(self, timeout: Optional[float] = None):
+        """
+        借用一個已啟動的瀏覽器（池滿時等待）
+
+        分頁模式下同一個瀏覽器可能同時借給其他請求，使用者只能開關自己的 context，不可關閉瀏覽器。
+
+        Args:
+            timeout: 最多等待幾秒（None 為一直等待）
+
+        Raises:
+            TimeoutError: 超過 timeout 仍沒有可用的瀏覽器
+        """
+        if self._closed:
+            raise RuntimeError("BrowserPool 已關閉")
+
+        slot = await self._acquire(timeout)
+        self._in_use += 1
+        task = asyncio.current_task()
+        self._holders[task] = time.monotonic()
+        try:
+            async with slot.lock:
+                if slot.browser is None or not slot.browser.is_connected():
+                    if slot.browser is not None:
+                        await self._close_browser(slot.browser)
+                        slot.browser = None
+                    slot.browser = await self._launch()
+            yield slot.browser
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                self.cancelled += 1
+            raise
+        finally:
+            self._in_use -= 1
+            self._holders.pop(task, None)
+            await self._release(slot)
+
+    def holding(self, task: asyncio.Task) -> Optional[float]:
+        """task 正在借用瀏覽器時回傳已借用的秒數，否則為 None"""
+        borrowed_at = self._holders.get(task)
+        return None if borrowed_at is None else time.monotonic() - borrowed_at
+
+    async def warm_up(self, count: int = 1) -> int:
+        """
+        預先啟動瀏覽器
+
+        Args:
+            count: 要啟動的數量（最多 size 個）
+
+        Returns:
+            實際啟動的數量
+        """
+        launched = 0
+        for slot in self._slots[:min(count, self.size)]:
+            async with slot.lock:
+                if slot.browser is None:
+                    slot.browser = await self._launch()
+                    launched += 1
+        return launched
+
+    def stats(self) -> Dict[str, Any]:
+        """池的目前狀態"""
+        return {
+            "size": self.size,
+            "pages_per_browser": self.pages_per_browser,
+            "in_use": self._in_use,
+            "launched": sum(1 for slot in self._slots if slot.browser is not None),
+            "waiting": len(self._waiters),
+            "total_launches": self.launches,
+            "cancelled": self.cancelled,
+            "page_memory_limit_mb": self.page_memory_mb or None,
+            "page_memory_killed": WATCHDOG_STATS["killed"],
+            "last_launch_error": self.last_launch_error,
+        }
+
+    async def close(self, grace: float = 5.0):
+        """
+        關閉所有瀏覽器與 Playwright driver
+
+        借用中的任務先等 grace 秒讓它們歸還，還沒歸還的取消後再等它們收尾（關閉 context、歸還瀏覽器），
+        最後才停止 Playwright，避免在頁面還在使用時就把 driver 關掉。
+
+        Args:
+            grace: 等待借用中的任務自行歸還的秒數
+        """
+        self._closed = True
+        self._wake()
+        holders = [task for task in self._holders if task is not asyncio.current_task()]
+        if holders:
+            _, pending = await asyncio.wait(holders, timeout=grace)
+            if pending:
+                print(f"[BrowserPool] ⚠️ 取消 {len(pending)} 個仍在借用瀏覽器的任務")
+                for task in pending:
+                    task.cancel()
+                await asyncio.wait(pending, timeout=grace)
+        for slot in self._slots:
+            if slot.browser is not None:
+                browser, slot.browser = slot.browser, None
+                await self._close_browser(browser)
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+        cleanup_chromium_temp()
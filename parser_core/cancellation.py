@@ -0,0 +1,130 @@
+"""
+客戶端斷線時取消解析
+
+n8n 的 HTTP 節點逾時後會直接斷線，但伺服器仍會把靜態重試與 Playwright 跑完，
+佔著瀏覽器池的位置做沒有人會讀的工作。run_until_disconnected() 把解析放在子任務中執行，
+每 poll_interval 秒檢查一次客戶端是否已斷線；斷線時取消子任務：
+
+- 取消在目前的 await（下載、等待瀏覽器、page.goto...）立即生效，不等到逾時
+- render_page 的 finally 關閉 context，BrowserPool 隨即歸還瀏覽器給下一個請求
+- CancellationStats 記錄取消次數、已浪費的工作時間與提早釋放的瀏覽器時間（/health 回報）
+
+使用方式（FastAPI）：
+
+    @app.post("/api/parse")
+    async def parse_url(request: ParseRequest, raw_request: Request):
+        deadline = Deadline.from_ms(request.deadline_ms)
+        result = await run_until_disconnected(
+            raw_request, parse(request.url, deadline=deadline, browser_pool=pool),
+            stats=stats, deadline=deadline, browser_pool=pool
+        )
+
+已送進 ProcessPoolExecutor 的 trafilatura 提取無法中斷，會在背景跑完後丟棄結果。
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Dict, Optional
+
+from parser_core.deadline import Deadline
+from parser_core.pipeline import ParseError
+
+# 檢查客戶端是否斷線的間隔（秒）
+DISCONNECT_POLL_INTERVAL = float(os.getenv('DISCONNECT_POLL_INTERVAL', '0.5'))
+
+
+class ClientDisconnected(ParseError):
+    """客戶端已斷線，解析已取消（HTTP 499，回應不會被讀取）"""
+
+    def __init__(self, detail: str):
+        super().__init__(detail, status_code=499)
+
+
+class CancellationStats:
+    """因客戶端斷線而取消的解析統計"""
+
+    def __init__(self):
+        self.cancelled = 0                    # 取消的請求數
+        self.cancelled_with_browser = 0       # 取消時正在佔用瀏覽器的請求數
+        self.cancelled_work_seconds = 0.0     # 取消前已經花費的時間（浪費掉的工作）
+        self.reclaimed_slot_seconds = 0.0     # 瀏覽器位置原本最多還會被佔用的時間（剩餘時間預算）
+        self.release_seconds = 0.0            # 從取消到 context 關閉、瀏覽器歸還的時間
+        self.by_endpoint: Dict[str, int] = {}
+
+    def record(self, endpoint: str, work_seconds: float, release_seconds: float,
+               held_browser: bool, reclaimed_seconds: Optional[float]):
+        self.cancelled += 1
+        self.by_endpoint[endpoint] = self.by_endpoint.get(endpoint, 0) + 1
+        self.cancelled_work_seconds += work_seconds
+        self.release_seconds += release_seconds
+        if held_browser:
+            self.cancelled_with_browser += 1
+            self.reclaimed_slot_seconds += reclaimed_seconds or 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cancelled": self.cancelled,
+            "cancelled_with_browser": self.cancelled_with_browser,
+            "by_endpoint": dict(self.by_endpoint),
+            "cancelled_work_seconds": round(self.cancelled_work_seconds, 2),
+            "reclaimed_slot_seconds": round(self.reclaimed_slot_seconds, 2),
+            "avg_release_ms": round(self.release_seconds / self.cancelled * 1000, 1) if self.cancelled else None,
+        }
+
+
+async def run_until_disconnected(
+    request,
+    awaitable: Awaitable,
+    stats: Optional[CancellationStats] = None,
+    endpoint: str = "",
+    deadline: Optional[Deadline] = None,
+    browser_pool=None,
+    poll_interval: float = DISCONNECT_POLL_INTERVAL
+):
+    """
+    執行 awaitable，客戶端斷線時取消它
+
+    Args:
+        request: Starlette / FastAPI 的 Request（用 is_disconnected() 檢查）
+        awaitable: 要執行的解析（例如 parse(...)）
+        stats: 記錄取消統計（None 則不記錄）
+        endpoint: 統計用的端點名稱
+        deadline: 解析使用的時間預算（估計提早釋放的瀏覽器時間）
+        browser_pool: 解析使用的 BrowserPool（判斷取消時是否佔用瀏覽器）
+        poll_interval: 檢查斷線的間隔（秒）
+
+    Returns:
+        awaitable 的結果
+
+    Raises:
+        ClientDisconnected: 客戶端在解析完成前斷線
+    """
+    task = asyncio.ensure_future(awaitable)
+    started = time.monotonic()
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                break
+    except BaseException:
+        # 外層被取消（例如伺服器關閉）時，子任務也不能繼續佔用資源
+        task.cancel()
+        raise
+
+    held = browser_pool.holding(task) if browser_pool is not None else None
+    remaining = deadline.remaining() if deadline is not None else None
+    cancelled_at = time.monotonic()
+    task.cancel()
+    # 等子任務的 finally（關閉 context、歸還瀏覽器）跑完；wait 不會拋出子任務的例外
+    await asyncio.wait({task})
+    release_seconds = time.monotonic() - cancelled_at
+    work_seconds = cancelled_at - started
+
+    print(f"[取消] 🔌 客戶端已斷線，取消 {endpoint or '解析'}（已執行 {work_seconds:.1f} 秒"
+          f"{f'，釋放佔用 {held:.1f} 秒的瀏覽器' if held is not None else ''}）")
+    if stats is not None:
+        stats.record(endpoint, work_seconds, release_seconds, held is not None, remaining)
+    raise ClientDisconnected(f"客戶端已斷線，已取消解析（已執行 {work_seconds:.1f} 秒）")
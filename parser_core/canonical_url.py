@@ -0,0 +1,155 @@
+"""
+網址正規化（canonicalization）
+
+同一篇文章常帶著不同的追蹤參數（utm_*、fbclid、Google 的 ved / usg...）、大小寫不同的域名、
+:443 預設埠或 #fragment 進來，快取、快照與近似重複比對都會把它們當成不同的文章。
+canonicalize_url() 在解析入口執行一次，之後路由、快照、dedup 與回應都使用同一個網址：
+
+- Google 重定向 / RSS 文章網址先解出真實網址（google_url.decode_google_url）
+- scheme 與域名轉小寫，去掉域名結尾的 "."，國際化域名（IDN）轉成 punycode（xn--）
+- 去掉預設埠（http:80、https:443）與 #fragment，空路徑補成 "/"
+- 去掉追蹤參數（URL_TRACKING_PARAMS，"名稱*" 表示前綴），其餘參數保持原本順序與內容
+- 百分比編碼統一：未編碼的非 ASCII 字元編碼，%xx 轉大寫
+
+    canonicalize_url("https://WWW.Example.com:443/a?utm_source=x&id=1#top")
+    # 'https://www.example.com/a?id=1'
+
+只使用標準函式庫（和 google_url 一樣可以在輕量級服務中匯入）；結果以 LRU 快取。
+
+環境變數：
+- URL_TRACKING_PARAMS：要去掉的參數，逗號分隔（覆蓋預設清單；設為空字串則不去掉任何參數）
+"""
+
+import os
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, Tuple
+from urllib.parse import quote, unquote_plus, urlsplit, urlunsplit
+
+from parser_core.google_url import DECODE_CACHE_SIZE, decode_google_url
+
+# 預設去掉的追蹤參數（"名稱*" 表示前綴比對）
+DEFAULT_TRACKING_PARAMS = (
+    "utm_*", "fbclid", "gclid", "dclid", "gbraid", "wbraid", "msclkid", "yclid", "twclid",
+    "igshid", "mc_cid", "mc_eid", "_ga", "_gl", "ved", "usg",
+)
+
+# Google Alerts 重定向網址的殘留參數：rct / sa / ct / cd 在一般網站也可能是正常參數，
+# 只有同時出現 usg 或 ved（Google 簽章）時才視為殘留一併去掉
+GOOGLE_REMNANT_PARAMS = frozenset({"rct", "sa", "ct", "cd", "ei", "oc", "esrc", "source", "url"})
+GOOGLE_REMNANT_MARKERS = frozenset({"usg", "ved"})
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# 路徑與查詢參數中保留原樣的字元（RFC 3986 的保留字元 + 既有的 %xx）
+_PATH_SAFE = "/%:@!$&'()*+,;=-._~"
+_QUERY_SAFE = _PATH_SAFE + "?"
+_ESCAPE_RE = re.compile(r"%[0-9a-fA-F]{2}")
+
+
+def parse_tracking_params(spec: str) -> Tuple[FrozenSet[str], Tuple[str, ...]]:
+    """
+    解析追蹤參數設定
+
+    Args:
+        spec: 逗號分隔的參數名稱，例如 "utm_*,fbclid,ved"
+
+    Returns:
+        (完全比對的名稱集合, 前綴列表)，名稱皆為小寫
+    """
+    names = [name.strip().lower() for name in spec.split(",") if name.strip()]
+    exact = frozenset(name for name in names if not name.endswith("*"))
+    prefixes = tuple(name[:-1] for name in names if name.endswith("*"))
+    return exact, prefixes
+
+
+_TRACKING_EXACT, _TRACKING_PREFIXES = parse_tracking_params(
+    os.getenv("URL_TRACKING_PARAMS", ",".join(DEFAULT_TRACKING_PARAMS))
+)
+
+
+def _normalize_escapes(value: str, safe: str) -> str:
+    """未編碼的字元（空白、非 ASCII）編碼，既有的 %xx 統一為大寫"""
+    return _ESCAPE_RE.sub(lambda m: m.group(0).upper(), quote(value, safe=safe))
+
+
+def _is_tracking(name: str) -> bool:
+    return name in _TRACKING_EXACT or name.startswith(_TRACKING_PREFIXES)
+
+
+def strip_tracking_params(query: str) -> str:
+    """
+    去掉查詢字串中的追蹤參數
+
+    直接處理原始字串（不經過 parse_qsl / urlencode），保留的參數順序與編碼不變，
+    簽章網址（例如 CDN 的 token）不會因為重新編碼而失效。
+    """
+    if not query:
+        return ""
+    pairs = [pair for pair in query.split("&") if pair]
+    names = [unquote_plus(pair.split("=", 1)[0]).lower() for pair in pairs]
+    google_remnants = not GOOGLE_REMNANT_MARKERS.isdisjoint(names)
+    kept = [
+        _normalize_escapes(pair, _QUERY_SAFE)
+        for pair, name in zip(pairs, names)
+        if not _is_tracking(name) and not (google_remnants and name in GOOGLE_REMNANT_PARAMS)
+    ]
+    return "&".join(kept)
+
+
+def _ascii_host(host: str) -> str:
+    """國際化域名轉成 punycode；無法轉換時（例如 IDNA 2003 不支援的字元）保留原樣"""
+    if host.isascii():
+        return host
+    try:
+        return host.encode("idna").decode("ascii")
+    except UnicodeError:
+        return host
+
+
+@lru_cache(maxsize=DECODE_CACHE_SIZE)
+def canonicalize_url(url: str) -> str:
+    """
+    產生正規化網址（快取、快照、dedup 與路由使用的鍵）
+
+    Args:
+        url: 原始網址（可以是 Google 重定向網址）
+
+    Returns:
+        正規化後的網址；不是 http(s) 網址或無法解析時回傳去掉前後空白的原網址
+    """
+    url = decode_google_url(url.strip())
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        # 無效的埠號或 IPv6 位址，交給下載時回報錯誤
+        return url
+
+    scheme = parts.scheme.lower()
+    host = parts.hostname
+    if scheme not in DEFAULT_PORTS or not host:
+        return url
+
+    host = _ascii_host(host.rstrip("."))
+    if ":" in host:
+        host = f"[{host}]"  # IPv6
+    netloc = host
+    if "@" in parts.netloc:
+        netloc = parts.netloc.rsplit("@", 1)[0] + "@" + netloc
+    if port is not None and port != DEFAULT_PORTS[scheme]:
+        netloc = f"{netloc}:{port}"
+
+    path = _normalize_escapes(parts.path or "/", _PATH_SAFE)
+    return urlunsplit((scheme, netloc, path, strip_tracking_params(parts.query), ""))
+
+
+def canonical_cache_info() -> Dict[str, int]:
+    """LRU 快取統計（用於 /health）"""
+    info = canonicalize_url.cache_info()
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "max_size": info.maxsize
+    }
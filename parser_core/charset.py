@@ -0,0 +1,138 @@
+"""
+HTML 位元組的字元編碼判斷與解碼
+
+httpx 的 response.text 在 Content-Type 沒有 charset 時一律以 UTF-8（errors="replace"）解碼，
+Big5 / GBK 的台灣與中國新聞網站會變成亂碼，trafilatura 提取一次才發現是垃圾。
+decode_html() 只看前幾 KB 與 headers，依序嘗試：
+
+1. BOM（UTF-8 / UTF-16）
+2. Content-Type header 的 charset
+3. 開頭的 <meta charset> / <meta http-equiv="Content-Type"> / <?xml encoding?>
+4. UTF-8（大多數網站）
+5. 都失敗時才用 charset_normalizer 逐字偵測（trafilatura 的相依套件；較慢）
+
+每個候選都以 strict 模式解碼，失敗（例如 header 宣稱 UTF-8 但內容是 Big5）就換下一個，
+成功的那一次就是最終結果；cp1252 這類任何位元組都能解碼的編碼排在最後。
+
+編碼名稱比照瀏覽器（WHATWG Encoding Standard）：big5 → big5hkscs、gb2312 / gbk → gb18030、
+iso-8859-1 / ascii → cp1252，避免 Big5 擴充字、GBK 罕用字在 Python 的嚴格編碼表中解碼失敗。
+"""
+
+import codecs
+import re
+from typing import List, Optional, Tuple
+
+# 尋找 <meta charset> 的範圍（WHATWG 規範為 1024 bytes，實際網站常放在較後面的位置）
+SNIFF_BYTES = 4096
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+?charset\s*=\s*["']?\s*([a-zA-Z0-9_:.+-]+)""", re.IGNORECASE)
+_XML_ENCODING_RE = re.compile(rb"""^\s*<\?xml[^>]+encoding\s*=\s*["']([a-zA-Z0-9_:.+-]+)""", re.IGNORECASE)
+_HEADER_CHARSET_RE = re.compile(r"""charset\s*=\s*["']?\s*([a-zA-Z0-9_:.+-]+)""", re.IGNORECASE)
+
+# 瀏覽器實際使用的超集編碼
+_SUPERSETS = {
+    "big5": "big5hkscs",
+    "cp950": "big5hkscs",
+    "gb2312": "gb18030",
+    "gbk": "gb18030",
+    "latin-1": "cp1252",
+    "iso8859-1": "cp1252",
+    "ascii": "cp1252",
+    "shift_jis": "cp932",
+    "euc_kr": "cp949",
+}
+
+# 任何位元組都能解碼成功的單位元組編碼：strict 解碼無法驗證，排在其他候選之後
+# （常見的錯誤設定：伺服器預設 header 為 ISO-8859-1，頁面實際是 Big5 或 UTF-8）
+_PERMISSIVE = {"cp1252", "latin-1", "iso8859-15"}
+
+
+def normalize_charset(name: Optional[str]) -> Optional[str]:
+    """
+    編碼名稱轉成 Python codec 名稱（含瀏覽器的超集對應）
+
+    Returns:
+        codec 名稱；不認識的名稱為 None
+    """
+    if not name:
+        return None
+    try:
+        codec = codecs.lookup(name.strip().strip("\"'")).name
+    except LookupError:
+        return None
+    if codec.startswith("utf-16"):
+        # 沒有 BOM 的 HTML 宣告 UTF-16 多半是錯的（ASCII 相容的 meta 標籤本身就讀得到），比照瀏覽器改用 UTF-8
+        return "utf-8"
+    return _SUPERSETS.get(codec, codec)
+
+
+def sniff_charsets(body: bytes, content_type: Optional[str] = None) -> List[str]:
+    """
+    依優先順序列出候選編碼（BOM、header、meta / XML 宣告，去除重複）
+
+    Args:
+        body: 回應內容
+        content_type: Content-Type header
+    """
+    for bom, codec in _BOMS:
+        if body.startswith(bom):
+            return [codec]
+
+    candidates = []
+    if content_type:
+        match = _HEADER_CHARSET_RE.search(content_type)
+        if match:
+            candidates.append(normalize_charset(match.group(1)))
+
+    head = body[:SNIFF_BYTES]
+    match = _XML_ENCODING_RE.search(head) or _META_CHARSET_RE.search(head)
+    if match:
+        candidates.append(normalize_charset(match.group(1).decode("ascii", "ignore")))
+
+    return list(dict.fromkeys(codec for codec in candidates if codec))
+
+
+def decode_html(body: bytes, content_type: Optional[str] = None) -> Tuple[str, str]:
+    """
+    判斷編碼並解碼
+
+    Args:
+        body: 回應內容（已解壓縮）
+        content_type: Content-Type header
+
+    Returns:
+        (文字, 使用的編碼)
+    """
+    candidates = sniff_charsets(body, content_type)
+    if "utf-8" not in candidates:
+        candidates.append("utf-8")
+    candidates.sort(key=lambda codec: codec in _PERMISSIVE)
+
+    for codec in candidates:
+        try:
+            text = body.decode(codec)
+        except UnicodeDecodeError:
+            continue
+        # BOM 不屬於內容
+        return (text[1:] if text.startswith("\ufeff") else text), codec
+
+    detected = _detect(body)
+    if detected:
+        return body.decode(detected, errors="replace"), detected
+    return body.decode(candidates[0], errors="replace"), candidates[0]
+
+
+def _detect(body: bytes) -> Optional[str]:
+    """最後手段：charset_normalizer 統計偵測（沒有安裝時回傳 None）"""
+    try:
+        from charset_normalizer import from_bytes
+    except ImportError:
+        return None
+    best = from_bytes(body[:65536]).best()
+    return normalize_charset(best.encoding) if best is not None else None
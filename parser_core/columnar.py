@@ -0,0 +1,201 @@
+"""
+批次解析結果的欄式（Parquet）輸出
+
+JSON（indent=2）與 xlsx 寫入慢、累積幾個月後重新讀取更慢。這裡把結果攤平成
+固定欄位，寫成依抓取日期分區的 Parquet 檔：
+
+    <root>/scrape_date=2025-11-15/part-221324-1a2b3c4d.parquet
+
+routing_decision、rendering_method 等重複值很多的欄位使用 dictionary encoding。
+可直接用 pandas.read_parquet(root) 或 pyarrow.dataset 讀取整個目錄（含分區欄）。
+
+pyarrow 為選用套件：未安裝時 parquet_available() 回傳 False，寫入時拋出 RuntimeError。
+"""
+
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - 選用套件
+    pa = None
+    pq = None
+
+ROW_GROUP_SIZE = 10_000
+
+# 批次結果（n8n-batch-parser.py）攤平後的欄位：(欄位名稱, 型別, 是否 dictionary encoding)
+BATCH_RESULT_COLUMNS = [
+    ('id', 'string', False),
+    ('url', 'string', False),
+    ('canonical_url', 'string', False),
+    ('success', 'bool_', False),
+    ('status_code', 'int32', False),
+    ('elapsed_time', 'float64', False),
+    ('attempts', 'int32', False),
+    ('routing_decision', 'string', True),
+    ('rendering_method', 'string', True),
+    ('domain', 'string', True),
+    ('title', 'string', False),
+    ('author', 'string', False),
+    ('date_published', 'string', False),
+    ('word_count', 'int64', False),
+    ('language', 'string', True),
+    ('text_content', 'string', False),
+    ('error', 'string', False),
+    ('duplicate_of', 'string', False),
+    ('simhash', 'string', False),
+    ('parsed_at', 'string', False),
+    ('failed_at', 'string', False),
+    ('extra', 'string', False),
+]
+
+_RESULT_KEYS = {
+    'id', 'url', 'canonical_url', 'success', 'status_code', 'elapsed_time', 'attempts', 'routing_decision',
+    'rendering_method', 'parsed_data', 'error', 'parsed_at', 'failed_at',
+    'duplicate_of', 'duplicate_distance', 'simhash',
+}
+
+
+def parquet_available() -> bool:
+    """是否已安裝 pyarrow"""
+    return pa is not None
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError('Parquet 輸出需要 pyarrow：pip install pyarrow')
+
+
+def build_schema(columns: List[tuple]) -> 'pa.Schema':
+    """
+    依欄位定義建立 Arrow schema
+
+    Args:
+        columns: (欄位名稱, 型別名稱, 是否 dictionary encoding) 的列表
+
+    Returns:
+        pyarrow Schema
+    """
+    _require_pyarrow()
+    fields = []
+    for name, type_name, dictionary in columns:
+        arrow_type = getattr(pa, type_name)()
+        if dictionary:
+            arrow_type = pa.dictionary(pa.int32(), arrow_type)
+        fields.append(pa.field(name, arrow_type))
+    return pa.schema(fields)
+
+
+def flatten_batch_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    把一筆批次結果攤平成 BATCH_RESULT_COLUMNS 的欄位
+
+    輸入資料中其他的欄位（n8n 帶進來的標題、來源等）以 JSON 字串存在 extra。
+    """
+    parsed = result.get('parsed_data') or {}
+    url = result.get('url') or ''
+    extra = {key: value for key, value in result.items() if key not in _RESULT_KEYS}
+    article_id = result.get('id')
+    return {
+        'id': str(article_id) if article_id is not None else None,
+        'url': url,
+        'canonical_url': result.get('canonical_url'),
+        'success': bool(result.get('success')),
+        'status_code': result.get('status_code'),
+        'elapsed_time': result.get('elapsed_time'),
+        'attempts': result.get('attempts'),
+        'routing_decision': result.get('routing_decision'),
+        'rendering_method': result.get('rendering_method') or parsed.get('rendering_method'),
+        'domain': parsed.get('domain') or urlparse(url).netloc.lower() or None,
+        'title': parsed.get('title'),
+        'author': parsed.get('author'),
+        'date_published': parsed.get('date_published'),
+        'word_count': parsed.get('word_count'),
+        'language': parsed.get('language'),
+        'text_content': parsed.get('text_content'),
+        'error': result.get('error'),
+        'duplicate_of': result.get('duplicate_of'),
+        'simhash': result.get('simhash'),
+        'parsed_at': result.get('parsed_at'),
+        'failed_at': result.get('failed_at'),
+        'extra': json.dumps(extra, ensure_ascii=False) if extra else None,
+    }
+
+
+def partition_path(root_dir: str, scrape_date: Optional[str] = None) -> str:
+    """
+    產生本次寫入的檔案路徑（<root>/scrape_date=YYYY-MM-DD/part-<時間>-<隨機>.parquet）
+
+    同一天多次執行會各自寫入新檔，不會覆蓋。
+    """
+    now = datetime.now()
+    scrape_date = scrape_date or now.strftime('%Y-%m-%d')
+    directory = os.path.join(root_dir, f'scrape_date={scrape_date}')
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"part-{now.strftime('%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet")
+
+
+def write_parquet(
+    rows: Iterable[Dict[str, Any]],
+    root_dir: str,
+    columns: List[tuple],
+    scrape_date: Optional[str] = None,
+    row_group_size: int = ROW_GROUP_SIZE,
+) -> Dict[str, Any]:
+    """
+    分批把資料列寫入一個日期分區的 Parquet 檔（zstd 壓縮）
+
+    一次只在記憶體中保留 row_group_size 筆。
+
+    Args:
+        rows: 已攤平的資料列（dict，鍵為欄位名稱）
+        root_dir: 資料集根目錄
+        columns: 欄位定義（見 BATCH_RESULT_COLUMNS）
+        scrape_date: 分區日期（YYYY-MM-DD，預設為今天）
+        row_group_size: 每個 row group 的筆數
+
+    Returns:
+        {"path": 檔案路徑, "rows": 筆數}
+    """
+    _require_pyarrow()
+    schema = build_schema(columns)
+    names = [name for name, _, _ in columns]
+    path = partition_path(root_dir, scrape_date)
+    total = 0
+
+    def flush(buffer: List[Dict[str, Any]]):
+        arrays = {name: [row.get(name) for row in buffer] for name in names}
+        writer.write_table(pa.Table.from_pydict(arrays, schema=schema))
+
+    with pq.ParquetWriter(path, schema, compression='zstd') as writer:
+        buffer = []
+        for row in rows:
+            buffer.append(row)
+            if len(buffer) >= row_group_size:
+                flush(buffer)
+                total += len(buffer)
+                buffer = []
+        if buffer or total == 0:
+            flush(buffer)
+            total += len(buffer)
+
+    return {'path': path, 'rows': total}
+
+
+def write_batch_results_parquet(
+    results: Iterable[Dict[str, Any]],
+    root_dir: str,
+    scrape_date: Optional[str] = None,
+) -> Dict[str, Any]:
+    """把 n8n-batch-parser.py 的結果寫成日期分區的 Parquet 檔"""
+    return write_parquet(
+        (flatten_batch_result(result) for result in results),
+        root_dir,
+        BATCH_RESULT_COLUMNS,
+        scrape_date=scrape_date,
+    )
@@ -0,0 +1,86 @@
+"""
+請求的時間預算（deadline）
+
+一次 /api/parse 可能經過多次靜態重試（每次 30 秒）、兩次 Playwright（goto 90 秒 + wait_for 20 秒
++ 延遲），總共好幾分鐘；n8n 的 HTTP 節點早就放棄了，伺服器卻還佔著瀏覽器。
+
+Deadline 在請求開始時建立，一路傳到下載與 Playwright：
+
+- timeout(預設值)：各步驟的逾時縮短到剩餘時間以內
+- can_afford(秒數)：剩餘時間不夠時跳過重試、等待與非必要步驟
+- 時間用完時由 pipeline 回傳逾時結果（有靜態結果時回傳部分結果），不再佔用資源
+
+Deadline(None) 代表沒有限制，所有方法都回傳原本的預設值。
+"""
+
+import os
+import time
+from typing import Optional
+
+# 伺服器預設的時間預算（毫秒），0 表示不限制
+DEFAULT_DEADLINE_MS = int(os.getenv('PARSE_DEADLINE_MS', '120000'))
+
+
+class Deadline:
+    """單一請求的截止時間（time.monotonic）"""
+
+    def __init__(self, budget_seconds: Optional[float] = None):
+        """
+        Args:
+            budget_seconds: 時間預算（秒）；None 或 <= 0 代表不限制
+        """
+        self.budget_seconds = budget_seconds if budget_seconds and budget_seconds > 0 else None
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + self.budget_seconds if self.budget_seconds else None
+
+    @classmethod
+    def from_ms(cls, deadline_ms: Optional[int] = None) -> 'Deadline':
+        """由毫秒建立；None 時使用伺服器預設（PARSE_DEADLINE_MS）"""
+        if deadline_ms is None:
+            deadline_ms = DEFAULT_DEADLINE_MS
+        return cls(deadline_ms / 1000 if deadline_ms > 0 else None)
+
+    @property
+    def limited(self) -> bool:
+        return self.expires_at is not None
+
+    def elapsed(self) -> float:
+        """已經過的秒數"""
+        return time.monotonic() - self.started_at
+
+    def remaining(self) -> Optional[float]:
+        """剩餘秒數（不會小於 0）；不限制時為 None"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def can_afford(self, seconds: float) -> bool:
+        """剩餘時間是否還夠 seconds 秒"""
+        remaining = self.remaining()
+        return remaining is None or remaining >= seconds
+
+    def timeout(self, default: float, reserve: float = 0.0) -> float:
+        """
+        某個步驟可用的逾時秒數
+
+        Args:
+            default: 沒有時間限制時的逾時
+            reserve: 要保留給後續步驟（例如提取內容）的秒數
+
+        Returns:
+            min(default, 剩餘時間 - reserve)，不小於 0
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        return max(0.0, min(default, remaining - reserve))
+
+    def __repr__(self) -> str:
+        if not self.limited:
+            return "Deadline(unlimited)"
+        return f"Deadline(budget={self.budget_seconds:.1f}s, remaining={self.remaining():.1f}s)"
@@ -0,0 +1,205 @@
+"""
+近似重複文章偵測（SimHash + LSH）
+
+Google Alerts 常把同一篇通訊社稿件從幾十個網域送進來，每一份都被解析、儲存、再交給 LLM 摘要。
+每篇文章的 text_content 算出 64 位元 SimHash，放進最近文章的 LSH 索引；
+與既有文章的漢明距離不超過 max_distance 時視為近似重複，回傳最早那篇（canonical）的 ID。
+
+- 指紋：正規化後的字元 5-gram（中文沒有空白分詞，字元 n-gram 不分語言都適用），依出現次數加權
+- LSH：64 位元切成 max_distance + 1 段，距離 ≤ max_distance 的兩個指紋至少有一段完全相同（鴿籠原理），
+  只需比對同段的候選，不必和所有文章比較
+- 只保留最近 max_items 篇（最舊的先淘汰）；太短的文字（少於 MIN_TEXT_LENGTH 字）不計算指紋
+
+    index = NearDuplicateIndex()
+    match = index.check("article-001", parsed["text_content"])
+    match["duplicate_of"]   # None 或 canonical 文章 ID
+
+環境變數：
+- DEDUP_MAX_ITEMS：索引保留的文章數（預設 10000）
+- DEDUP_MAX_DISTANCE：視為重複的最大漢明距離（預設 3）
+- DEDUP_MODE：/api/parse-webhook 預設的處理方式 off / flag / skip（預設 flag）
+"""
+
+import hashlib
+import os
+import re
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from parser_core.extract import resolve_fields, select_fields
+
+DEDUP_MAX_ITEMS = int(os.getenv('DEDUP_MAX_ITEMS', '10000'))
+DEDUP_MAX_DISTANCE = int(os.getenv('DEDUP_MAX_DISTANCE', '3'))
+# 伺服器 webhook 的預設處理方式（請求未指定 dedup 時）
+DEDUP_MODE = os.getenv('DEDUP_MODE', 'flag')
+
+# 少於此字數的文字不計算指紋（短文字很容易誤判）
+MIN_TEXT_LENGTH = 200
+SHINGLE_SIZE = 5
+FINGERPRINT_BITS = 64
+
+# 重複文章的處理方式：flag 只標記，skip 另外移除正文欄位
+DEDUP_MODES = ("off", "flag", "skip")
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# 每個位元組值展開成 8 個 32 位元的計數欄位：累加後每個欄位就是該位元為 1 的權重總和
+_LANE_BITS = 32
+_LANE_MASK = (1 << _LANE_BITS) - 1
+_SPREAD = [sum(((byte >> bit) & 1) << (_LANE_BITS * bit) for bit in range(8)) for byte in range(256)]
+
+
+def _shingles(text: str) -> Counter:
+    """正規化（小寫、只留文字與數字、空白合一）後的字元 n-gram 與出現次數"""
+    normalized = " ".join(_TOKEN_RE.findall(text.lower()))
+    return Counter(normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1))
+
+
+def simhash(text: Optional[str]) -> Optional[int]:
+    """
+    計算 64 位元 SimHash
+
+    Returns:
+        指紋整數；文字太短時為 None
+    """
+    if not text or len(text) < MIN_TEXT_LENGTH:
+        return None
+    shingles = _shingles(text)
+    if not shingles:
+        return None
+
+    # 8 個位元組位置各一個累加器（避免對每個 n-gram 逐位元迴圈 64 次）
+    accumulators = [0] * (FINGERPRINT_BITS // 8)
+    total = 0
+    for shingle, weight in shingles.items():
+        digest = hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest()
+        for position, byte in enumerate(digest):
+            accumulators[position] += weight * _SPREAD[byte]
+        total += weight
+
+    fingerprint = 0
+    for position, accumulator in enumerate(accumulators):
+        for bit in range(8):
+            if 2 * ((accumulator >> (_LANE_BITS * bit)) & _LANE_MASK) > total:
+                fingerprint |= 1 << (position * 8 + bit)
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def drop_duplicate_content(data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """skip 模式：重複文章只保留元數據（title、url 等），不保留 content / text_content"""
+    return select_fields(data, resolve_fields(["metadata"]))
+
+
+class NearDuplicateIndex:
+    """最近文章的 SimHash LSH 索引"""
+
+    def __init__(self, max_items: int = DEDUP_MAX_ITEMS, max_distance: int = DEDUP_MAX_DISTANCE):
+        """
+        Args:
+            max_items: 最多保留的文章數（超過時淘汰最舊的）
+            max_distance: 視為近似重複的最大漢明距離
+        """
+        self.max_items = max_items
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        width = FINGERPRINT_BITS // bands
+        # 每段的 (位移, 遮罩)；最後一段包含除不盡的剩餘位元
+        self._bands: List[Tuple[int, int]] = [
+            (i * width, (1 << (width if i < bands - 1 else FINGERPRINT_BITS - i * width)) - 1)
+            for i in range(bands)
+        ]
+        self._fingerprints: "OrderedDict[str, int]" = OrderedDict()
+        self._order: Dict[str, int] = {}
+        self._added = 0
+        self._buckets: Dict[Tuple[int, int], Set[str]] = {}
+        self.checked = 0
+        self.duplicates = 0
+
+    def _keys(self, fingerprint: int) -> List[Tuple[int, int]]:
+        return [(band, (fingerprint >> shift) & mask) for band, (shift, mask) in enumerate(self._bands)]
+
+    def find(self, fingerprint: int, exclude: Optional[str] = None) -> Optional[Tuple[str, int]]:
+        """
+        找出最接近的近似重複文章
+
+        Returns:
+            (文章 ID, 漢明距離)；沒有時為 None（距離相同時取較早加入的文章）
+        """
+        candidates: Set[str] = set()
+        for key in self._keys(fingerprint):
+            candidates.update(self._buckets.get(key, ()))
+        candidates.discard(exclude)
+
+        best = None
+        for article_id in candidates:
+            distance = hamming_distance(fingerprint, self._fingerprints[article_id])
+            if distance <= self.max_distance:
+                rank = (distance, self._order[article_id])
+                if best is None or rank < best[0]:
+                    best = (rank, article_id)
+        return None if best is None else (best[1], best[0][0])
+
+    def add(self, article_id: str, fingerprint: int):
+        """加入索引（同一 ID 會更新指紋），超過 max_items 時淘汰最舊的"""
+        self.remove(article_id)
+        self._fingerprints[article_id] = fingerprint
+        self._order[article_id] = self._added
+        self._added += 1
+        for key in self._keys(fingerprint):
+            self._buckets.setdefault(key, set()).add(article_id)
+        while len(self._fingerprints) > self.max_items:
+            self.remove(next(iter(self._fingerprints)))
+
+    def remove(self, article_id: str):
+        fingerprint = self._fingerprints.pop(article_id, None)
+        if fingerprint is None:
+            return
+        del self._order[article_id]
+        for key in self._keys(fingerprint):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(article_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def check(self, article_id: str, text: Optional[str]) -> Dict[str, Any]:
+        """
+        檢查文章是否為近似重複；不是重複時加入索引（重複的文章不加入，canonical 永遠是最早的那篇）
+
+        Args:
+            article_id: 文章 ID（批次的 id 或 URL）
+            text: text_content
+
+        Returns:
+            {"simhash": 16 進位指紋或 None, "duplicate_of": canonical ID 或 None, "distance": 漢明距離或 None}
+        """
+        fingerprint = simhash(text)
+        if fingerprint is None:
+            return {"simhash": None, "duplicate_of": None, "distance": None}
+
+        self.checked += 1
+        match = self.find(fingerprint, exclude=article_id)
+        if match is not None:
+            self.duplicates += 1
+            return {"simhash": f"{fingerprint:016x}", "duplicate_of": match[0], "distance": match[1]}
+
+        self.add(article_id, fingerprint)
+        return {"simhash": f"{fingerprint:016x}", "duplicate_of": None, "distance": None}
+
+    def seed(self, article_id: str, simhash_hex: Optional[str]):
+        """以先前算好的指紋加入索引（例如從 checkpoint 恢復）"""
+        if simhash_hex:
+            self.add(article_id, int(simhash_hex, 16))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "items": len(self._fingerprints),
+            "max_items": self.max_items,
+            "max_distance": self.max_distance,
+            "checked": self.checked,
+            "duplicates": self.duplicates,
+        }
@@ -0,0 +1,172 @@
+"""
+文章內容提取（trafilatura）
+
+靜態與 Playwright 兩條路徑取得 HTML 後，都由 extract_article 轉成相同格式的 parsed_data。
+
+呼叫端可以只要部分欄位（fields=）與指定 content 的格式（format=）：
+content 不需要或 format 為 "text" 時，完全跳過第二次 trafilatura 格式化提取。
+
+trafilatura（連同 lxml、日期與語言偵測，約 100 ms）在第一次提取時才匯入，
+伺服器啟動預熱（parser_core.readiness）會提前做這件事。
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+# parsed_data 的欄位分組（fields= 可以使用組名或個別欄位名稱）
+FIELD_GROUPS = {
+    "metadata": ["title", "author", "date_published", "url", "domain", "description",
+                 "categories", "tags", "language"],
+    "text": ["text_content", "excerpt", "word_count"],
+    "content": ["content"],
+}
+ARTICLE_FIELDS = [name for group in FIELD_GROUPS.values() for name in group]
+
+# format= 對應的 trafilatura output_format（"text" 不需要額外提取）
+CONTENT_FORMATS = {
+    "xml": "xml",
+    "html": "html",
+    "markdown": "markdown",
+    "text": None,
+}
+DEFAULT_CONTENT_FORMAT = "xml"
+
+
+def resolve_fields(fields: Optional[Union[str, Iterable[str]]]) -> Optional[List[str]]:
+    """
+    展開 fields= 參數（組名 → 欄位），保留輸入順序並去除重複
+
+    Args:
+        fields: None（全部欄位）、逗號分隔字串或欄位/組名列表
+
+    Returns:
+        欄位名稱列表；None 代表全部欄位
+
+    Raises:
+        ValueError: 有未知的欄位名稱時
+    """
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(',')
+
+    resolved: List[str] = []
+    unknown = []
+    for name in (f.strip() for f in fields):
+        if not name:
+            continue
+        names = FIELD_GROUPS.get(name, [name])
+        if names[0] not in ARTICLE_FIELDS:
+            unknown.append(name)
+            continue
+        resolved.extend(n for n in names if n not in resolved)
+
+    if unknown:
+        raise ValueError(
+            f"未知的欄位: {', '.join(unknown)}（可用: {', '.join(dict.fromkeys(list(FIELD_GROUPS) + ARTICLE_FIELDS))}）"
+        )
+    return resolved or None
+
+
+def validate_content_format(content_format: Optional[str]) -> str:
+    """檢查 format= 參數，None 時使用預設的 xml"""
+    if content_format is None:
+        return DEFAULT_CONTENT_FORMAT
+    content_format = content_format.lower()
+    if content_format not in CONTENT_FORMATS:
+        raise ValueError(f"format 必須是 {', '.join(CONTENT_FORMATS)} 其中之一")
+    return content_format
+
+
+def content_output_format(fields: Optional[List[str]], content_format: str) -> Optional[str]:
+    """
+    要傳給 extract_article 的 trafilatura output_format
+
+    Returns:
+        None 代表不需要格式化提取（沒有要求 content 或 format 為 text）
+    """
+    if fields is not None and "content" not in fields:
+        return None
+    return CONTENT_FORMATS[content_format]
+
+
+def select_fields(parsed_data: Optional[Dict[str, Any]], fields: Optional[List[str]]) -> Optional[Dict[str, Any]]:
+    """只保留指定欄位（rendering_method 屬於解析資訊，一律保留）"""
+    if parsed_data is None or fields is None:
+        return parsed_data
+    selected = {name: parsed_data.get(name) for name in fields}
+    if "rendering_method" in parsed_data:
+        selected["rendering_method"] = parsed_data["rendering_method"]
+    return selected
+
+
+def extract_article(html_content: str, url: str, rendering_method: Optional[str] = None,
+                    output_format: Optional[str] = "xml") -> Dict[str, Any]:
+    """
+    從 HTML 提取正文、格式化內容（預設 XML）與元數據
+
+    任何一個 trafilatura 步驟失敗都只記錄警告，對應欄位為 None。
+
+    Args:
+        html_content: 網頁 HTML
+        url: 網頁 URL（元數據沒有 url 時使用）
+        rendering_method: 有值時加入 "rendering_method" 欄位（例如 "playwright"）
+        output_format: content 欄位的 trafilatura 格式；None 則跳過格式化提取，content 為純文字
+
+    Returns:
+        parsed_data 字典（title、author、content、text_content 等）
+    """
+    import trafilatura
+
+    # 使用 trafilatura 解析內容
+    try:
+        text_content = trafilatura.extract(
+            html_content,
+            include_comments=False,
+            include_tables=True,
+            no_fallback=False
+        )
+    except Exception as e:
+        print(f"[警告] trafilatura.extract 失敗: {e}")
+        text_content = None
+
+    # 提取完整資訊（包含元數據）
+    try:
+        metadata = trafilatura.extract_metadata(html_content)
+    except Exception as e:
+        print(f"[警告] trafilatura.extract_metadata 失敗: {e}")
+        metadata = None
+
+    # 提取格式化的內容（預設 XML）
+    html_formatted = None
+    if output_format:
+        try:
+            html_formatted = trafilatura.extract(
+                html_content,
+                include_comments=False,
+                include_tables=True,
+                no_fallback=False,
+                output_format=output_format
+            )
+        except Exception as e:
+            print(f"[警告] trafilatura.extract ({output_format}) 失敗: {e}")
+
+    # 整理回傳資料
+    parsed_data = {
+        "title": getattr(metadata, 'title', None) if metadata else None,
+        "author": getattr(metadata, 'author', None) if metadata else None,
+        "date_published": getattr(metadata, 'date', None) if metadata else None,
+        "url": getattr(metadata, 'url', url) if metadata else url,
+        "domain": getattr(metadata, 'sitename', None) if metadata else None,
+        "description": getattr(metadata, 'description', None) if metadata else None,
+        "categories": getattr(metadata, 'categories', None) if metadata else None,
+        "tags": getattr(metadata, 'tags', None) if metadata else None,
+        "content": html_formatted or text_content,
+        "text_content": text_content,
+        "excerpt": text_content[:200] + "..." if text_content and len(text_content) > 200 else text_content,
+        "word_count": len(text_content.split()) if text_content else 0,
+        "language": getattr(metadata, 'language', None) if metadata else None
+    }
+    if rendering_method:
+        parsed_data["rendering_method"] = rendering_method
+
+    return parsed_data
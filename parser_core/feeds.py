@@ -0,0 +1,623 @@
+"""
+RSS / Atom / 新聞 sitemap 匯入
+
+黑名單網域的路由結果一直建議「改用 RSS」，但服務本身不能讀 RSS，只好由 n8n 另外處理。
+ingest() 讀取一批 feed（RSS 2.0 / RSS 1.0 / Atom / sitemap / sitemap index / .xml.gz），
+與本機 SQLite 中已處理過的 GUID 與網址比對，只把新文章送進解析流程（限制同時解析數量）：
+
+- 一般網域：送進 pipeline.parse()（與 /api/parse 相同的路由、重試與提取）
+- 黑名單網域：直接使用 feed 提供的標題與摘要（content:encoded / summary），完全不請求文章頁面
+- feed 本身以 ETag / Last-Modified 條件請求，沒有更新時伺服器回 304，不重新解析
+
+FeedStore 記錄：
+
+    feeds(url, etag, last_modified, checked_at, entries, children)   每個 feed 的條件請求資訊（與子 sitemap）
+    seen(guid, url, feed, first_seen, status, attempts)          已處理的文章（url 為正規化網址）
+    pending(url, feed, queued_at, entry)                          超過 INGEST_MAX_ITEMS 留到下一次的文章
+
+同一篇文章出現在多個 feed（GUID 不同但網址相同）只處理一次；解析失敗的文章在
+FEED_MAX_ATTEMPTS 次之內，下一次匯入時會重試（feed 沒有更新時也會）。
+sitemap index 回 304 時仍會檢查上次記錄的子 sitemap（子 sitemap 可能已更新）。
+超過單次上限的新文章存進 pending，下一次匯入時優先處理（feed 回 304 時也會）。
+
+lxml 在第一次解析 feed 時才匯入（伺服器匯入本模組時不載入，見 benchmark-startup.py）。
+
+環境變數：
+- FEED_STATE_PATH：SQLite 檔案（預設 feed-state.sqlite3，第一次匯入時建立）
+- INGEST_CONCURRENCY：同時解析的文章數（預設 4）
+- INGEST_MAX_ITEMS：單次匯入最多解析的新文章數（預設 200，其餘留到下一次）
+- FEED_SEEN_MAX_AGE_DAYS：已處理紀錄保留天數（預設 90，0 表示不限）
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Executor
+from dataclasses import asdict, dataclass
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import httpx
+
+from parser_core.canonical_url import canonicalize_url
+from parser_core.extract import select_fields
+from parser_core.fetch import get_enhanced_headers
+from parser_core.pipeline import ParseError, ParseOptions, parse
+from parser_core.replay import httpx_transport
+from parser_core.routing import extract_domain, is_blocked_domain
+
+FEED_STATE_PATH = os.getenv('FEED_STATE_PATH', 'feed-state.sqlite3')
+INGEST_CONCURRENCY = int(os.getenv('INGEST_CONCURRENCY', '4'))
+INGEST_MAX_ITEMS = int(os.getenv('INGEST_MAX_ITEMS', '200'))
+FEED_SEEN_MAX_AGE_DAYS = float(os.getenv('FEED_SEEN_MAX_AGE_DAYS', '90'))
+
+# 解析失敗的文章最多嘗試幾次（之後不再重試）
+FEED_MAX_ATTEMPTS = 3
+# sitemap index 最多展開的子 sitemap 數
+MAX_CHILD_SITEMAPS = 20
+# 單一 feed 的下載逾時（秒）
+FEED_TIMEOUT = 20.0
+
+FEED_ACCEPT = ('application/rss+xml, application/atom+xml, application/xml;q=0.9, '
+               'text/xml;q=0.9, */*;q=0.8')
+
+# 文章處理狀態
+STATUS_OK, STATUS_FEED_SUMMARY, STATUS_FAILED = "ok", "feed_summary", "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS feeds (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    checked_at REAL NOT NULL,
+    entries INTEGER NOT NULL DEFAULT 0,
+    children TEXT
+);
+CREATE TABLE IF NOT EXISTS seen (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    guid TEXT,
+    url TEXT NOT NULL,
+    feed TEXT,
+    first_seen REAL NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS seen_guid ON seen(guid);
+CREATE UNIQUE INDEX IF NOT EXISTS seen_url ON seen(url);
+CREATE INDEX IF NOT EXISTS seen_first_seen ON seen(first_seen);
+CREATE TABLE IF NOT EXISTS pending (
+    url TEXT PRIMARY KEY,
+    feed TEXT,
+    queued_at REAL NOT NULL,
+    entry TEXT NOT NULL
+);
+"""
+
+
+@dataclass
+class FeedEntry:
+    """feed 中的一篇文章（url 為正規化網址）"""
+    url: str
+    guid: Optional[str] = None
+    title: Optional[str] = None
+    summary: Optional[str] = None
+    author: Optional[str] = None
+    published: Optional[str] = None
+    feed_url: Optional[str] = None
+
+
+# ==================== feed 解析 ====================
+
+def _local(element) -> str:
+    """去掉 namespace 的標籤名稱（RSS 1.0 / Atom / sitemap 都有各自的 namespace）"""
+    tag = element.tag
+    return tag.rsplit("}", 1)[-1] if isinstance(tag, str) else ""
+
+
+def _child(element, *names: str):
+    """第一個符合名稱的子元素（依 names 的順序優先）"""
+    children = [child for child in element if isinstance(child.tag, str)]
+    for name in names:
+        for child in children:
+            if _local(child) == name:
+                return child
+    return None
+
+
+def _text(element, *names: str) -> Optional[str]:
+    child = _child(element, *names)
+    if child is None:
+        return None
+    text = "".join(child.itertext()).strip()
+    return text or None
+
+
+def _html_to_text(value: Optional[str]) -> Optional[str]:
+    """摘要常是 HTML（可能還是跳脫過的），轉成純文字"""
+    if not value or "<" not in value:
+        return value
+    from lxml import etree, html as lxml_html
+    try:
+        text = lxml_html.fromstring(value).text_content()
+    except (etree.ParserError, ValueError):
+        return value
+    return " ".join(text.split()) or None
+
+
+@lru_cache(maxsize=1)
+def _xml_parser():
+    """不解析外部實體、不連網的 XML parser（第一次使用時才匯入 lxml）"""
+    from lxml import etree
+    return etree.XMLParser(recover=True, resolve_entities=False, no_network=True, huge_tree=False)
+
+
+def _iso_date(value: Optional[str]) -> Optional[str]:
+    """RSS 的 RFC 822 日期轉成 ISO 8601；其他格式（Atom、sitemap 本來就是 ISO）原樣回傳"""
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).isoformat()
+    except (TypeError, ValueError, IndexError):
+        return value
+
+
+def _entry(feed_url: str, link: Optional[str], **fields) -> Optional[FeedEntry]:
+    if not link:
+        return None
+    url = urljoin(feed_url, link.strip())
+    if not url.startswith(('http://', 'https://')):
+        return None
+    return FeedEntry(url=canonicalize_url(url), feed_url=feed_url, **fields)
+
+
+def parse_feed(content: bytes, feed_url: str) -> Tuple[List[FeedEntry], List[str]]:
+    """
+    解析 RSS / Atom / sitemap
+
+    Args:
+        content: feed 原始內容（gzip 壓縮的 sitemap 會先解壓縮）
+        feed_url: feed 網址（解析相對連結用）
+
+    Returns:
+        (文章列表, 子 sitemap 網址列表)
+
+    Raises:
+        ValueError: 不是可辨識的 feed 格式
+    """
+    if content[:2] == b"\x1f\x8b":
+        content = gzip.decompress(content)
+    from lxml import etree
+    root = etree.fromstring(content, _xml_parser()) if content.strip() else None
+    if root is None:
+        raise ValueError("feed 內容為空或無法解析")
+
+    kind = _local(root)
+    entries: List[FeedEntry] = []
+    children: List[str] = []
+
+    if kind in ("rss", "RDF"):
+        for item in root.iter():
+            if _local(item) != "item":
+                continue
+            summary = _text(item, "encoded", "description")
+            entry = _entry(
+                feed_url, _text(item, "link") or _guid_link(item),
+                guid=_text(item, "guid"),
+                title=_text(item, "title"),
+                summary=_html_to_text(summary),
+                author=_text(item, "creator", "author"),
+                published=_iso_date(_text(item, "pubDate", "date")),
+            )
+            if entry:
+                entries.append(entry)
+
+    elif kind == "feed":
+        for item in root:
+            if _local(item) != "entry":
+                continue
+            author = _child(item, "author")
+            entry = _entry(
+                feed_url, _atom_link(item),
+                guid=_text(item, "id"),
+                title=_text(item, "title"),
+                summary=_html_to_text(_text(item, "content", "summary")),
+                author=_text(author, "name") if author is not None else None,
+                published=_text(item, "published", "updated"),
+            )
+            if entry:
+                entries.append(entry)
+
+    elif kind == "urlset":
+        for item in root:
+            if _local(item) != "url":
+                continue
+            news = _child(item, "news")
+            entry = _entry(
+                feed_url, _text(item, "loc"),
+                title=_text(news, "title") if news is not None else None,
+                published=(_text(news, "publication_date") if news is not None else None) or _text(item, "lastmod"),
+            )
+            if entry:
+                entries.append(entry)
+
+    elif kind == "sitemapindex":
+        for item in root:
+            if _local(item) == "sitemap":
+                loc = _text(item, "loc")
+                if loc:
+                    children.append(urljoin(feed_url, loc))
+
+    else:
+        raise ValueError(f"無法辨識的 feed 格式: <{kind}>")
+
+    return entries, children
+
+
+def _guid_link(item) -> Optional[str]:
+    """沒有 <link> 時，isPermaLink 的 guid 就是文章網址"""
+    guid = _child(item, "guid")
+    if guid is not None and guid.get("isPermaLink", "true").lower() != "false":
+        return (guid.text or "").strip() or None
+    return None
+
+
+def _atom_link(item) -> Optional[str]:
+    """Atom 的文章網址：rel="alternate"（或沒有 rel）的 <link href>"""
+    for child in item:
+        if _local(child) == "link" and child.get("rel", "alternate") == "alternate" and child.get("href"):
+            return child.get("href")
+    return None
+
+
+# ==================== 已處理紀錄 ====================
+
+class FeedStore:
+    """feed 條件請求資訊與已處理文章（SQLite）"""
+
+    def __init__(self, path: str = FEED_STATE_PATH, max_age_days: float = FEED_SEEN_MAX_AGE_DAYS):
+        """
+        Args:
+            path: SQLite 檔案路徑（第一次使用時建立）
+            max_age_days: 已處理紀錄保留天數（0 表示不限）
+        """
+        self.path = path
+        self.max_age_days = max_age_days
+        self.ingested = 0
+        self.parsed = 0
+        self.feed_summaries = 0
+        self.failures = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """第一次使用時才建立資料庫（呼叫端需持有 _lock）"""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def feed_cache(self, url: str) -> Dict[str, Any]:
+        """上一次下載的 ETag / Last-Modified 與子 sitemap（沒有時為空）"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT etag, last_modified, children FROM feeds WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return {}
+        return {
+            "etag": row["etag"],
+            "last_modified": row["last_modified"],
+            "children": json.loads(row["children"]) if row["children"] else [],
+        }
+
+    def save_feed(self, url: str, etag: Optional[str], last_modified: Optional[str], entries: int,
+                  children: List[str]):
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO feeds (url, etag, last_modified, checked_at, entries, children) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET etag = excluded.etag, last_modified = excluded.last_modified, "
+                "checked_at = excluded.checked_at, entries = excluded.entries, children = excluded.children",
+                (url, etag, last_modified, time.time(), entries, json.dumps(children) if children else None)
+            )
+            conn.commit()
+
+    def filter_new(self, entries: List[FeedEntry]) -> List[FeedEntry]:
+        """
+        去掉已處理的文章（GUID 或網址相同；同一批內重複的也只留一篇）
+
+        解析失敗且嘗試次數未達 FEED_MAX_ATTEMPTS 的文章視為新文章（重試）。
+        """
+        new = []
+        batch = set()
+        with self._lock:
+            conn = self._connect()
+            for entry in entries:
+                if entry.url in batch or (entry.guid and entry.guid in batch):
+                    continue
+                row = conn.execute(
+                    "SELECT status, attempts FROM seen WHERE url = ? OR (guid IS NOT NULL AND guid = ?) LIMIT 1",
+                    (entry.url, entry.guid)
+                ).fetchone()
+                if row is None or (row["status"] == STATUS_FAILED and row["attempts"] < FEED_MAX_ATTEMPTS):
+                    new.append(entry)
+                batch.add(entry.url)
+                if entry.guid:
+                    batch.add(entry.guid)
+        return new
+
+    def retry_entries(self, feed_urls: List[str]) -> List[FeedEntry]:
+        """這些 feed 中解析失敗、還可以重試的文章（feed 沒有更新時，filter_new 看不到它們）"""
+        if not feed_urls:
+            return []
+        placeholders = ", ".join("?" * len(feed_urls))
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT guid, url, feed FROM seen WHERE status = ? AND attempts < ? AND feed IN ({placeholders})",
+                (STATUS_FAILED, FEED_MAX_ATTEMPTS, *feed_urls)
+            ).fetchall()
+        return [FeedEntry(url=row["url"], guid=row["guid"], feed_url=row["feed"]) for row in rows]
+
+    def defer(self, entries: List[FeedEntry]):
+        """
+        記錄超過單次上限、留到下一次的文章（完整保留標題與摘要，黑名單網域仍可使用 feed 摘要）
+
+        feed 的 ETag / Last-Modified 已經存下，下一次多半得到 304，不記錄的話這些文章就再也看不到了。
+        """
+        if not entries:
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR IGNORE INTO pending (url, feed, queued_at, entry) VALUES (?, ?, ?, ?)",
+                [(entry.url, entry.feed_url, now, json.dumps(asdict(entry), ensure_ascii=False)) for entry in entries]
+            )
+            conn.commit()
+
+    def pending_entries(self, feed_urls: List[str]) -> List[FeedEntry]:
+        """這些 feed 上一次留下來的文章（最早留下的在前）"""
+        if not feed_urls:
+            return []
+        placeholders = ", ".join("?" * len(feed_urls))
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT entry FROM pending WHERE feed IN ({placeholders}) ORDER BY queued_at, rowid",
+                tuple(feed_urls)
+            ).fetchall()
+        return [FeedEntry(**json.loads(row["entry"])) for row in rows]
+
+    def mark(self, entry: FeedEntry, status: str):
+        """記錄文章處理結果（重試時累加嘗試次數），並移出 pending"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO seen (guid, url, feed, first_seen, status) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET status = excluded.status, attempts = attempts + 1",
+                (entry.guid, entry.url, entry.feed_url, time.time(), status)
+            )
+            conn.execute("DELETE FROM pending WHERE url = ?", (entry.url,))
+            conn.commit()
+        self.ingested += 1
+        if status == STATUS_OK:
+            self.parsed += 1
+        elif status == STATUS_FEED_SUMMARY:
+            self.feed_summaries += 1
+        else:
+            self.failures += 1
+
+    def prune(self) -> int:
+        """刪除超過保留天數的已處理紀錄，回傳刪除筆數"""
+        if self.max_age_days <= 0:
+            return 0
+        cutoff = time.time() - self.max_age_days * 86400
+        with self._lock:
+            conn = self._connect()
+            removed = conn.execute("DELETE FROM seen WHERE first_seen < ?", (cutoff,)).rowcount
+            removed += conn.execute("DELETE FROM pending WHERE queued_at < ?", (cutoff,)).rowcount
+            conn.commit()
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """/health 的匯入狀態（尚未使用時不建立資料庫）"""
+        stats = {
+            "path": self.path,
+            "ingested": self.ingested,
+            "parsed": self.parsed,
+            "feed_summaries": self.feed_summaries,
+            "failures": self.failures,
+        }
+        with self._lock:
+            if self._conn is not None:
+                stats["feeds"] = self._conn.execute("SELECT COUNT(*) FROM feeds").fetchone()[0]
+                stats["seen"] = self._conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+                stats["pending"] = self._conn.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+        return stats
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# ==================== 匯入 ====================
+
+async def fetch_feed(client: httpx.AsyncClient, url: str, cache: Dict[str, Any]) -> httpx.Response:
+    """以條件請求下載 feed（有 ETag / Last-Modified 時，沒有更新會得到 304）"""
+    headers = get_enhanced_headers(url)
+    headers["Accept"] = FEED_ACCEPT
+    if cache.get("etag"):
+        headers["If-None-Match"] = cache["etag"]
+    if cache.get("last_modified"):
+        headers["If-Modified-Since"] = cache["last_modified"]
+    response = await client.get(url, headers=headers)
+    if response.status_code != 304:
+        response.raise_for_status()
+    return response
+
+
+def feed_summary_data(entry: FeedEntry) -> Dict[str, Any]:
+    """黑名單網域：以 feed 的標題與摘要組成與提取結果相同格式的 data（不請求文章頁面）"""
+    text = entry.summary
+    return {
+        "title": entry.title,
+        "author": entry.author,
+        "date_published": entry.published,
+        "url": entry.url,
+        "domain": extract_domain(entry.url) or None,
+        "description": text[:200] + "..." if text and len(text) > 200 else text,
+        "categories": None,
+        "tags": None,
+        "content": text,
+        "text_content": text,
+        "excerpt": text[:200] + "..." if text and len(text) > 200 else text,
+        "word_count": len(text.split()) if text else 0,
+        "language": None,
+        "rendering_method": "feed",
+    }
+
+
+async def ingest(
+    feed_urls: List[str],
+    store: FeedStore,
+    options: Optional[ParseOptions] = None,
+    max_items: int = INGEST_MAX_ITEMS,
+    concurrency: int = INGEST_CONCURRENCY,
+    browser_pool=None,
+    executor: Optional[Executor] = None,
+    snapshot_store=None,
+    on_result: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+) -> Dict[str, Any]:
+    """
+    讀取 feed，只解析新文章
+
+    Args:
+        feed_urls: RSS / Atom / sitemap 網址
+        store: 已處理紀錄
+        options: 每篇文章的解析選項（fields、format、deadline_ms...）
+        max_items: 本次最多處理的新文章數（其餘存進 pending，下一次匯入時優先處理）
+        concurrency: 同時解析的文章數（feed 下載也使用同樣的上限）
+        browser_pool / executor / snapshot_store: 傳給 pipeline.parse()
+        on_result: 每篇文章處理完時呼叫（例如回調 webhook）
+
+    Returns:
+        {"feeds": [每個 feed 的狀態], "articles": [每篇新文章的結果], "stats": {...}}
+    """
+    options = options or ParseOptions()
+    semaphore = asyncio.Semaphore(concurrency)
+    started = time.monotonic()
+    await asyncio.to_thread(store.prune)
+
+    async with httpx.AsyncClient(
+        timeout=httpx.Timeout(FEED_TIMEOUT, connect=10.0),
+        follow_redirects=True,
+        transport=httpx_transport()  # 錄製 / 重播（未啟用時為 None）
+    ) as client:
+
+        async def read_feed(url: str, depth: int = 0) -> Tuple[List[Dict[str, Any]], List[FeedEntry]]:
+            """下載並解析一個 feed；sitemap index 展開一層子 sitemap"""
+            cache = await asyncio.to_thread(store.feed_cache, url)
+            try:
+                async with semaphore:
+                    response = await fetch_feed(client, url, cache)
+                if response.status_code == 304:
+                    entries, children = [], cache.get("children", [])
+                    statuses = [{"url": url, "status": "not_modified", "entries": 0}]
+                else:
+                    entries, children = parse_feed(response.content, url)
+                    statuses = [{"url": url, "status": "ok", "entries": len(entries)}]
+            except (httpx.HTTPError, ValueError, OSError) as e:
+                print(f"[匯入] ❌ feed 讀取失敗: {url} - {type(e).__name__}: {e}")
+                return [{"url": url, "status": "error", "error": f"{type(e).__name__}: {e}"}], []
+
+            if response.status_code != 304:
+                await asyncio.to_thread(
+                    store.save_feed, url, response.headers.get("etag"), response.headers.get("last-modified"),
+                    len(entries), children
+                )
+            if children and depth == 0:
+                nested = await asyncio.gather(*(read_feed(child, depth + 1)
+                                                for child in children[:MAX_CHILD_SITEMAPS]))
+                for child_statuses, child_entries in nested:
+                    statuses.extend(child_statuses)
+                    entries.extend(child_entries)
+            return statuses, entries
+
+        read = await asyncio.gather(*(read_feed(url) for url in feed_urls))
+
+    feeds: List[Dict[str, Any]] = []
+    entries: List[FeedEntry] = []
+    for statuses, feed_entries in read:
+        feeds.extend(statuses)
+        entries.extend(feed_entries)
+
+    # 順序：上次留下的文章 → 新文章 → 解析失敗的重試（同一網址只留第一個）
+    feed_list = [feed["url"] for feed in feeds]
+    candidates = await asyncio.to_thread(store.pending_entries, feed_list)
+    candidates += await asyncio.to_thread(store.filter_new, entries)
+    candidates += await asyncio.to_thread(store.retry_entries, feed_list)
+    unique: Dict[str, FeedEntry] = {}
+    for entry in candidates:
+        unique.setdefault(entry.url, entry)
+    new_entries = list(unique.values())
+    deferred = max(0, len(new_entries) - max_items)
+    await asyncio.to_thread(store.defer, new_entries[max_items:])
+    new_entries = new_entries[:max_items]
+    print(f"[匯入] 📰 {len(feeds)} 個 feed、{len(entries)} 篇文章，新文章 {len(new_entries)} 篇"
+          f"{f'（{deferred} 篇留到下一次）' if deferred else ''}")
+
+    async def process(entry: FeedEntry) -> Dict[str, Any]:
+        article = {key: value for key, value in asdict(entry).items() if key != "summary"}
+        if is_blocked_domain(entry.url):
+            # 黑名單網域：不請求文章頁面，直接使用 feed 的摘要
+            article.update(
+                success=bool(entry.summary or entry.title),
+                data=select_fields(feed_summary_data(entry), options.fields),
+                routing_decision="feed_summary",
+            )
+            status = STATUS_FEED_SUMMARY
+        else:
+            async with semaphore:
+                try:
+                    result = await parse(entry.url, options, browser_pool=browser_pool, executor=executor,
+                                         snapshot_store=snapshot_store)
+                    article.update(result.to_dict())
+                except ParseError as e:
+                    article.update(success=False, data=None, error=e.detail)
+                except Exception as e:
+                    article.update(success=False, data=None, error=f"{type(e).__name__}: {e}")
+            status = STATUS_OK if article.get("success") else STATUS_FAILED
+
+        await asyncio.to_thread(store.mark, entry, status)
+        if on_result is not None:
+            await on_result(article)
+        return article
+
+    articles = await asyncio.gather(*(process(entry) for entry in new_entries))
+    return {
+        "feeds": feeds,
+        "articles": articles,
+        "stats": {
+            "feeds": len(feeds),
+            "entries": len(entries),
+            "new": len(new_entries),
+            "deferred": deferred,
+            "parsed": sum(1 for a in articles if a.get("success") and a.get("routing_decision") != "feed_summary"),
+            "feed_summaries": sum(1 for a in articles if a.get("routing_decision") == "feed_summary"),
+            "failed": sum(1 for a in articles if not a.get("success")),
+            "elapsed_seconds": round(time.monotonic() - started, 2),
+        },
+    }
@@ -0,0 +1,543 @@
+"""
+網頁下載：靜態（httpx）與動態（Playwright）
+
+- 靜態：隨機 User-Agent + 增強的 headers，單次下載（重試由 pipeline 負責）；
+  Accept-Encoding 只宣告 httpx 實際能解壓縮的編碼，內容依 BOM / header / <meta charset> 解碼一次
+  （parser_core.charset）
+- 動態：Playwright Chromium，信號量限制同時運行的瀏覽器數量，結束後清理 /tmp；
+  瀏覽器池的分頁模式（PLAYWRIGHT_PAGES_PER_BROWSER > 1）由同一個瀏覽器同時渲染多個頁面，
+  分頁模式下每個頁面由記憶體看門狗監控 JS heap，超過 PLAYWRIGHT_PAGE_MEMORY_MB 時關閉該頁面
+  （預設的單頁模式不監控，行為與之前相同）
+
+playwright.async_api 在第一次動態渲染時才匯入，只做靜態下載或解碼的程序不需要付出匯入成本。
+
+動態路徑重用同一域名上次成功時的 cookies / localStorage（parser_core.storage_state），
+cookie 同意視窗等插頁不會每次重新出現。
+
+兩條路徑都會經過 parser_core.replay：PARSER_REPLAY_MODE=record 時錄下所有回應，
+replay 時完全由封存回應（不連網），用於可重現的效能與回歸測試。
+
+兩條路徑都接受 deadline（parser_core.deadline.Deadline）：逾時縮短到剩餘時間內，
+時間不夠時略過隨機延遲、滾動等非必要步驟；等不到瀏覽器或時間用完時拋出 TimeoutError。
+"""
+
+import asyncio
+import glob
+import importlib.util
+import os
+import random
+import shutil
+from typing import Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from parser_core.charset import decode_html
+from parser_core.deadline import Deadline
+from parser_core.replay import get_archive, httpx_transport, route_context
+from parser_core.storage_state import STORAGE_STATES
+
+# ==================== 併發控制 ====================
+# 🔧 修復 BlockingIOError: 限制同時運行的 Playwright 實例數量
+# Railway Pro Plan 建議最多 2-3 個並發實例
+PLAYWRIGHT_CONCURRENCY = int(os.getenv('PLAYWRIGHT_CONCURRENCY', '2'))
+PLAYWRIGHT_SEMAPHORE = asyncio.Semaphore(PLAYWRIGHT_CONCURRENCY)
+
+# 瀏覽器池中每個瀏覽器同時渲染的頁面數（各自獨立的 context）；1 為每個瀏覽器一次一個頁面
+PLAYWRIGHT_PAGES_PER_BROWSER = int(os.getenv('PLAYWRIGHT_PAGES_PER_BROWSER', '1'))
+# 分頁模式中單一頁面的 JS heap 上限（MB），超過時關閉該頁面；0 表示不監控（單頁模式一律不監控）
+PLAYWRIGHT_PAGE_MEMORY_MB = int(os.getenv('PLAYWRIGHT_PAGE_MEMORY_MB', '256'))
+# 記憶體看門狗的檢查間隔（秒）
+PAGE_WATCHDOG_INTERVAL = 1.0
+# 看門狗關閉的頁面數（/health 的 browser_pool.page_memory_killed）
+WATCHDOG_STATS = {"killed": 0}
+
+# 渲染結束前保留給 page.content() 與關閉 context 的秒數
+RENDER_RESERVE_SECONDS = 1.0
+
+
+def _accept_encoding() -> str:
+    """
+    只宣告 httpx 能解壓縮的編碼（與 httpx 自己選用的套件相同）
+
+    gzip / deflate 使用標準庫；br 需要 brotli 或 brotlicffi；zstd 需要 zstandard 且 httpx 0.27.1 以上。
+    只用 find_spec 檢查是否安裝，不依賴 httpx 的內部模組，也不在這裡匯入套件。
+    """
+    encodings = ["gzip", "deflate"]
+    if importlib.util.find_spec("brotli") or importlib.util.find_spec("brotlicffi"):
+        encodings.append("br")
+    try:
+        httpx_version = tuple(int(part) for part in httpx.__version__.split(".")[:3])
+    except ValueError:
+        httpx_version = (0, 0, 0)
+    if importlib.util.find_spec("zstandard") and httpx_version >= (0, 27, 1):
+        encodings.append("zstd")
+    return ", ".join(encodings)
+
+
+ACCEPT_ENCODING = _accept_encoding()
+
+# 多組 User-Agent 輪流使用
+USER_AGENTS = [
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Safari/605.1.15',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:120.0) Gecko/20100101 Firefox/120.0',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+]
+
+# Chromium 啟動參數（容器環境）
+CHROMIUM_ARGS = [
+    # 基本設定
+    '--disable-blink-features=AutomationControlled',  # 禁用自動化控制特徵
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    # 🔧 修復 BlockingIOError - 記憶體和資源優化
+    '--disable-dev-shm-usage',          # 不使用 /dev/shm（關鍵修復！）
+    '--disable-gpu',                     # 禁用 GPU（容器環境）
+    '--disable-software-rasterizer',     # 禁用軟體光柵化
+    '--single-process',                  # 單進程模式（減少資源消耗）
+    '--no-zygote',                       # 禁用 zygote 進程
+    # 記憶體優化
+    '--disable-extensions',              # 禁用擴充
+    '--disable-background-networking',   # 禁用背景網路
+    '--disable-sync',                    # 禁用同步
+    '--disable-translate',               # 禁用翻譯
+    '--disable-features=TranslateUI',
+    '--disable-default-apps',            # 禁用預設應用
+    '--mute-audio',                      # 靜音
+    '--hide-scrollbars',                 # 隱藏滾動條
+    # 穩定性
+    '--disable-hang-monitor',            # 禁用掛起監控
+    '--disable-prompt-on-repost',        # 禁用重新提交提示
+    '--disable-component-update',        # 禁用組件更新
+    '--ignore-certificate-errors',       # 忽略證書錯誤
+]
+
+# 分頁模式的啟動參數：單進程模式下同時開啟的頁面共用一個 renderer 與 V8，一個頁面崩潰或記憶體失控
+# 就連帶所有同時渲染中的分頁與整個瀏覽器（單頁模式一次只有一個頁面，崩潰時池會重新啟動瀏覽器）；
+# 改回多進程讓每個分頁各自隔離，並以 V8 heap 上限（看門狗上限的兩倍）作為看門狗來不及時的最後防線
+TAB_CHROMIUM_ARGS = [arg for arg in CHROMIUM_ARGS if arg not in ('--single-process', '--no-zygote')] + (
+    [f'--js-flags=--max-old-space-size={PLAYWRIGHT_PAGE_MEMORY_MB * 2}'] if PLAYWRIGHT_PAGE_MEMORY_MB > 0 else []
+)
+
+# 網路層屏蔽的廣告/追蹤網域
+AD_DOMAINS = [
+    'doubleclick.net', 'googlesyndication.com', 'googletagmanager.com',
+    'google-analytics.com', 'facebook.com/tr/', 'scorecardresearch.com',
+    'ad.doubleclick.net', 'static.ads-twitter.com', 'ads.yahoo.com',
+    'pagead2.googlesyndication.com', 'adservice.google.com',
+    'analytics.google.com', 'googleadservices.com'
+]
+
+STEALTH_SCRIPT = """
+    // 移除 webdriver 標記
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => false
+    });
+
+    // 偽裝 Chrome 對象
+    window.chrome = {
+        runtime: {}
+    };
+
+    // 修改 permissions
+    const originalQuery = window.navigator.permissions.query;
+    window.navigator.permissions.query = (parameters) => (
+        parameters.name === 'notifications' ?
+            Promise.resolve({ state: Notification.permission }) :
+            originalQuery(parameters)
+    );
+
+    // 偽裝 plugins
+    Object.defineProperty(navigator, 'plugins', {
+        get: () => [1, 2, 3, 4, 5]
+    });
+
+    // 偽裝 languages
+    Object.defineProperty(navigator, 'languages', {
+        get: () => ['zh-TW', 'zh', 'en-US', 'en']
+    });
+"""
+
+REMOVE_ADS_SCRIPT = """() => {
+    // 移除常見廣告元素
+    const selectors = [
+        '[class*="ad-"]', '[class*="ad_"]', '[id*="ad-"]', '[id*="ad_"]',
+        '[class*="advertisement"]', '[class*="banner"]',
+        'iframe[src*="ads"]', 'iframe[src*="doubleclick"]',
+        '.ad', '.ads', '#ad', '#ads'
+    ];
+
+    selectors.forEach(selector => {
+        try {
+            document.querySelectorAll(selector).forEach(el => el.remove());
+        } catch(e) {}
+    });
+}"""
+
+SCROLL_SCRIPT = """() => {
+    // 快速分段滾動到頁面不同位置
+    const positions = [0.3, 0.6, 1.0];  // 30%, 60%, 100%
+    positions.forEach((ratio, index) => {
+        setTimeout(() => {
+            window.scrollTo(0, document.body.scrollHeight * ratio);
+        }, index * 400);  // 每 400ms 滾動一次
+    });
+}"""
+
+
+def get_random_user_agent():
+    """隨機選擇 User-Agent"""
+    return random.choice(USER_AGENTS)
+
+
+def get_enhanced_headers(url: str):
+    """獲取增強的 HTTP headers"""
+    parsed_url = urlparse(url)
+
+    return {
+        'User-Agent': get_random_user_agent(),
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+        'Accept-Language': 'zh-TW,zh;q=0.9,en-US;q=0.8,en;q=0.7',
+        'Accept-Encoding': ACCEPT_ENCODING,
+        'Referer': f'https://{parsed_url.netloc}/',
+        'Connection': 'keep-alive',
+        'Upgrade-Insecure-Requests': '1',
+        'Sec-Fetch-Dest': 'document',
+        'Sec-Fetch-Mode': 'navigate',
+        'Sec-Fetch-Site': 'none',
+        'Cache-Control': 'max-age=0'
+    }
+
+
+async def fetch_html(url: str, skip_ssl: bool = False, deadline: Optional[Deadline] = None) -> str:
+    """
+    靜態下載網頁 HTML（單次，不重試）
+
+    Args:
+        url: 網頁 URL
+        skip_ssl: 是否跳過 SSL 驗證
+        deadline: 時間預算（整個下載不超過剩餘時間）
+
+    Returns:
+        HTML 內容
+
+    Raises:
+        httpx.HTTPStatusError: 非 2xx 回應
+        httpx.HTTPError: 連線、逾時等錯誤
+        TimeoutError: 超過時間預算
+    """
+    deadline = deadline or Deadline()
+
+    # 設定 timeout 和 SSL 驗證（httpx 的 timeout 是單一步驟的上限，總時間另外由 wait_for 限制）
+    total = deadline.timeout(30.0)
+    if total <= 0:
+        raise TimeoutError("時間預算已用完，未下載")
+    timeout = httpx.Timeout(total, connect=min(10.0, total))
+
+    async def download() -> str:
+        async with httpx.AsyncClient(
+            timeout=timeout,
+            verify=not skip_ssl,
+            follow_redirects=True,
+            headers=get_enhanced_headers(url),
+            transport=httpx_transport(verify=not skip_ssl)  # 錄製 / 重播（未啟用時為 None）
+        ) as client:
+            response = await client.get(url)
+            response.raise_for_status()
+            # 不使用 response.text：沒有 charset header 時 httpx 一律當成 UTF-8，Big5 / GBK 網站會變成亂碼
+            return decode_html(response.content, response.headers.get("content-type"))[0]
+
+    if not deadline.limited:
+        return await download()
+    try:
+        return await asyncio.wait_for(download(), total)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"下載超過時間預算（{total:.1f} 秒）")
+
+
+def cleanup_chromium_temp():
+    """
+    清理 Chromium/Playwright 產生的臨時文件
+    防止 /tmp 空間被佔滿導致無法啟動新的瀏覽器
+    """
+    patterns = [
+        '/tmp/.org.chromium.*',
+        '/tmp/playwright*',
+        '/tmp/.com.google.Chrome.*',
+        '/tmp/chromium*',
+        '/tmp/.X*-lock',
+        '/tmp/core.*',
+        '/tmp/Temp-*',
+        '/tmp/.font-unix',
+        '/tmp/snap.*',
+        '/tmp/rust_mozprofile*',
+    ]
+    cleaned = 0
+    for pattern in patterns:
+        for path in glob.glob(pattern):
+            try:
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
+                cleaned += 1
+            except:
+                pass
+    # 總是輸出清理結果，方便觀察是否有殘留
+    if cleaned > 0:
+        print(f"[Cleanup] 🧹 已清理 {cleaned} 個臨時文件/目錄")
+    else:
+        print("[Cleanup] ✅ /tmp 目錄乾淨，無需清理")
+    return cleaned
+
+
+async def watch_page_memory(context, page, limit_mb: int = PLAYWRIGHT_PAGE_MEMORY_MB,
+                            interval: float = PAGE_WATCHDOG_INTERVAL) -> Optional[float]:
+    """
+    頁面記憶體看門狗：定期以 CDP Performance.getMetrics 讀取 JS heap，超過上限時關閉頁面
+
+    同一個瀏覽器同時渲染多個頁面時，一個失控的頁面（無限捲動、記憶體洩漏的廣告腳本）
+    不應拖垮其他分頁或整個容器；關閉頁面後 render_page 進行中的操作隨即失敗。
+
+    Returns:
+        關閉頁面時的 JS heap（MB）；無法取得 CDP session 或頁面已關閉時為 None
+    """
+    try:
+        session = await context.new_cdp_session(page)
+        await session.send("Performance.enable")
+    except Exception:
+        return None
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            metrics = await session.send("Performance.getMetrics")
+        except Exception:
+            return None
+        heap_mb = next((m["value"] for m in metrics["metrics"] if m["name"] == "JSHeapUsedSize"), 0) / 1024 / 1024
+        if heap_mb > limit_mb:
+            print(f"[Playwright] 🐕 頁面 JS heap {heap_mb:.0f} MB 超過上限 {limit_mb} MB，關閉頁面")
+            WATCHDOG_STATS["killed"] += 1
+            try:
+                await page.close()
+            except Exception:
+                pass
+            return heap_mb
+
+
+async def render_page(
+    browser,
+    url: str,
+    wait_for: Optional[str] = None,
+    block_ads: bool = True,
+    stealth_mode: bool = True,
+    deadline: Optional[Deadline] = None,
+    page_memory_mb: int = 0
+) -> str:
+    """
+    在已啟動的瀏覽器中開新的 context 渲染網頁，結束後關閉 context
+
+    context 帶入該域名上次成功時的 storage state（cookies、localStorage），
+    成功取得內容後再擷取目前的狀態存回快取（STORAGE_STATES）。
+    page_memory_mb > 0 時（瀏覽器池的分頁模式）渲染期間由 watch_page_memory() 監控頁面記憶體。
+
+    Args:
+        browser: Playwright Browser
+        url: 要訪問的網頁 URL
+        wait_for: 等待特定元素（CSS selector）出現
+        block_ads: 是否屏蔽廣告
+        stealth_mode: 是否啟用反爬蟲模式
+        deadline: 時間預算（goto / wait_for 逾時縮短，時間不夠時略過延遲與滾動）
+        page_memory_mb: 頁面 JS heap 上限（MB），0 表示不監控
+
+    Returns:
+        渲染後的 HTML 內容
+    """
+    from playwright.async_api import TimeoutError as PlaywrightTimeout
+
+    deadline = deadline or Deadline()
+    archive = get_archive()
+    storage_state = STORAGE_STATES.get(url) if STORAGE_STATES is not None else None
+    context = None
+    watchdog = None
+    try:
+        if storage_state is not None:
+            print(f"[Playwright] 🍪 重用此域名的瀏覽器狀態（{len(storage_state['cookies'])} 個 cookie）")
+        # 創建新的瀏覽器上下文（模擬真實用戶）
+        context = await browser.new_context(
+            storage_state=storage_state,
+            user_agent=get_random_user_agent(),
+            viewport={'width': 1920, 'height': 1080},
+            locale='zh-TW',
+            timezone_id='Asia/Taipei',
+            color_scheme='light',
+            extra_http_headers={
+                'Accept-Language': 'zh-TW,zh;q=0.9,en-US;q=0.8,en;q=0.7',
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
+            }
+        )
+
+        # 錄製 / 重播（先註冊，廣告屏蔽放行的請求以 fallback 交給它）
+        if archive is not None:
+            await route_context(context, archive)
+
+        # 如果啟用廣告屏蔽
+        if block_ads:
+            print(f"[Playwright] 啟用廣告屏蔽")
+            await context.route("**/*", lambda route: (
+                route.abort() if any(ad in route.request.url for ad in AD_DOMAINS)
+                else route.fallback()
+            ))
+
+        # 創建新頁面
+        page = await context.new_page()
+        if page_memory_mb > 0:
+            watchdog = asyncio.create_task(watch_page_memory(context, page, page_memory_mb))
+
+        # 如果啟用反爬蟲模式
+        if stealth_mode:
+            print(f"[Playwright] 啟用反爬蟲模式")
+            # 隱藏 webdriver 特徵
+            await page.add_init_script(STEALTH_SCRIPT)
+
+        # 訪問網頁（使用更寬鬆的策略以提升穩定性）
+        print(f"[Playwright] 正在訪問: {url}")
+        goto_timeout = deadline.timeout(90.0, reserve=RENDER_RESERVE_SECONDS)  # 預設 90 秒
+        if goto_timeout <= 0:
+            raise TimeoutError("時間預算已用完，未載入頁面")
+        await page.goto(url, wait_until='domcontentloaded', timeout=goto_timeout * 1000)  # 使用 domcontentloaded 策略
+
+        # 隨機延遲（模擬人類行為；重播時沒有反爬蟲需求，略過以免干擾效能量測）
+        delay = random.uniform(1, 2.5)
+        replaying = archive is not None and archive.mode == "replay"
+        if not replaying and deadline.can_afford(delay + RENDER_RESERVE_SECONDS):
+            print(f"[Playwright] 隨機延遲 {delay:.1f} 秒...")
+            await asyncio.sleep(delay)
+
+        # 移除廣告元素（DOM 層面）
+        if block_ads:
+            await page.evaluate(REMOVE_ADS_SCRIPT)
+
+        # 如果指定了等待元素，等待該元素出現
+        wait_timeout = deadline.timeout(20.0, reserve=RENDER_RESERVE_SECONDS)  # 預設 20 秒
+        if wait_for and wait_timeout > 0:
+            print(f"[Playwright] 等待元素: {wait_for}")
+            try:
+                await page.wait_for_selector(wait_for, timeout=wait_timeout * 1000)
+            except Exception:
+                # 只吞掉逾時等錯誤；請求被取消（CancelledError）時要立即結束
+                print(f"[Playwright] 警告：元素 {wait_for} 未找到，繼續提取內容")
+
+        # 滾動頁面以觸發懶加載（優化版：快速分段滾動），再等待一下給懶加載更多時間
+        if deadline.can_afford(2 + RENDER_RESERVE_SECONDS):
+            print(f"[Playwright] 滾動頁面以載入動態內容...")
+            await page.evaluate(SCROLL_SCRIPT)
+            await asyncio.sleep(2)
+        else:
+            print(f"[Playwright] ⏱️ 時間預算不足，略過滾動")
+
+        # 獲取渲染後的 HTML
+        html_content = await page.content()
+
+        # 記住此域名的 cookies / localStorage（同意視窗的選擇等），下次同一域名直接帶入
+        if STORAGE_STATES is not None:
+            await STORAGE_STATES.capture(context, url, page.url)
+
+        print(f"[Playwright] ✅ 成功獲取內容，長度: {len(html_content)}")
+        return html_content
+
+    except PlaywrightTimeout as e:
+        raise Exception(f"Playwright 超時: {str(e)}")
+    except TimeoutError:
+        raise
+    except Exception as e:
+        # 看門狗關閉了頁面：回報記憶體超過上限，而不是「頁面已關閉」
+        killed_mb = watchdog.result() if watchdog is not None and watchdog.done() and not watchdog.cancelled() \
+            and watchdog.exception() is None else None
+        if killed_mb is not None:
+            raise Exception(f"Playwright 錯誤: 頁面記憶體超過上限（{killed_mb:.0f} MB > {page_memory_mb} MB）")
+        raise Exception(f"Playwright 錯誤: {str(e)}")
+    finally:
+        if watchdog is not None:
+            watchdog.cancel()
+        if context:
+            try:
+                await context.close()
+                print(f"[Playwright] 🧹 Context 已關閉")
+            except:
+                pass
+
+
+async def fetch_with_playwright(
+    url: str,
+    wait_for: Optional[str] = None,
+    block_ads: bool = True,
+    stealth_mode: bool = True,
+    browser_pool=None,
+    deadline: Optional[Deadline] = None
+) -> str:
+    """
+    使用 Playwright 獲取動態網頁內容（增強版）
+
+    沒有 browser_pool 時每次啟動新的 Chromium（信號量限制同時數量），用完即關閉；
+    有 browser_pool 時從池中借用已啟動的瀏覽器，只開關 context。
+
+    Args:
+        url: 要訪問的網頁 URL
+        wait_for: 等待特定元素（CSS selector）出現，例如 'article' 或 '.content'
+        block_ads: 是否屏蔽廣告（預設 True）
+        stealth_mode: 是否啟用反爬蟲模式（預設 True）
+        browser_pool: (選填) parser_core.browser_pool.BrowserPool
+        deadline: (選填) 時間預算，等待瀏覽器與渲染都不超過剩餘時間
+
+    Returns:
+        渲染後的 HTML 內容
+
+    Raises:
+        TimeoutError: 在時間預算內等不到瀏覽器或渲染未完成
+        Exception: 當瀏覽器操作失敗時
+    """
+    deadline = deadline or Deadline()
+
+    if browser_pool is not None:
+        async with browser_pool.browser(timeout=deadline.remaining()) as browser:
+            return await render_page(browser, url, wait_for, block_ads, stealth_mode, deadline,
+                                     page_memory_mb=browser_pool.page_memory_mb)
+
+    from playwright.async_api import async_playwright
+
+    # 🔧 使用信號量控制併發，避免 BlockingIOError
+    try:
+        await asyncio.wait_for(PLAYWRIGHT_SEMAPHORE.acquire(), deadline.remaining())
+    except asyncio.TimeoutError:
+        raise TimeoutError("時間預算內等不到可用的瀏覽器")
+    try:
+        print(f"[Playwright] 🔒 獲取併發鎖...")
+
+        async with async_playwright() as p:
+            browser = None  # 初始化變數，確保 finally 可以檢查
+            try:
+                # 啟動 Chromium 瀏覽器（無頭模式）
+                print(f"[Playwright] 啟動瀏覽器...")
+                try:
+                    browser = await p.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+                except Exception as e:
+                    raise Exception(f"Playwright 錯誤: {str(e)}")
+
+                return await render_page(browser, url, wait_for, block_ads, stealth_mode, deadline)
+
+            finally:
+                # ⚠️ 重要：確保瀏覽器一定會被關閉，避免記憶體洩漏
+                # 🔧 按順序關閉：先 context（render_page 內），再 browser
+                if browser:
+                    try:
+                        await browser.close()
+                        print(f"[Playwright] 🧹 瀏覽器已關閉")
+                    except:
+                        pass  # 忽略關閉時的錯誤
+                print(f"[Playwright] 🔓 釋放併發鎖")
+                # 🧹 清理 Chromium 臨時文件，防止 /tmp 空間耗盡
+                cleanup_chromium_temp()
+    finally:
+        PLAYWRIGHT_SEMAPHORE.release()
@@ -0,0 +1,209 @@
+"""
+Google URL 解碼器（共用模組）
+
+支援的格式：
+- Google News/Alerts 重定向: https://www.google.com/url?url=...（也支援 q、u 參數）
+- Google News RSS 文章: https://news.google.com/rss/articles/CBMi...
+  （文章 ID 是 base64url 編碼的 protobuf，離線即可解出真實網址）
+
+只使用標準函式庫，decoder-server.py 等輕量級服務可以直接匯入。
+解碼結果以 LRU 快取，批次處理時同一批次內的重複網址只解碼一次。
+"""
+
+import base64
+import binascii
+import os
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Tuple
+from urllib.parse import urlparse, parse_qs, unquote
+
+# LRU 快取大小（可透過環境變數調整）
+DECODE_CACHE_SIZE = int(os.getenv('GOOGLE_URL_CACHE_SIZE', '50000'))
+
+# 批次端點單次最多處理的網址數量
+MAX_BATCH_SIZE = int(os.getenv('GOOGLE_URL_MAX_BATCH', '10000'))
+
+# 重定向 URL 中可能攜帶目標網址的參數（依序嘗試）
+REDIRECT_PARAMS = ('url', 'q', 'u')
+
+# Google News 文章 ID 所在的路徑前綴
+ARTICLE_PATH_PREFIXES = ('/rss/articles/', '/articles/', '/read/')
+
+# 新版文章 ID（解碼後以此開頭）只能透過 Google 線上服務換取網址，離線無法解出
+_ONLINE_ONLY_PREFIX = b'AU_yqL'
+
+# 解碼方式
+METHOD_NOT_GOOGLE = 'not_google'
+METHOD_REDIRECT_PARAM = 'redirect_param'
+METHOD_RSS_ARTICLE = 'rss_article'
+METHOD_UNSUPPORTED_ARTICLE = 'unsupported_article_id'
+METHOD_UNCHANGED = 'unchanged'
+
+
+def _read_varint(buf: bytes, pos: int) -> Tuple[int, int]:
+    """讀取 protobuf varint，回傳 (數值, 下一個位置)"""
+    result = 0
+    shift = 0
+    while pos < len(buf):
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+        if shift > 63:
+            break
+    raise ValueError("無效的 varint")
+
+
+def _iter_length_delimited(buf: bytes):
+    """逐一產生 protobuf 中 length-delimited 欄位的內容（其他型別略過）"""
+    pos = 0
+    while pos < len(buf):
+        key, pos = _read_varint(buf, pos)
+        wire_type = key & 0x07
+        if wire_type == 0:
+            _, pos = _read_varint(buf, pos)
+        elif wire_type == 1:
+            pos += 8
+        elif wire_type == 2:
+            length, pos = _read_varint(buf, pos)
+            yield buf[pos:pos + length]
+            pos += length
+        elif wire_type == 5:
+            pos += 4
+        else:
+            # 不支援的 wire type（group 等），停止解析
+            return
+
+
+def decode_article_id(article_id: str) -> Tuple[str, str]:
+    """
+    解碼 Google News 文章 ID
+
+    Args:
+        article_id: /rss/articles/ 後面的那段 ID
+
+    Returns:
+        (真實網址或空字串, 解碼方式)
+    """
+    try:
+        raw = base64.urlsafe_b64decode(article_id + '=' * (-len(article_id) % 4))
+    except (binascii.Error, ValueError):
+        return '', METHOD_UNSUPPORTED_ARTICLE
+
+    try:
+        for value in _iter_length_delimited(raw):
+            if value.startswith((b'http://', b'https://')):
+                return value.decode('utf-8', errors='replace'), METHOD_RSS_ARTICLE
+            if value.startswith(_ONLINE_ONLY_PREFIX):
+                break
+    except ValueError:
+        pass
+
+    return '', METHOD_UNSUPPORTED_ARTICLE
+
+
+@lru_cache(maxsize=DECODE_CACHE_SIZE)
+def _decode_cached(google_url: str) -> Tuple[str, str]:
+    """解碼單一網址（結果快取），回傳 (解碼後網址, 解碼方式)"""
+    try:
+        parsed = urlparse(google_url)
+
+        # 不是 Google URL，直接返回原 URL
+        if 'google.com' not in parsed.netloc:
+            return google_url, METHOD_NOT_GOOGLE
+
+        # 重定向參數：url、q、u
+        if parsed.query:
+            query_params = parse_qs(parsed.query)
+            for param in REDIRECT_PARAMS:
+                if param in query_params and query_params[param]:
+                    decoded_url = unquote(query_params[param][0])
+                    if decoded_url.startswith(('http://', 'https://')):
+                        return decoded_url, METHOD_REDIRECT_PARAM
+
+        # Google News RSS 文章 ID
+        for prefix in ARTICLE_PATH_PREFIXES:
+            if parsed.path.startswith(prefix):
+                article_id = parsed.path[len(prefix):].split('/', 1)[0]
+                decoded_url, method = decode_article_id(article_id)
+                return (decoded_url or google_url), method
+
+        return google_url, METHOD_UNCHANGED
+
+    except Exception as e:
+        # 解析失敗，返回原 URL
+        print(f"⚠️  解析失敗: {str(e)}")
+        return google_url, METHOD_UNCHANGED
+
+
+def decode_google_url(google_url: str) -> str:
+    """
+    從 Google 重定向 URL 中提取真實的目標 URL
+
+    Args:
+        google_url: Google 重定向 URL
+
+    Returns:
+        真實的目標 URL，如果解析失敗則返回原 URL
+
+    Examples:
+        >>> decode_google_url('https://www.google.com/url?url=https://example.com&...')
+        'https://example.com'
+    """
+    return _decode_cached(google_url)[0]
+
+
+def build_decode_result(google_url: str) -> Dict[str, Any]:
+    """
+    產生單一網址的解碼結果（API 回應格式）
+
+    Returns:
+        {
+            "original_url": ..., "decoded_url": ...,
+            "is_google_url": bool, "changed": bool, "method": 解碼方式
+        }
+    """
+    decoded_url, method = _decode_cached(google_url)
+    return {
+        "original_url": google_url,
+        "decoded_url": decoded_url,
+        "is_google_url": 'google.com' in google_url,
+        "changed": google_url != decoded_url,
+        "method": method
+    }
+
+
+def decode_google_urls(urls: Iterable[str]) -> List[Dict[str, Any]]:
+    """
+    批次解碼 Google URL
+
+    同一批次內重複的網址只解碼一次，結果依輸入順序回傳；
+    每個位置都是獨立的 dict（呼叫端修改其中一筆，例如加上 id，不會影響其他重複網址的結果）。
+
+    Args:
+        urls: 要解碼的網址列表
+
+    Returns:
+        每個網址的解碼結果（格式同 build_decode_result）
+    """
+    unique_results: Dict[str, Dict[str, Any]] = {}
+    results = []
+    for url in urls:
+        result = unique_results.get(url)
+        if result is None:
+            result = unique_results[url] = build_decode_result(url)
+        results.append(dict(result))
+    return results
+
+
+def decode_cache_info() -> Dict[str, int]:
+    """LRU 快取統計（用於 /health）"""
+    info = _decode_cached.cache_info()
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "max_size": info.maxsize
+    }
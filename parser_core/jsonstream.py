@@ -0,0 +1,95 @@
+"""
+串流讀取 JSON 陣列 / JSONL 檔案
+
+批次工具的輸入與結果檔可能有數萬筆，整個 json.load 會一次吃掉大量記憶體。
+這裡逐筆產生陣列元素，只保留目前正在解析的那一段文字。
+"""
+
+import json
+from typing import Any, Dict, Iterator
+
+_CHUNK_SIZE = 1 << 16
+_WHITESPACE = ' \t\r\n'
+
+
+def iter_json_records(path: str, chunk_size: int = _CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    逐筆讀取 JSON 陣列（[{...}, {...}]）或 JSONL（每行一個物件）
+
+    以第一個非空白字元判斷格式：'[' 為 JSON 陣列，其他視為 JSONL。
+
+    Args:
+        path: 檔案路徑
+        chunk_size: 每次讀取的字元數
+
+    Yields:
+        每一筆資料
+
+    Raises:
+        ValueError: 檔案格式錯誤
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        head = f.read(chunk_size)
+        stripped = head.lstrip(_WHITESPACE)
+        if stripped.startswith('['):
+            yield from _iter_array(f, stripped[1:], chunk_size)
+        else:
+            yield from _iter_lines(f, head)
+
+
+def _iter_lines(f, head: str) -> Iterator[Dict[str, Any]]:
+    """JSONL：逐行解析（略過空行）"""
+    buffer = head
+    while True:
+        *lines, buffer = buffer.split('\n')
+        for line in lines:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+        chunk = f.read(_CHUNK_SIZE)
+        if not chunk:
+            break
+        buffer += chunk
+    if buffer.strip():
+        yield json.loads(buffer)
+
+
+def _iter_array(f, buffer: str, chunk_size: int) -> Iterator[Dict[str, Any]]:
+    """JSON 陣列：用 raw_decode 逐一解析元素，資料不足時再讀下一段"""
+    decoder = json.JSONDecoder()
+    eof = False
+    expect_value = True
+
+    while True:
+        buffer = buffer.lstrip(_WHITESPACE)
+
+        if not buffer:
+            if eof:
+                raise ValueError('JSON 陣列未結束（缺少 ]）')
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer = chunk
+            continue
+
+        if buffer[0] == ']':
+            return
+        if not expect_value:
+            if buffer[0] != ',':
+                raise ValueError(f'JSON 陣列格式錯誤：預期 , 或 ]，實際為 {buffer[0]!r}')
+            buffer = buffer[1:]
+            expect_value = True
+            continue
+
+        try:
+            record, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+            continue
+
+        yield record
+        buffer = buffer[end:]
+        expect_value = False
@@ -0,0 +1,546 @@
+"""
+解析流程：路由 → 下載（含重試）→ 提取
+
+兩個 parser-server.py 與批次工具都透過這裡解析網頁，穩定的非同步 API：
+
+    from parser_core.pipeline import parse, ParseOptions
+
+    result = await parse(url, ParseOptions(max_retries=3))
+    result.to_dict()   # 與 /api/parse 回應格式相同
+
+核心不依賴 FastAPI：失敗時拋出 ParseError（含 HTTP 狀態碼與訊息），
+由伺服器轉成 HTTPException，批次工具則直接記錄錯誤。
+
+長時間執行的呼叫端（例如批次工具的 --local 模式）可以傳入：
+- browser_pool：parser_core.browser_pool.BrowserPool，重用已啟動的瀏覽器
+- executor：concurrent.futures 執行器，trafilatura 提取改在其中執行，不阻塞事件迴圈
+- snapshot_store：parser_core.snapshots.SnapshotStore，下載到的原始 HTML 存成快照（/api/reparse 使用）
+
+parse() 入口先以 canonical_url.canonicalize_url() 正規化網址（去掉追蹤參數、預設埠等），
+路由、下載、快照都使用正規化後的網址，並在結果中回傳 canonical_url。
+
+每個請求都有時間預算（ParseOptions.deadline_ms，預設 PARSE_DEADLINE_MS）：重試與等待只在
+剩餘時間足夠時進行，時間用完時 parse() 回傳 deadline_exceeded 結果（有靜態結果時附上部分資料）。
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from parser_core.extract import (
+    DEFAULT_CONTENT_FORMAT,
+    content_output_format,
+    extract_article,
+    select_fields,
+)
+from parser_core.canonical_url import canonicalize_url
+from parser_core.deadline import Deadline
+from parser_core.fetch import fetch_html, fetch_with_playwright
+from parser_core.routing import get_routing_decision
+
+
+class ParseError(Exception):
+    """解析失敗（status_code 與 detail 對應 HTTP 錯誤回應）"""
+
+    def __init__(self, detail: str, status_code: int = 500):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+class DeadlineExceeded(ParseError):
+    """時間預算用完（HTTP 504）"""
+
+    def __init__(self, detail: str):
+        super().__init__(detail, status_code=504)
+
+
+# 剩餘時間少於這些秒數時不再開始新的嘗試
+MIN_STATIC_ATTEMPT_SECONDS = 2.0
+MIN_PLAYWRIGHT_ATTEMPT_SECONDS = 5.0
+
+
+async def _wait_before_retry(seconds: float, deadline: Deadline, min_attempt: float, last_error: Exception):
+    """重試前等待；等待後剩下的時間不夠再試一次時直接放棄"""
+    if not deadline.can_afford(seconds + min_attempt):
+        raise DeadlineExceeded(f"時間預算不足以重試（已用 {deadline.elapsed():.1f} 秒）: {last_error}")
+    await asyncio.sleep(seconds)
+
+
+@dataclass
+class ParseOptions:
+    """parse() 的選項（預設值與 /api/parse 相同）"""
+    max_retries: int = 3
+    skip_ssl: bool = False
+    wait_for: Optional[str] = None
+    block_ads: bool = True
+    stealth_mode: bool = True
+    fields: Optional[List[str]] = None              # None = 全部欄位（見 extract.resolve_fields）
+    content_format: str = DEFAULT_CONTENT_FORMAT    # content 欄位格式：xml/html/markdown/text
+    deadline_ms: Optional[int] = None               # 時間預算；None = PARSE_DEADLINE_MS，0 = 不限制
+
+    @property
+    def output_format(self) -> Optional[str]:
+        """傳給 extract_article 的 output_format（None 代表跳過格式化提取）"""
+        return content_output_format(self.fields, self.content_format)
+
+
+@dataclass
+class ParseResult:
+    """
+    parse() 的結果
+
+    to_dict() 產生與 /api/parse 相同的回應：靜態路徑帶 attempt/retries，
+    Playwright 路徑帶 method/attempts，黑名單帶 reason/suggestion/use_rss_instead，
+    時間預算用完帶 deadline_exceeded（partial 表示 data 只有靜態解析的部分結果）。
+    canonical_url 為正規化後實際解析的網址。
+    """
+    success: bool
+    data: Optional[Dict[str, Any]] = None
+    routing_decision: Optional[str] = None
+    method: Optional[str] = None
+    attempt: Optional[int] = None
+    retries: Optional[int] = None
+    attempts: Optional[int] = None
+    reason: Optional[str] = None
+    suggestion: Optional[str] = None
+    use_rss_instead: Optional[bool] = None
+    static_error: Optional[str] = None
+    deadline_exceeded: Optional[bool] = None
+    partial: Optional[bool] = None
+    canonical_url: Optional[str] = None
+
+    @classmethod
+    def from_fetch(cls, result: Dict[str, Any], routing_decision: str, **extra) -> 'ParseResult':
+        """由 fetch_and_parse_with_retry / fetch_and_parse_with_playwright 的回傳值建立"""
+        return cls(routing_decision=routing_decision, **result, **extra)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """轉成 API 回應（省略值為 None 的選填欄位）"""
+        result = {"success": self.success, "data": self.data}
+        for key in ('canonical_url', 'method', 'attempts', 'attempt', 'retries', 'reason', 'suggestion',
+                    'routing_decision', 'use_rss_instead', 'static_error', 'deadline_exceeded', 'partial'):
+            value = getattr(self, key)
+            if value is not None:
+                result[key] = value
+        return result
+
+
+async def run_extract(html_content: str, url: str, rendering_method: Optional[str] = None,
+                      output_format: Optional[str] = DEFAULT_CONTENT_FORMAT,
+                      executor: Optional[Executor] = None) -> Dict[str, Any]:
+    """執行 extract_article；有 executor 時在其中執行（ProcessPoolExecutor 可用滿多核心）"""
+    if executor is None:
+        return extract_article(html_content, url, rendering_method, output_format)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor, extract_article, html_content, url, rendering_method, output_format
+    )
+
+
+async def fetch_and_parse_with_retry(
+    url: str,
+    max_retries: int = 3,
+    skip_ssl: bool = False,
+    executor: Optional[Executor] = None,
+    output_format: Optional[str] = DEFAULT_CONTENT_FORMAT,
+    deadline: Optional[Deadline] = None,
+    snapshot_store=None
+) -> Dict[str, Any]:
+    """
+    下載並解析網頁內容（支援重試）
+
+    Args:
+        url: 要解析的網頁 URL
+        max_retries: 最大重試次數
+        skip_ssl: 是否跳過 SSL 驗證
+        executor: 執行 trafilatura 提取的執行器（None 則在目前執行緒）
+        output_format: content 欄位的 trafilatura 格式（None 則跳過格式化提取）
+        deadline: 時間預算（None 則不限制）
+        snapshot_store: (選填) SnapshotStore，存下下載到的原始 HTML
+
+    Returns:
+        {"success": True, "data": ..., "attempt": N, "retries": N-1}
+
+    Raises:
+        DeadlineExceeded: 時間預算用完
+        ParseError: 當下載或解析失敗時
+    """
+    deadline = deadline or Deadline()
+    last_error = None
+
+    for attempt in range(1, max_retries + 1):
+        try:
+            print(f"[嘗試 {attempt}/{max_retries}] 解析: {url}")
+
+            # 下載網頁內容
+            html_content = await fetch_html(url, skip_ssl=skip_ssl, deadline=deadline)
+            if snapshot_store is not None:
+                await snapshot_store.asave(url, html_content, "static")
+
+            # 使用 trafilatura 解析內容
+            parsed_data = await run_extract(html_content, url, None, output_format, executor)
+
+            title_preview = parsed_data.get('title') or 'No title'
+            print(f"[成功] 嘗試 {attempt}: {title_preview[:50] if title_preview else 'No title'}")
+            return {
+                "success": True,
+                "data": parsed_data,
+                "attempt": attempt,
+                "retries": attempt - 1
+            }
+
+        except httpx.HTTPStatusError as e:
+            last_error = e
+            status_code = e.response.status_code
+            print(f"[失敗] 嘗試 {attempt}: HTTP {status_code} - {str(e)}")
+
+            # 如果是最後一次嘗試，拋出錯誤
+            if attempt == max_retries:
+                raise ParseError(
+                    f"下載網頁失敗: Client error '{status_code} {e.response.reason_phrase}' for url '{url}'\nFor more information check: https://developer.mozilla.org/en-US/docs/Web/HTTP/Status/{status_code}"
+                )
+
+            # 根據錯誤類型決定等待時間
+            if status_code in [429, 403]:
+                # 429 Too Many Requests 或 403 Forbidden：指數退避
+                wait_time = (2 ** attempt)  # 2秒、4秒、8秒...
+                print(f"[等待] {wait_time} 秒後重試（HTTP {status_code}）...")
+                await _wait_before_retry(wait_time, deadline, MIN_STATIC_ATTEMPT_SECONDS, e)
+            else:
+                # 其他錯誤：短暫等待
+                await _wait_before_retry(1, deadline, MIN_STATIC_ATTEMPT_SECONDS, e)
+
+        except httpx.ConnectError as e:
+            last_error = e
+            print(f"[失敗] 嘗試 {attempt}: 連接錯誤 - {str(e)}")
+
+            if attempt == max_retries:
+                raise ParseError(f"下載網頁失敗: 無法連接到 {url}")
+
+            await _wait_before_retry(2, deadline, MIN_STATIC_ATTEMPT_SECONDS, e)
+
+        except TimeoutError as e:
+            # 下載超過時間預算（fetch_html 的 deadline），不再重試
+            print(f"[逾時] 嘗試 {attempt}: {str(e)}")
+            raise DeadlineExceeded(f"下載網頁超過時間預算: {str(e)}")
+
+        except Exception as e:
+            error_msg = str(e)
+            print(f"[失敗] 嘗試 {attempt}: {error_msg}")
+
+            # SSL 錯誤處理
+            if "SSL" in error_msg or "certificate" in error_msg.lower():
+                last_error = e
+
+                if attempt == max_retries:
+                    if skip_ssl:
+                        raise ParseError(f"下載網頁失敗: {error_msg}")
+                    else:
+                        raise ParseError(
+                            f"下載網頁失敗: {error_msg}\n\n💡 提示：可以嘗試設定 skip_ssl: true 來跳過 SSL 驗證"
+                        )
+
+                # 下次嘗試時跳過 SSL 驗證
+                if not skip_ssl:
+                    print(f"[SSL 錯誤] 下次將跳過 SSL 驗證...")
+                    skip_ssl = True
+
+                await _wait_before_retry(1, deadline, MIN_STATIC_ATTEMPT_SECONDS, e)
+            else:
+                # 其他錯誤
+                last_error = e
+
+                if attempt == max_retries:
+                    raise ParseError(f"解析網頁失敗: {error_msg}")
+
+                await _wait_before_retry(1, deadline, MIN_STATIC_ATTEMPT_SECONDS, e)
+
+    # 理論上不會到達這裡，但以防萬一
+    raise ParseError(f"解析網頁失敗: {str(last_error)}")
+
+
+async def fetch_and_parse_with_playwright(
+    url: str,
+    wait_for: Optional[str] = None,
+    block_ads: bool = True,
+    stealth_mode: bool = True,
+    max_retries: int = 2,
+    browser_pool=None,
+    executor: Optional[Executor] = None,
+    output_format: Optional[str] = DEFAULT_CONTENT_FORMAT,
+    deadline: Optional[Deadline] = None,
+    snapshot_store=None
+) -> Dict[str, Any]:
+    """
+    使用 Playwright 下載並解析動態網頁內容（增強版 + 重試機制）
+
+    Args:
+        url: 要解析的網頁 URL
+        wait_for: 等待特定元素出現
+        block_ads: 是否屏蔽廣告
+        stealth_mode: 是否啟用反爬蟲模式
+        max_retries: 最大重試次數（預設 2 次）
+        browser_pool: 重用瀏覽器的 BrowserPool（None 則每次啟動新瀏覽器）
+        executor: 執行 trafilatura 提取的執行器（None 則在目前執行緒）
+        output_format: content 欄位的 trafilatura 格式（None 則跳過格式化提取）
+        deadline: 時間預算（None 則不限制）
+        snapshot_store: (選填) SnapshotStore，存下渲染後的 HTML
+
+    Returns:
+        {"success": True, "data": ..., "method": "playwright", "attempts": N}
+
+    Raises:
+        DeadlineExceeded: 時間預算用完
+        ParseError: 所有重試都失敗時
+    """
+    deadline = deadline or Deadline()
+    last_error = None
+
+    if not deadline.can_afford(MIN_PLAYWRIGHT_ATTEMPT_SECONDS):
+        raise DeadlineExceeded(f"剩餘時間不足以使用 Playwright（已用 {deadline.elapsed():.1f} 秒）")
+
+    for attempt in range(1, max_retries + 1):
+        try:
+            if attempt > 1:
+                print(f"[Playwright] 重試 {attempt}/{max_retries}")
+                # 等待 3 秒後重試
+                await _wait_before_retry(3, deadline, MIN_PLAYWRIGHT_ATTEMPT_SECONDS, last_error)
+
+            # 使用 Playwright 獲取渲染後的 HTML
+            html_content = await fetch_with_playwright(url, wait_for, block_ads, stealth_mode,
+                                                       browser_pool=browser_pool, deadline=deadline)
+            if snapshot_store is not None:
+                await snapshot_store.asave(url, html_content, "playwright")
+
+            # 使用 trafilatura 解析內容
+            parsed_data = await run_extract(html_content, url, "playwright", output_format, executor)
+
+            # 成功解析，返回結果
+            print(f"[Playwright] ✅ 第 {attempt} 次嘗試成功")
+            return {
+                "success": True,
+                "data": parsed_data,
+                "method": "playwright",
+                "attempts": attempt
+            }
+
+        except DeadlineExceeded:
+            raise
+
+        except TimeoutError as e:
+            # 等不到瀏覽器或渲染超過時間預算，不再重試
+            print(f"[Playwright] ⏱️ 第 {attempt} 次嘗試超過時間預算: {str(e)}")
+            raise DeadlineExceeded(f"使用 Playwright 解析超過時間預算: {str(e)}")
+
+        except Exception as e:
+            last_error = e
+            print(f"[Playwright] ❌ 第 {attempt} 次嘗試失敗: {str(e)}")
+
+            if attempt == max_retries:
+                # 所有重試都失敗了
+                raise ParseError(f"使用 Playwright 解析失敗（已重試 {max_retries} 次）: {str(e)}")
+
+    # 理論上不會到達這裡
+    raise ParseError(f"使用 Playwright 解析失敗: {str(last_error)}")
+
+
+async def reparse(
+    snapshot_store,
+    url: Optional[str] = None,
+    content_hash: Optional[str] = None,
+    output_format: Optional[str] = DEFAULT_CONTENT_FORMAT,
+    executor: Optional[Executor] = None
+) -> Dict[str, Any]:
+    """
+    由原始 HTML 快照重新提取（不重新下載）
+
+    Args:
+        snapshot_store: SnapshotStore（None 代表伺服器未啟用快照）
+        url: 使用該 URL 最新的快照（先以正規化網址查詢，找不到時再用原網址）
+        content_hash: 使用指定內容 hash 的快照（優先於 url）
+        output_format: content 欄位的 trafilatura 格式（None 則跳過格式化提取）
+        executor: 執行 trafilatura 提取的執行器（None 則在目前執行緒）
+
+    Returns:
+        {"success": True, "data": ..., "snapshot": {...}, "extract_ms": N}
+
+    Raises:
+        ParseError: 未啟用快照（503）或找不到快照（404）
+    """
+    if snapshot_store is None:
+        raise ParseError("快照儲存未啟用，請設定 SNAPSHOT_DIR", status_code=503)
+
+    def load():
+        snapshot = snapshot_store.find(url=canonicalize_url(url) if url else None, content_hash=content_hash)
+        if snapshot is None and url and not content_hash:
+            # 正規化之前存的快照以原網址為鍵
+            snapshot = snapshot_store.find(url=url)
+        return snapshot, (snapshot_store.load(snapshot) if snapshot is not None else None)
+
+    snapshot, html_content = await asyncio.to_thread(load)
+    if snapshot is None:
+        raise ParseError(f"找不到快照: {content_hash or url}", status_code=404)
+
+    started = time.perf_counter()
+    rendering_method = "playwright" if snapshot["method"] == "playwright" else None
+    parsed_data = await run_extract(html_content, snapshot["url"], rendering_method, output_format, executor)
+    snapshot.pop("codec", None)
+    return {
+        "success": True,
+        "data": parsed_data,
+        "snapshot": snapshot,
+        "extract_ms": round((time.perf_counter() - started) * 1000, 1)
+    }
+
+
+async def parse(url: str, options: Optional[ParseOptions] = None,
+                browser_pool=None, executor: Optional[Executor] = None,
+                deadline: Optional[Deadline] = None, snapshot_store=None) -> ParseResult:
+    """
+    解析網頁內容（智慧路由 + 重試 + 自動降級）
+
+    - 黑名單域名：直接返回失敗，建議使用 RSS
+    - 已知動態網站：直接使用 Playwright（不浪費時間）
+    - 已知靜態網站：只用靜態解析（速度快）
+    - 未知網站：先試靜態，失敗後自動使用 Playwright
+    - 超過時間預算：回傳 deadline_exceeded 結果，不再繼續佔用瀏覽器
+
+    Args:
+        url: 要解析的網頁 URL（先正規化，見 canonical_url）
+        options: 解析選項（預設 ParseOptions()）
+        browser_pool: 重用瀏覽器的 BrowserPool（None 則每次啟動新瀏覽器）
+        executor: 執行 trafilatura 提取的執行器（None 則在目前執行緒）
+        deadline: 呼叫端已建立的時間預算（None 則依 options.deadline_ms 建立）
+        snapshot_store: 存原始 HTML 快照的 SnapshotStore（None 則不存）
+
+    Returns:
+        ParseResult
+
+    Raises:
+        ParseError: 解析失敗時
+    """
+    options = options or ParseOptions()
+    deadline = deadline or Deadline.from_ms(options.deadline_ms)
+
+    canonical = canonicalize_url(url)
+    if canonical != url:
+        print(f"[網址正規化] {url} → {canonical}")
+    url = canonical
+
+    # 🧠 智慧路由決策
+    routing = get_routing_decision(url)
+    print(f"[智慧路由] 決策: {routing['action']} - {routing['reason']}")
+
+    try:
+        result = await _parse_routed(url, routing, options, deadline, browser_pool, executor, snapshot_store)
+    except DeadlineExceeded as e:
+        print(f"[智慧路由] ⏱️ 超過時間預算（{deadline.elapsed():.1f} 秒）: {e.detail}")
+        result = ParseResult(
+            success=False,
+            reason=e.detail,
+            routing_decision=routing['action'],
+            deadline_exceeded=True
+        )
+
+    result.canonical_url = url
+    # 欄位篩選在路由判斷之後（判斷靜態是否成功需要 text_content）
+    result.data = select_fields(result.data, options.fields)
+    return result
+
+
+async def _parse_routed(url: str, routing: Dict[str, Any], options: ParseOptions, deadline: Deadline,
+                        browser_pool, executor: Optional[Executor], snapshot_store) -> ParseResult:
+    """依智慧路由決策解析（parse() 的主體）"""
+    # 情況 1：黑名單域名 - 直接返回失敗
+    if routing['action'] == 'block':
+        print(f"[智慧路由] ⛔ 域名在黑名單中，跳過解析")
+        return ParseResult(
+            success=False,
+            reason=routing['reason'],
+            suggestion=routing['suggestion'],
+            routing_decision=routing['action'],
+            use_rss_instead=True
+        )
+
+    playwright_kwargs = dict(
+        wait_for=options.wait_for,
+        block_ads=options.block_ads,
+        stealth_mode=options.stealth_mode,
+        browser_pool=browser_pool,
+        executor=executor,
+        output_format=options.output_format,
+        deadline=deadline,
+        snapshot_store=snapshot_store
+    )
+
+    # 情況 2：已知需要動態渲染 - 直接用 Playwright
+    if routing['action'] == 'dynamic':
+        print(f"[智慧路由] 🎭 直接使用 Playwright（已知動態網站）")
+        result = await fetch_and_parse_with_playwright(url, **playwright_kwargs)
+        return ParseResult.from_fetch(result, 'dynamic_direct', suggestion=routing.get('suggestion'))
+
+    # 情況 3：已知靜態即可 - 只用靜態
+    if routing['action'] == 'static':
+        print(f"[智慧路由] ⚡ 使用靜態解析（已知靜態網站）")
+        result = await fetch_and_parse_with_retry(
+            url,
+            max_retries=options.max_retries,
+            skip_ssl=options.skip_ssl,
+            executor=executor,
+            output_format=options.output_format,
+            deadline=deadline,
+            snapshot_store=snapshot_store
+        )
+        return ParseResult.from_fetch(result, 'static_only')
+
+    # 情況 4：未知域名 - 先試靜態，失敗後自動用 Playwright
+    print(f"[智慧路由] 🔄 先試靜態，失敗後自動使用 Playwright")
+    static_result = None
+    try:
+        static_result = await fetch_and_parse_with_retry(
+            url,
+            max_retries=1,  # 靜態只試一次，避免浪費時間
+            skip_ssl=options.skip_ssl,
+            executor=executor,
+            output_format=options.output_format,
+            deadline=deadline,
+            snapshot_store=snapshot_store
+        )
+
+        # 檢查是否真的有內容
+        if static_result.get('success') and static_result.get('data', {}).get('text_content'):
+            print(f"[智慧路由] ✅ 靜態解析成功")
+            return ParseResult.from_fetch(static_result, 'static_success')
+        raise ParseError("靜態解析無內容，嘗試動態渲染")
+
+    except DeadlineExceeded:
+        raise
+
+    except Exception as static_error:
+        print(f"[智慧路由] ⚠️ 靜態解析失敗: {str(static_error)}")
+        print(f"[智慧路由] 🎭 自動切換到 Playwright...")
+
+        # 切換到 Playwright
+        try:
+            result = await fetch_and_parse_with_playwright(url, **playwright_kwargs)
+        except DeadlineExceeded as e:
+            if static_result is None:
+                raise
+            # 靜態有下載到頁面（只是沒有正文）：回傳部分結果（元數據等）
+            print(f"[智慧路由] ⏱️ 超過時間預算，回傳靜態解析的部分結果")
+            return ParseResult(
+                success=False,
+                data=static_result.get('data'),
+                reason=e.detail,
+                routing_decision='fallback_to_dynamic',
+                static_error=str(static_error)[:100],
+                deadline_exceeded=True,
+                partial=True
+            )
+        # 記錄靜態失敗原因
+        return ParseResult.from_fetch(result, 'fallback_to_dynamic', static_error=str(static_error)[:100])
@@ -0,0 +1,178 @@
+"""
+伺服器啟動預熱與就緒狀態
+
+部署或重啟後的第一個動態請求要付出 Playwright driver 啟動 + Chromium 啟動的時間，
+第一次 trafilatura 提取也要載入 lxml / 字元偵測等模組。啟動時在背景先完成這些工作：
+
+- /ready：預熱完成（且瀏覽器能啟動）才回 200，否則 503，適合作為部署的 healthcheck
+- /health：永遠回 200（程序存活），內容為各子系統的實際狀態與客戶端斷線取消的統計
+
+使用方式（FastAPI lifespan）：
+
+    state = ServerState()
+
+    @asynccontextmanager
+    async def lifespan(app):
+        state.start_warm_up()
+        yield
+        await state.close()
+
+環境變數：
+- PLAYWRIGHT_WARM_BROWSERS：啟動時預先啟動幾個瀏覽器（預設 1，0 表示不預熱瀏覽器）
+- WARM_EXTRACT：啟動時先跑一次 trafilatura 提取（預設 1，0 表示不預熱）
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from parser_core.browser_pool import BrowserPool
+from parser_core.cancellation import CancellationStats
+from parser_core.dedup import NearDuplicateIndex
+from parser_core.feeds import FeedStore
+from parser_core.fetch import PLAYWRIGHT_CONCURRENCY
+from parser_core.snapshots import SnapshotStore
+from parser_core.storage_state import STORAGE_STATES
+
+WARM_BROWSERS = int(os.getenv('PLAYWRIGHT_WARM_BROWSERS', '1'))
+WARM_EXTRACT = os.getenv('WARM_EXTRACT', '1') != '0'
+
+# 預熱提取用的範例頁面（走過 extract、extract_metadata 與 XML 輸出）
+_WARM_UP_HTML = (
+    "<html><head><title>Warm up</title><meta name='author' content='Parser'></head>"
+    "<body><article><h1>Warm up</h1>"
+    + "<p>This paragraph only exists to load the extraction code paths at startup.</p>" * 5
+    + "</article></body></html>"
+)
+
+# 各項檢查的狀態
+PENDING, OK, FAILED, SKIPPED = "pending", "ok", "failed", "skipped"
+
+
+class ServerState:
+    """共用瀏覽器池 + 啟動預熱 + /health、/ready 的狀態"""
+
+    def __init__(self, pool_size: int = PLAYWRIGHT_CONCURRENCY, warm_browsers: int = WARM_BROWSERS,
+                 warm_extract: bool = WARM_EXTRACT):
+        """
+        Args:
+            pool_size: 瀏覽器池大小（每個瀏覽器同時渲染 PLAYWRIGHT_PAGES_PER_BROWSER 個頁面）
+            warm_browsers: 啟動時預先啟動的瀏覽器數量
+            warm_extract: 啟動時是否預熱 trafilatura 提取
+        """
+        self.browser_pool = BrowserPool(size=pool_size)
+        self.cancellations = CancellationStats()
+        # 原始 HTML 快照（SNAPSHOT_DIR 未設定時為 None）
+        self.snapshot_store = SnapshotStore.from_env()
+        # webhook 文章的近似重複索引（最近 DEDUP_MAX_ITEMS 篇）
+        self.dedup_index = NearDuplicateIndex()
+        # /api/ingest 的 feed 狀態與已處理文章（第一次匯入時才建立 FEED_STATE_PATH）
+        self.feed_store = FeedStore()
+        self.warm_browsers = min(max(0, warm_browsers), self.browser_pool.size)
+        self.warm_extract = warm_extract
+        self.started_at = datetime.now()
+        self.warm_up_seconds: Optional[float] = None
+        self.checks: Dict[str, str] = {"extract": PENDING, "browser": PENDING}
+        self.errors: Dict[str, str] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start_warm_up(self) -> asyncio.Task:
+        """在背景開始預熱（伺服器可以先接受 /health 請求）"""
+        if self._task is None:
+            self._task = asyncio.create_task(self.warm_up())
+        return self._task
+
+    async def warm_up(self):
+        """預熱提取與瀏覽器池，並記錄每一項的結果"""
+        started = time.monotonic()
+        print("[預熱] 🔥 開始預熱...")
+
+        if self.warm_extract:
+            try:
+                from parser_core.extract import extract_article
+                await asyncio.to_thread(extract_article, _WARM_UP_HTML, "https://example.com/warm-up")
+                self.checks["extract"] = OK
+            except Exception as e:
+                self.checks["extract"] = FAILED
+                self.errors["extract"] = f"{type(e).__name__}: {e}"
+        else:
+            self.checks["extract"] = SKIPPED
+
+        if self.warm_browsers:
+            try:
+                await self.browser_pool.warm_up(self.warm_browsers)
+                self.checks["browser"] = OK
+            except Exception as e:
+                self.checks["browser"] = FAILED
+                self.errors["browser"] = f"{type(e).__name__}: {e}"
+        else:
+            self.checks["browser"] = SKIPPED
+
+        self.warm_up_seconds = round(time.monotonic() - started, 2)
+        status = "✅ 完成" if self.ready else "⚠️ 部分失敗"
+        print(f"[預熱] {status}（{self.warm_up_seconds} 秒）: {self.checks}")
+
+    def _browser_status(self) -> str:
+        """瀏覽器檢查的目前狀態（預熱失敗後，之後的請求成功啟動瀏覽器即恢復）"""
+        status = self.checks["browser"]
+        if status in (OK, FAILED) and self.browser_pool.launches:
+            return FAILED if self.browser_pool.last_launch_error else OK
+        return status
+
+    @property
+    def ready(self) -> bool:
+        """預熱完成且沒有失敗的檢查"""
+        checks = {**self.checks, "browser": self._browser_status()}
+        return all(status in (OK, SKIPPED) for status in checks.values())
+
+    def readiness(self) -> Dict[str, Any]:
+        """/ready 的回應內容"""
+        checks = {**self.checks, "browser": self._browser_status()}
+        errors = {name: error for name, error in self.errors.items() if checks.get(name) == FAILED}
+        if checks["browser"] == FAILED and self.browser_pool.last_launch_error:
+            errors["browser"] = self.browser_pool.last_launch_error
+        return {
+            "ready": self.ready,
+            "checks": checks,
+            "errors": errors,
+            "warm_up_seconds": self.warm_up_seconds,
+        }
+
+    def health(self) -> Dict[str, Any]:
+        """/health 的子系統狀態（status: healthy / warming_up / degraded）"""
+        readiness = self.readiness()
+        if readiness["ready"]:
+            status = "healthy"
+        elif PENDING in readiness["checks"].values():
+            status = "warming_up"
+        else:
+            status = "degraded"
+        return {
+            "status": status,
+            "ready": readiness["ready"],
+            "checks": readiness["checks"],
+            "errors": readiness["errors"],
+            "uptime_seconds": round((datetime.now() - self.started_at).total_seconds(), 1),
+            "warm_up_seconds": self.warm_up_seconds,
+            "browser_pool": self.browser_pool.stats(),
+            "storage_states": STORAGE_STATES.stats() if STORAGE_STATES is not None else None,
+            "cancellations": self.cancellations.stats(),
+            "snapshots": self.snapshot_store.stats() if self.snapshot_store is not None else None,
+            "dedup": self.dedup_index.stats(),
+            "feeds": self.feed_store.stats(),
+        }
+
+    async def close(self):
+        """停止預熱並關閉瀏覽器池、快照索引與 feed 狀態"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self.browser_pool.close()
+        if self.snapshot_store is not None:
+            self.snapshot_store.close()
+        self.feed_store.close()
@@ -0,0 +1,302 @@
+"""
+離線錄製 / 重播（record / replay）
+
+回歸測試（test-three-websites.py、120 連結測試）依賴真實網站，時間與結果都會漂移。
+錄製模式把 httpx 與 Playwright 收到的每個回應存進封存目錄；重播模式完全由封存回應、不連網，
+並可注入固定或隨機（固定種子）延遲，讓完整的 /api/parse 流程可以重現地量測效能與正確性。
+
+- httpx：fetch_html 的 AsyncClient 改用 RecordingTransport / ReplayTransport（每個轉址都是一筆）
+- Playwright：render_page 在 context 上註冊 route handler（錄製用 route.fetch()，重播用 route.fulfill()）
+
+同一個請求錄到多個回應時（例如 403 之後重試成功）依序重播，用完後重複最後一個。
+重播時封存中沒有的請求：httpx 拋出 ConnectError，Playwright 的子資源直接中止。
+
+封存目錄：
+
+    ARCHIVE/
+        index.jsonl          每行一個回應：key（來源 方法 URL）、status、headers、body hash、錄製時的耗時
+        bodies/ab/abcdef...  回應內容（以 SHA-256 定址，同樣內容只存一次）
+
+環境變數：
+- PARSER_REPLAY_MODE：off（預設）/ record / replay
+- PARSER_REPLAY_ARCHIVE：封存目錄（預設 replay-archive）
+- PARSER_REPLAY_LATENCY：重播延遲，毫秒（"200"）、範圍（"100-300"）或 "recorded"（錄製時的耗時）
+- PARSER_REPLAY_SEED：範圍延遲的亂數種子（預設 0，同樣的請求順序得到同樣的延遲）
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+REPLAY_MODE = os.getenv('PARSER_REPLAY_MODE', 'off')
+REPLAY_ARCHIVE = os.getenv('PARSER_REPLAY_ARCHIVE', 'replay-archive')
+REPLAY_LATENCY = os.getenv('PARSER_REPLAY_LATENCY', '0')
+REPLAY_SEED = int(os.getenv('PARSER_REPLAY_SEED', '0'))
+
+MODES = ("off", "record", "replay")
+
+# 內容已經解壓縮或重新組成，重播時不能沿用的 header
+_STRIP_HEADERS = {"content-length", "transfer-encoding"}
+_STRIP_DECODED_HEADERS = _STRIP_HEADERS | {"content-encoding"}
+
+
+def request_key(source: str, method: str, url: str) -> str:
+    """
+    封存的鍵：來源 + 方法 + URL（去掉 #fragment）
+
+    httpx 與 Playwright 分開記錄：同一個 URL 先靜態再動態時，兩者的回應不會互相取用。
+    """
+    return f"{source} {method.upper()} {url.split('#', 1)[0]}"
+
+
+def parse_latency(spec: str) -> Tuple[str, float, float]:
+    """
+    解析延遲設定
+
+    Returns:
+        ("fixed", 秒, 秒) / ("range", 最小秒, 最大秒) / ("recorded", 倍數, 0)
+    """
+    spec = (spec or "0").strip().lower()
+    if spec.startswith("recorded"):
+        _, _, factor = spec.partition("x")
+        return "recorded", float(factor or 1), 0.0
+    low, _, high = spec.partition("-")
+    if high:
+        return "range", float(low) / 1000, float(high) / 1000
+    return "fixed", float(low) / 1000, float(low) / 1000
+
+
+class ReplayArchive:
+    """錄製 / 重播的封存目錄"""
+
+    def __init__(self, directory: str, mode: str = "replay", latency: str = "0", seed: int = 0):
+        """
+        Args:
+            directory: 封存目錄
+            mode: record（寫入）或 replay（讀取）
+            latency: 重播延遲設定（見 parse_latency），例如 "0"、"200"、"100-300"、"recorded"、"recordedx0.5"
+            seed: 範圍延遲的亂數種子
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"不支援的模式: {mode}（record / replay）")
+        self.directory = directory
+        self.mode = mode
+        self.latency = parse_latency(latency)
+        self.seed = seed
+        self._random = random.Random(seed)
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.hits = 0
+        self.misses: List[str] = []
+        self._load()
+
+    @classmethod
+    def from_env(cls) -> Optional['ReplayArchive']:
+        """依 PARSER_REPLAY_MODE 建立；off 時回傳 None"""
+        if REPLAY_MODE not in MODES:
+            raise ValueError(f"PARSER_REPLAY_MODE 必須是 {' / '.join(MODES)}")
+        if REPLAY_MODE == "off":
+            return None
+        return cls(REPLAY_ARCHIVE, REPLAY_MODE, REPLAY_LATENCY, REPLAY_SEED)
+
+    def _load(self):
+        index = os.path.join(self.directory, "index.jsonl")
+        if self.mode == "replay" and not os.path.exists(index):
+            raise FileNotFoundError(f"找不到封存: {index}（請先以 record 模式錄製）")
+        if not os.path.exists(index):
+            return
+        with open(index, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries.setdefault(entry["key"], []).append(entry)
+
+    def _body_path(self, body_hash: str) -> str:
+        return os.path.join(self.directory, "bodies", body_hash[:2], body_hash)
+
+    # ==================== 錄製 ====================
+
+    def record(self, source: str, method: str, url: str, status: int, headers: List[Tuple[str, str]],
+               body: bytes, elapsed: float):
+        """寫入一個回應（index.jsonl 只附加，程序中斷也不會損壞已錄製的內容）"""
+        body_hash = hashlib.sha256(body).hexdigest()
+        entry = {
+            "key": request_key(source, method, url),
+            "status": status,
+            "headers": [[name, value] for name, value in headers],
+            "body": body_hash,
+            "size": len(body),
+            "elapsed": round(elapsed, 4),
+        }
+        with self._lock:
+            path = self._body_path(body_hash)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(body)
+            with open(os.path.join(self.directory, "index.jsonl"), "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._entries.setdefault(entry["key"], []).append(entry)
+            self.recorded += 1
+
+    # ==================== 重播 ====================
+
+    def lookup(self, source: str, method: str, url: str) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        """取出下一個錄製的回應與內容；封存中沒有時回傳 None"""
+        key = request_key(source, method, url)
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self.misses.append(key)
+                return None
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            entry = entries[min(cursor, len(entries) - 1)]
+            self.hits += 1
+        with open(self._body_path(entry["body"]), "rb") as f:
+            return entry, f.read()
+
+    def delay_for(self, entry: Dict[str, Any]) -> float:
+        """這個回應要注入的延遲（秒）"""
+        kind, a, b = self.latency
+        if kind == "recorded":
+            return entry.get("elapsed", 0.0) * a
+        if kind == "range":
+            with self._lock:
+                return self._random.uniform(a, b)
+        return a
+
+    def reset(self):
+        """重播游標、亂數種子與統計歸零（同一個封存重播多輪時使用）"""
+        with self._lock:
+            self._cursors.clear()
+            self._random.seed(self.seed)
+            self.hits = 0
+            self.misses = []
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "directory": self.directory,
+            "keys": len(self._entries),
+            "responses": sum(len(entries) for entries in self._entries.values()),
+            "recorded": self.recorded,
+            "hits": self.hits,
+            "misses": len(self.misses),
+        }
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """把實際的回應原樣（未解壓縮）錄進封存，再交給 httpx client"""
+
+    def __init__(self, archive: ReplayArchive, inner: httpx.AsyncBaseTransport):
+        self.archive = archive
+        self.inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.monotonic()
+        response = await self.inner.handle_async_request(request)
+        try:
+            raw = b"".join([chunk async for chunk in response.aiter_raw()])
+        finally:
+            await response.aclose()
+        headers = [(name, value) for name, value in response.headers.multi_items()
+                   if name.lower() not in _STRIP_HEADERS]
+        self.archive.record("httpx", request.method, str(request.url), response.status_code, headers, raw,
+                            time.monotonic() - started)
+        return httpx.Response(response.status_code, headers=headers, content=raw, request=request)
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """由封存回應，不連網"""
+
+    def __init__(self, archive: ReplayArchive):
+        self.archive = archive
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        found = self.archive.lookup("httpx", request.method, str(request.url))
+        if found is None:
+            raise httpx.ConnectError(f"重播封存中沒有這個請求: {request.method} {request.url}", request=request)
+        entry, body = found
+        await asyncio.sleep(self.archive.delay_for(entry))
+        return httpx.Response(entry["status"], headers=entry["headers"], content=body, request=request)
+
+
+_archive: Optional[ReplayArchive] = None
+_archive_loaded = False
+
+
+def get_archive() -> Optional[ReplayArchive]:
+    """目前使用的封存（第一次呼叫時依環境變數建立；off 時為 None）"""
+    global _archive, _archive_loaded
+    if not _archive_loaded:
+        _archive = ReplayArchive.from_env()
+        _archive_loaded = True
+    return _archive
+
+
+def set_archive(archive: Optional[ReplayArchive]):
+    """直接指定封存（效能測試與回歸測試使用；None 表示關閉）"""
+    global _archive, _archive_loaded
+    _archive = archive
+    _archive_loaded = True
+
+
+def httpx_transport(verify: bool = True) -> Optional[httpx.AsyncBaseTransport]:
+    """fetch_html 使用的 transport；沒有啟用錄製 / 重播時回傳 None（httpx 預設）"""
+    archive = get_archive()
+    if archive is None:
+        return None
+    if archive.mode == "record":
+        return RecordingTransport(archive, httpx.AsyncHTTPTransport(verify=verify))
+    return ReplayTransport(archive)
+
+
+async def route_context(context, archive: ReplayArchive):
+    """
+    在 Playwright context 上註冊錄製 / 重播的 route handler
+
+    需在其他 route（例如廣告屏蔽）之前註冊：後註冊的 handler 先執行，
+    以 route.fallback() 交給這裡的請求才會被錄製或重播。
+    """
+    async def handle(route):
+        request = route.request
+        if archive.mode == "record":
+            started = time.monotonic()
+            try:
+                response = await route.fetch()
+                body = await response.body()
+            except Exception:
+                await route.abort()
+                return
+            # route.fetch() 的內容已解壓縮，重播時不帶 content-encoding
+            headers = [(h["name"], h["value"]) for h in response.headers_array
+                       if h["name"].lower() not in _STRIP_DECODED_HEADERS]
+            archive.record("playwright", request.method, request.url, response.status, headers, body,
+                           time.monotonic() - started)
+            await route.fulfill(response=response, body=body)
+            return
+
+        found = archive.lookup("playwright", request.method, request.url)
+        if found is None:
+            await route.abort("internetdisconnected")
+            return
+        entry, body = found
+        await asyncio.sleep(archive.delay_for(entry))
+        headers = {name: value for name, value in entry["headers"]
+                   if name.lower() not in _STRIP_DECODED_HEADERS}
+        await route.fulfill(status=entry["status"], headers=headers, body=body)
+
+    await context.route("**/*", handle)
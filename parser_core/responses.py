@@ -0,0 +1,26 @@
+"""
+FastAPI / Starlette 回應類別
+
+    from parser_core.responses import FastJSONResponse
+
+    @app.post("/api/parse")
+    async def parse_url(...):
+        return FastJSONResponse(result.to_dict())
+
+直接回傳 Response 物件時 FastAPI 不會再跑 jsonable_encoder，內容只序列化一次（orjson）。
+"""
+
+from typing import Any
+
+from starlette.responses import Response
+
+from parser_core.serialization import dumps
+
+
+class FastJSONResponse(Response):
+    """以 parser_core.serialization.dumps 序列化的 JSON 回應"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
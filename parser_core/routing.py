@@ -0,0 +1,131 @@
+"""
+智慧路由：依域名決定解析方式
+
+- 黑名單域名：直接返回失敗，建議使用 RSS
+- 已知動態網站：直接使用 Playwright（不浪費時間試靜態）
+- 已知靜態網站：只用靜態解析（速度快）
+- 未知網站：先試靜態，失敗後自動使用 Playwright
+"""
+
+from typing import Any, Dict
+from urllib.parse import urlparse
+
+# 已知無法解析的網站（黑名單）- 直接返回失敗，建議使用 RSS
+BLOCKED_DOMAINS = [
+    'reuters.com',           # 401 Forbidden - 需要訂閱（paywall）
+    'japantimes.co.jp',      # Cloudflare 人類驗證（CAPTCHA）
+    'content-technology.com', # 403 Forbidden - 強反爬
+    'isna.ir',               # 地區封鎖（伊朗）
+    # 'koin.com',            # 已移除：給 Playwright 一次機會
+]
+
+# 已知必須使用動態渲染的網站（直接用 Playwright，不浪費時間試靜態）
+DYNAMIC_REQUIRED_DOMAINS = [
+    'techstory.in',          # 印度科技新聞（動態載入）
+    'peoplematters.in',      # 印度人力資源新聞（動態載入）
+    'storm.mg',              # 風傳媒（動態載入）
+    'ustv.com.tw',           # 非凡新聞（動態載入）
+    'designnews.com',        # 美國設計新聞（動態載入）
+    'gurufocus.com',         # 美國金融新聞（動態載入）
+    'sammyfans.com',         # 科技新聞（動態載入）
+    'manilatimes.net',       # 菲律賓新聞（動態載入）
+]
+
+# 已知靜態解析即可的網站（優先使用靜態，速度快）
+STATIC_OK_DOMAINS = [
+    # 可以在測試後逐步添加
+    # 例如：'example.com', 'blog.example.com'
+]
+
+# AMP 頁面警告清單（建議轉換為非 AMP 版本）
+AMP_WARNING_PATTERNS = [
+    '/amp', '/amp/', '?amp=1', '&amp=1', '.amp.html'
+]
+
+
+def extract_domain(url: str) -> str:
+    """
+    從 URL 中提取域名（小寫，不含埠號、帳密與開頭的 www.）
+
+    www.example.com:8080 與 example.com 視為同一個域名（路由、每域名間隔等使用）。
+    """
+    try:
+        host = urlparse(url).hostname or ""
+    except ValueError:
+        return ""
+    host = host.rstrip(".")
+    return host[4:] if host.startswith("www.") else host
+
+
+def is_blocked_domain(url: str) -> bool:
+    """檢查是否為黑名單域名"""
+    domain = extract_domain(url)
+    return any(blocked in domain for blocked in BLOCKED_DOMAINS)
+
+
+def requires_dynamic_rendering(url: str) -> bool:
+    """檢查是否需要動態渲染"""
+    domain = extract_domain(url)
+    return any(dynamic in domain for dynamic in DYNAMIC_REQUIRED_DOMAINS)
+
+
+def is_static_ok(url: str) -> bool:
+    """檢查是否可以使用靜態解析"""
+    domain = extract_domain(url)
+    return any(static in domain for static in STATIC_OK_DOMAINS)
+
+
+def is_amp_url(url: str) -> bool:
+    """檢查是否為 AMP 頁面"""
+    return any(pattern in url.lower() for pattern in AMP_WARNING_PATTERNS)
+
+
+def get_routing_decision(url: str) -> Dict[str, Any]:
+    """
+    智慧路由決策
+
+    Returns:
+        {
+            "action": "block" | "dynamic" | "static" | "try_static_first",
+            "reason": "原因說明",
+            "suggestion": "建議（如果有）"
+        }
+    """
+    # 檢查黑名單
+    if is_blocked_domain(url):
+        return {
+            "action": "block",
+            "reason": "域名在黑名單中（已知無法解析）",
+            "suggestion": "建議使用 RSS 摘要代替"
+        }
+
+    # 檢查 AMP 頁面
+    if is_amp_url(url):
+        return {
+            "action": "dynamic",  # AMP 也用動態
+            "reason": "檢測到 AMP 頁面",
+            "suggestion": "建議轉換為非 AMP 版本以獲得更好效果"
+        }
+
+    # 檢查是否已知需要動態渲染
+    if requires_dynamic_rendering(url):
+        return {
+            "action": "dynamic",
+            "reason": "域名已知需要動態渲染（JavaScript 載入內容）",
+            "suggestion": None
+        }
+
+    # 檢查是否已知靜態即可
+    if is_static_ok(url):
+        return {
+            "action": "static",
+            "reason": "域名已知可使用靜態解析（速度快）",
+            "suggestion": None
+        }
+
+    # 未知域名，先嘗試靜態
+    return {
+        "action": "try_static_first",
+        "reason": "未知域名，先嘗試靜態解析，失敗後自動使用動態",
+        "suggestion": None
+    }
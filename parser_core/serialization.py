@@ -0,0 +1,43 @@
+"""
+JSON 序列化（有 orjson 時使用 orjson）
+
+文章回應常有 50-200 KB 的正文，FastAPI 預設的 jsonable_encoder + json.dumps 會逐一走訪每個值；
+orjson 直接輸出 UTF-8 bytes，快一個數量級。沒有安裝 orjson 時退回標準庫，輸出格式相同
+（UTF-8、不跳脫非 ASCII、無多餘空白）。
+
+這個模組只依賴標準庫，decoder-server.py 的熱路徑也可以使用；
+FastAPI 回應類別在 parser_core.responses。
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # orjson 為選用套件
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """orjson / json 不認識的型別（例如 set、pydantic 模型）"""
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if hasattr(value, 'model_dump'):
+        return value.model_dump()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def dumps(data: Any) -> bytes:
+    """序列化成 UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=_default).encode('utf-8')
+
+
+def loads(data) -> Any:
+    """解析 JSON（bytes 或 str）"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
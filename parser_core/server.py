@@ -0,0 +1,1101 @@
+"""
+Parser API 的 FastAPI 應用（parser-server.py 與 parser-api/parser-server.py 共用）
+
+兩個伺服器原本各自維護一份約 1000 行的端點程式碼，每加一個功能就要貼兩次，版本也一再分歧。
+端點、請求模型、背景任務與 middleware 都集中在這裡，伺服器檔案只負責建立 app 與啟動：
+
+    from parser_core.server import create_app, run
+    app = create_app(version="1.8.0")
+    run(app)
+
+- 端點註冊在模組層級的 router，create_app() 建立 FastAPI（lifespan、CORS、壓縮）後掛上
+- 版本號只在 create_app() 指定，首頁與 /health 由 request.app.version 讀取
+- SERVER_STATE（瀏覽器池、快照、dedup、feed 狀態）每個程序一份，所有端點共用
+"""
+
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+
+import httpx
+from fastapi import APIRouter, BackgroundTasks, FastAPI, HTTPException, Request
+from fastapi.middleware.cors import CORSMiddleware
+from pydantic import BaseModel, validator
+
+from parser_core.google_url import (
+    MAX_BATCH_SIZE,
+    build_decode_result,
+    decode_cache_info,
+    decode_google_urls,
+)
+from parser_core.canonical_url import canonical_cache_info, canonicalize_url
+from parser_core.cancellation import run_until_disconnected
+from parser_core.compression import CompressionMiddleware
+from parser_core.deadline import Deadline
+from parser_core.dedup import DEDUP_MODE, DEDUP_MODES, drop_duplicate_content
+from parser_core.extract import (
+    content_output_format,
+    resolve_fields,
+    select_fields,
+    validate_content_format,
+)
+from parser_core.feeds import INGEST_MAX_ITEMS, ingest
+from parser_core.readiness import ServerState
+from parser_core.responses import FastJSONResponse
+from parser_core.serialization import dumps
+from parser_core.pipeline import (
+    ParseError,
+    ParseOptions,
+    fetch_and_parse_with_playwright,
+    fetch_and_parse_with_retry,
+    parse,
+    reparse,
+)
+
+# 共用瀏覽器池與啟動預熱狀態（/health、/ready）
+SERVER_STATE = ServerState()
+
+# /api/ingest 單次最多的 feed 數
+MAX_INGEST_FEEDS = 50
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """啟動時在背景預熱瀏覽器池與 trafilatura，關閉時釋放瀏覽器"""
+    SERVER_STATE.start_warm_up()
+    yield
+    await SERVER_STATE.close()
+
+
+# 所有端點註冊在 router，create_app() 掛到 FastAPI 上
+router = APIRouter()
+
+
+# 請求資料模型
+class ResultFieldsRequest(BaseModel):
+    """
+    回傳欄位選項（解析類請求共用）
+
+    - fields: 只回傳指定欄位，可用組名 metadata / text / content 或個別欄位名稱，
+      例如 ["metadata", "text"] 或 "metadata,text"；未指定時回傳全部欄位
+    - format: content 欄位格式 xml（預設）/ html / markdown / text；
+      text 或未要求 content 時跳過格式化提取，速度較快
+    - deadline_ms: 整個解析的時間預算（毫秒），包含重試與 Playwright；
+      未指定時使用伺服器的 PARSE_DEADLINE_MS，0 表示不限制
+    """
+    fields: Optional[Union[List[str], str]] = None
+    format: Optional[str] = "xml"
+    deadline_ms: Optional[int] = None
+
+    @validator('fields')
+    def validate_fields(cls, v):
+        return resolve_fields(v)
+
+    @validator('format')
+    def validate_format(cls, v):
+        return validate_content_format(v)
+
+    @validator('deadline_ms')
+    def validate_deadline_ms(cls, v):
+        if v is not None and v < 0:
+            raise ValueError('deadline_ms 不可為負數（0 表示不限制）')
+        return v
+
+class ParseRequest(ResultFieldsRequest):
+    url: str
+    max_retries: Optional[int] = 3
+    skip_ssl: Optional[bool] = False
+    
+    @validator('url')
+    def validate_url(cls, v):
+        if not v.startswith(('http://', 'https://')):
+            raise ValueError('URL 必須以 http:// 或 https:// 開頭')
+        return v
+
+class ParseDynamicRequest(ResultFieldsRequest):
+    url: str
+    wait_for: Optional[str] = None
+    block_ads: Optional[bool] = True  # 預設屏蔽廣告
+    stealth_mode: Optional[bool] = True  # 預設啟用反爬蟲模式
+    
+    @validator('url')
+    def validate_url(cls, v):
+        if not v.startswith(('http://', 'https://')):
+            raise ValueError('URL 必須以 http:// 或 https:// 開頭')
+        return v
+
+class ParseWebhookRequest(ResultFieldsRequest):
+    url: str
+    webhook_url: str
+    metadata: Optional[Dict[str, Any]] = {}
+    max_retries: Optional[int] = 3
+    skip_ssl: Optional[bool] = False
+    article_id: Optional[str] = None  # 近似重複比對用的 ID（預設 metadata.id，沒有時用 url）
+    dedup: Optional[str] = None  # off / flag / skip（預設 DEDUP_MODE）
+    
+    @validator('url', 'webhook_url')
+    def validate_urls(cls, v):
+        if not v.startswith(('http://', 'https://')):
+            raise ValueError('URL 必須以 http:// 或 https:// 開頭')
+        return v
+
+    @validator('dedup')
+    def validate_dedup(cls, v):
+        if v is not None and v not in DEDUP_MODES:
+            raise ValueError(f"dedup 必須是 {' / '.join(DEDUP_MODES)}")
+        return v
+
+class ReparseRequest(ResultFieldsRequest):
+    """由快照重新提取：指定 url（使用最新的快照）或 snapshot（內容 hash）"""
+    url: Optional[str] = None
+    snapshot: Optional[str] = None
+
+    @validator('snapshot', always=True)
+    def validate_target(cls, v, values):
+        if not v and not values.get('url'):
+            raise ValueError('請提供 url 或 snapshot')
+        return v
+
+class IngestRequest(ResultFieldsRequest):
+    """RSS / Atom / sitemap 匯入：只解析尚未處理過的文章（有 webhook_url 時在背景執行並逐篇回調）"""
+    feeds: List[str]
+    max_items: Optional[int] = None
+    webhook_url: Optional[str] = None
+    max_retries: Optional[int] = 3
+    skip_ssl: Optional[bool] = False
+
+    @validator('feeds')
+    def validate_feeds(cls, v):
+        if not v:
+            raise ValueError('請提供至少一個 feed 網址')
+        if len(v) > MAX_INGEST_FEEDS:
+            raise ValueError(f'單次最多 {MAX_INGEST_FEEDS} 個 feed')
+        if not all(url.startswith(('http://', 'https://')) for url in v):
+            raise ValueError('URL 必須以 http:// 或 https:// 開頭')
+        return v
+
+    @validator('webhook_url')
+    def validate_webhook_url(cls, v):
+        if v is not None and not v.startswith(('http://', 'https://')):
+            raise ValueError('URL 必須以 http:// 或 https:// 開頭')
+        return v
+
+    @validator('max_items')
+    def validate_max_items(cls, v):
+        if v is not None and v <= 0:
+            raise ValueError('max_items 必須大於 0')
+        return v
+
+class DecodeGoogleUrlRequest(BaseModel):
+    url: str
+    
+    @validator('url')
+    def validate_url(cls, v):
+        if not v.startswith(('http://', 'https://')):
+            raise ValueError('URL 必須以 http:// 或 https:// 開頭')
+        return v
+
+class DecodeGoogleUrlBatchRequest(BaseModel):
+    urls: List[str]
+    
+    @validator('urls')
+    def validate_urls(cls, v):
+        if len(v) > MAX_BATCH_SIZE:
+            raise ValueError(f'單次最多 {MAX_BATCH_SIZE} 個 URL')
+        return v
+
+
+# 首頁路由
+@router.get("/")
+@router.head("/")  # 支持 HEAD 請求（用於健康檢查）
+async def root(raw_request: Request):
+    """API 首頁 - 顯示可用端點"""
+    return {
+        "message": "歡迎使用網頁內容解析器 API (Python 增強版 + 智慧路由)",
+        "framework": "FastAPI + trafilatura + Playwright",
+        "version": raw_request.app.version,
+        "features": [
+            "🧠 智慧路由（根據域名自動選擇最佳解析方式）",
+            "⛔ 黑名單機制（跳過已知無法解析的網站，節省時間）",
+            "🎭 動態網站快速通道（已知動態網站直接用 Playwright）",
+            "🔄 自動降級（靜態失敗自動切換到動態）",
+            "🔄 自動重試機制（處理 403/429 錯誤）",
+            "🎲 隨機 User-Agent",
+            "📡 增強的 HTTP headers",
+            "🔒 SSL 錯誤處理",
+            "⏱️ 指數退避（Exponential Backoff）",
+            "🚀 Playwright 支援（處理動態 JavaScript 網站）",
+            "🚫 廣告屏蔽（Network 和 DOM 層面）",
+            "🥷 反爬蟲模式（隱藏 webdriver 特徵）",
+            "📜 自動滾動載入懶加載內容",
+            "🔒 併發控制（限制同時運行的瀏覽器數量，避免資源耗盡）",
+            "🛡️ 容器優化（修復 BlockingIOError，禁用 /dev/shm 依賴）",
+            "✂️ 欄位選擇（fields / format，只回傳需要的內容）",
+            "♨️ 啟動預熱（瀏覽器池重用 Chromium，/ready 就緒檢查）",
+            "🗜️ 回應壓縮（gzip / br）"
+        ],
+        "smartRouting": {
+            "description": "智慧路由根據域名歷史表現自動選擇最佳解析策略",
+            "strategies": {
+                "block": "黑名單域名（reuters.com, japantimes.co.jp 等）直接返回失敗，建議使用 RSS",
+                "dynamic_direct": "已知動態網站（storm.mg, techstory.in 等）直接使用 Playwright",
+                "static_only": "已知靜態網站優先使用快速靜態解析",
+                "fallback": "未知網站先試靜態，失敗後自動切換到 Playwright"
+            },
+            "benefits": [
+                "⚡ 效能提升 40-60%（跳過無效嘗試）",
+                "💰 降低資源消耗（避免無謂的 Playwright 啟動）",
+                "🎯 更高成功率（已知動態網站直接用對的方法）"
+            ]
+        },
+        "endpoints": {
+            "parse": {
+                "method": "POST",
+                "path": "/api/parse",
+                "body": {
+                    "url": "要解析的網頁 URL",
+                    "max_retries": "(選填) 最大重試次數，預設 3",
+                    "skip_ssl": "(選填) 跳過 SSL 驗證，預設 false",
+                    "fields": "(選填) 只回傳指定欄位，例如 [\"metadata\", \"text\"]（組名: metadata / text / content）",
+                    "format": "(選填) content 格式 xml / html / markdown / text，預設 xml",
+                    "deadline_ms": "(選填) 時間預算（毫秒），超過時回傳 deadline_exceeded，預設 PARSE_DEADLINE_MS"
+                },
+                "description": "解析指定 URL 的網頁內容（同步回傳，支援重試）"
+            },
+            "parseGet": {
+                "method": "GET",
+                "path": "/api/parse?url=YOUR_URL&fields=metadata,text&format=text&deadline_ms=20000",
+                "description": "使用 GET 方法解析網頁內容"
+            },
+            "parseDynamic": {
+                "method": "POST",
+                "path": "/api/parse-dynamic",
+                "body": {
+                    "url": "要解析的網頁 URL",
+                    "wait_for": "(選填) 等待特定 CSS 選擇器，例如 'article' 或 '.content'",
+                    "block_ads": "(選填) 是否屏蔽廣告，預設 true",
+                    "stealth_mode": "(選填) 是否啟用反爬蟲模式，預設 true",
+                    "fields": "(選填) 只回傳指定欄位",
+                    "format": "(選填) content 格式，預設 xml",
+                    "deadline_ms": "(選填) 時間預算（毫秒），超過時回傳 504"
+                },
+                "description": "使用 Playwright 解析動態網站（支援 JavaScript 渲染、廣告屏蔽、反爬蟲）⭐ 推薦用於 SPA 網站和有反爬蟲的網站"
+            },
+            "parseWebhook": {
+                "method": "POST",
+                "path": "/api/parse-webhook",
+                "body": {
+                    "url": "要解析的網頁 URL",
+                    "webhook_url": "n8n webhook URL",
+                    "metadata": "(選填) 額外資料",
+                    "max_retries": "(選填) 最大重試次數",
+                    "skip_ssl": "(選填) 跳過 SSL 驗證",
+                    "fields": "(選填) 只回傳指定欄位（縮小 webhook 資料量）",
+                    "format": "(選填) content 格式，預設 xml",
+                    "deadline_ms": "(選填) 時間預算（毫秒）",
+                    "article_id": "(選填) 近似重複比對用的文章 ID，預設 metadata.id 或 url",
+                    "dedup": "(選填) 近似重複文章：off / flag（標記 duplicate_of）/ skip（移除正文），預設 flag"
+                },
+                "description": "解析網頁並回調 webhook（適用於 n8n 整合）"
+            },
+            "reparse": {
+                "method": "POST",
+                "path": "/api/reparse",
+                "body": {
+                    "url": "要重新提取的網頁 URL（使用最新的快照）",
+                    "snapshot": "(選填) 快照的內容 hash，指定時優先使用",
+                    "fields": "(選填) 只回傳指定欄位",
+                    "format": "(選填) content 格式，預設 xml"
+                },
+                "description": "由原始 HTML 快照重新提取，不重新下載（需設定 SNAPSHOT_DIR）"
+            },
+            "decodeGoogleUrl": {
+                "method": "POST",
+                "path": "/api/decode-google-url",
+                "body": {
+                    "url": "Google 重定向 URL（例如：https://www.google.com/url?url=...）"
+                },
+                "description": "從 Google 重定向 URL 中提取真實的目標 URL ⭐ 適用於 Google Alert/RSS"
+            },
+            "decodeGoogleUrlGet": {
+                "method": "GET",
+                "path": "/api/decode-google-url?url=YOUR_GOOGLE_URL",
+                "description": "使用 GET 方法解碼 Google URL"
+            },
+            "decodeGoogleUrlBatch": {
+                "method": "POST",
+                "path": "/api/decode-google-url/batch",
+                "body": {
+                    "urls": "Google URL 列表（單次最多 10000 個，支援 news.google.com/rss/articles/...）"
+                },
+                "description": "批次解碼 Google URL（同批次重複網址只解碼一次，結果有 LRU 快取）"
+            },
+            "health": {
+                "method": "GET",
+                "path": "/health",
+                "description": "程序存活檢查，回報瀏覽器池、預熱狀態等子系統資訊"
+            },
+            "ready": {
+                "method": "GET",
+                "path": "/ready",
+                "description": "就緒檢查：啟動預熱完成才回 200（否則 503），適合作為部署 healthcheck"
+            },
+            "docs": {
+                "method": "GET",
+                "path": "/docs",
+                "description": "Swagger UI 互動式 API 文件"
+            }
+        },
+        "examples": [
+            'POST /api/parse with body: {"url": "https://example.com/article", "max_retries": 3}',
+            'GET /api/parse?url=https://example.com/article',
+            'POST /api/parse with body: {"url": "https://example.com/article", "fields": ["metadata", "text"]}',
+            'POST /api/parse-webhook with body: {"url": "https://example.com/article", "webhook_url": "https://your-n8n.com/webhook/..."}',
+            'POST /api/decode-google-url with body: {"url": "https://www.google.com/url?url=https://example.com/article&..."}',
+            'GET /api/decode-google-url?url=https://www.google.com/url?url=https://example.com/article'
+        ],
+        "errorHandling": {
+            "403 Forbidden": "自動重試 + 隨機 User-Agent + Referer header",
+            "429 Too Many Requests": "指數退避重試（2s, 4s, 8s...）",
+            "SSL Certificate Error": "可選擇跳過 SSL 驗證（skip_ssl: true）"
+        },
+        "documentation": "訪問 /docs 查看完整 API 文件"
+    }
+
+
+@router.post("/api/parse")
+async def parse_url(request: ParseRequest, raw_request: Request):
+    """
+    POST 方法：解析網頁內容（支援重試 + 智慧路由）
+    
+    智慧路由會根據域名自動選擇最佳解析方式：
+    - 黑名單域名：直接返回失敗，建議使用 RSS
+    - 已知動態網站：直接使用 Playwright（不浪費時間）
+    - 已知靜態網站：只用靜態解析（速度快）
+    - 未知網站：先試靜態，失敗後自動使用 Playwright
+    
+    客戶端斷線時立即取消解析並歸還瀏覽器（不把沒人讀的工作跑完）。
+    網址先正規化（去掉 utm_* 等追蹤參數、預設埠與 #fragment），回應的 canonical_url 為實際解析的網址。
+    
+    Args:
+        request: 包含 url、max_retries、skip_ssl、fields、format 和 deadline_ms 的請求物件
+        raw_request: 原始 HTTP 請求（用來偵測客戶端斷線）
+        
+    Returns:
+        解析後的網頁內容與 canonical_url（超過時間預算時 success 為 false、deadline_exceeded 為 true）
+    """
+    print(f"正在解析: {request.url} (max_retries: {request.max_retries}, skip_ssl: {request.skip_ssl})")
+    
+    deadline = Deadline.from_ms(request.deadline_ms)
+    try:
+        result = await run_until_disconnected(
+            raw_request,
+            parse(
+                request.url,
+                ParseOptions(
+                    max_retries=request.max_retries,
+                    skip_ssl=request.skip_ssl,
+                    fields=request.fields,
+                    content_format=request.format
+                ),
+                browser_pool=SERVER_STATE.browser_pool,
+                deadline=deadline,
+                snapshot_store=SERVER_STATE.snapshot_store
+            ),
+            stats=SERVER_STATE.cancellations,
+            endpoint="parse",
+            deadline=deadline,
+            browser_pool=SERVER_STATE.browser_pool
+        )
+        # 直接回傳 Response：跳過 jsonable_encoder，文章內容只序列化一次
+        return FastJSONResponse(result.to_dict())
+        
+    except ParseError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except Exception as e:
+        print(f"解析錯誤: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"解析網頁時發生錯誤: {str(e)}"
+        )
+
+
+@router.get("/api/parse")
+async def parse_url_get(
+    raw_request: Request,
+    url: str,
+    max_retries: int = 3,
+    skip_ssl: bool = False,
+    fields: Optional[str] = None,
+    format: str = "xml",
+    deadline_ms: Optional[int] = None
+):
+    """
+    GET 方法：解析網頁內容（透過 query string）
+
+    與 POST /api/parse 相同的流程（pipeline.parse()：網址正規化、智慧路由、自動降級）。
+    
+    Args:
+        url: 要解析的網頁 URL
+        max_retries: 最大重試次數（預設 3）
+        skip_ssl: 是否跳過 SSL 驗證（預設 False）
+        fields: 只回傳指定欄位，逗號分隔（例如 metadata,text）
+        format: content 格式 xml / html / markdown / text（預設 xml）
+        deadline_ms: 時間預算（毫秒，預設 PARSE_DEADLINE_MS，0 表示不限制），超過時回傳 504
+        raw_request: 原始 HTTP 請求（客戶端斷線時取消解析）
+        
+    Returns:
+        解析後的網頁內容與 canonical_url（正規化後實際解析的網址）
+    """
+    if not url:
+        raise HTTPException(
+            status_code=400,
+            detail="請在 URL 參數中提供要解析的網址"
+        )
+    try:
+        selected_fields = resolve_fields(fields)
+        content_format = validate_content_format(format)
+        if deadline_ms is not None and deadline_ms < 0:
+            raise ValueError('deadline_ms 不可為負數（0 表示不限制）')
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    print(f"正在解析 (GET): {url}")
+    
+    deadline = Deadline.from_ms(deadline_ms)
+    try:
+        result = await run_until_disconnected(
+            raw_request,
+            parse(
+                url,
+                ParseOptions(
+                    max_retries=max_retries,
+                    skip_ssl=skip_ssl,
+                    fields=selected_fields,
+                    content_format=content_format
+                ),
+                browser_pool=SERVER_STATE.browser_pool,
+                deadline=deadline,
+                snapshot_store=SERVER_STATE.snapshot_store
+            ),
+            stats=SERVER_STATE.cancellations,
+            endpoint="parse_get",
+            deadline=deadline,
+            browser_pool=SERVER_STATE.browser_pool
+        )
+        return FastJSONResponse(result.to_dict())
+        
+    except ParseError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except Exception as e:
+        print(f"解析錯誤: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"解析網頁時發生錯誤: {str(e)}"
+        )
+
+
+@router.post("/api/parse-dynamic")
+async def parse_url_dynamic(request: ParseDynamicRequest, raw_request: Request):
+    """
+    POST 方法：使用 Playwright 解析動態網站（增強版：支援廣告屏蔽和反爬蟲）
+    
+    適用於：
+    - React/Vue/Angular 等單頁應用（SPA）
+    - JavaScript 動態載入內容的網站
+    - 需要等待特定元素出現的網站
+    - 有廣告干擾的網站
+    - 有反爬蟲機制的網站
+    
+    Args:
+        request: 包含以下欄位的請求物件
+            - url: 要解析的網頁 URL
+            - wait_for: (選填) 等待特定 CSS 選擇器
+            - block_ads: (選填) 是否屏蔽廣告，預設 True
+            - stealth_mode: (選填) 是否啟用反爬蟲模式，預設 True
+            - fields: (選填) 只回傳指定欄位
+            - format: (選填) content 格式，預設 xml
+            - deadline_ms: (選填) 時間預算（毫秒），超過時回傳 504
+        raw_request: 原始 HTTP 請求（客戶端斷線時取消渲染並歸還瀏覽器）
+        
+    Returns:
+        解析後的網頁內容與 canonical_url（正規化後實際解析的網址）
+        
+    Example:
+        POST /api/parse-dynamic
+        {
+            "url": "https://applealmond.com/posts/296254",
+            "wait_for": ".post-content",
+            "block_ads": true,
+            "stealth_mode": true
+        }
+    """
+    url = canonicalize_url(request.url)
+    print(f"正在使用 Playwright 解析: {url}")
+    print(f"廣告屏蔽: {request.block_ads}, 反爬蟲模式: {request.stealth_mode}")
+    if request.wait_for:
+        print(f"等待元素: {request.wait_for}")
+    
+    deadline = Deadline.from_ms(request.deadline_ms)
+    try:
+        result = await run_until_disconnected(
+            raw_request,
+            fetch_and_parse_with_playwright(
+                url, 
+                request.wait_for,
+                request.block_ads,
+                request.stealth_mode,
+                browser_pool=SERVER_STATE.browser_pool,
+                output_format=content_output_format(request.fields, request.format),
+                deadline=deadline,
+                snapshot_store=SERVER_STATE.snapshot_store
+            ),
+            stats=SERVER_STATE.cancellations,
+            endpoint="parse_dynamic",
+            deadline=deadline,
+            browser_pool=SERVER_STATE.browser_pool
+        )
+        result["data"] = select_fields(result["data"], request.fields)
+        result["canonical_url"] = url
+        return FastJSONResponse(result)
+        
+    except ParseError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except Exception as e:
+        print(f"Playwright 解析錯誤: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"使用 Playwright 解析網頁時發生錯誤: {str(e)}"
+        )
+
+
+async def process_and_webhook(
+    url: str, 
+    webhook_url: str, 
+    metadata: Dict[str, Any],
+    max_retries: int = 3,
+    skip_ssl: bool = False,
+    fields: Optional[List[str]] = None,
+    content_format: str = "xml",
+    deadline_ms: Optional[int] = None,
+    article_id: Optional[str] = None,
+    dedup: Optional[str] = None
+):
+    """
+    背景任務：解析網頁並回調 webhook
+    
+    Args:
+        url: 要解析的網頁 URL（先正規化，回調資料帶 original_url 與 canonical_url）
+        webhook_url: webhook 回調 URL
+        metadata: 額外的元數據
+        max_retries: 最大重試次數
+        skip_ssl: 是否跳過 SSL 驗證
+        fields: 只回傳指定欄位（None 為全部）
+        content_format: content 欄位格式
+        deadline_ms: 解析的時間預算（毫秒，None 為伺服器預設）
+        article_id: 近似重複比對用的 ID（None 為 metadata.id 或正規化後的 url）
+        dedup: 近似重複文章的處理方式 off / flag / skip（None 為 DEDUP_MODE）
+    """
+    canonical_url = canonicalize_url(url)
+    print(f"正在解析 (webhook 模式): {canonical_url}")
+    
+    try:
+        # 解析網頁（使用重試機制）
+        result = await fetch_and_parse_with_retry(
+            canonical_url, max_retries, skip_ssl,
+            output_format=content_output_format(fields, content_format),
+            deadline=Deadline.from_ms(deadline_ms),
+            snapshot_store=SERVER_STATE.snapshot_store
+        )
+        
+        # 準備回調資料
+        parsed_data = result.get("data")
+        webhook_data = {
+            "success": True,
+            "original_url": url,
+            "canonical_url": canonical_url,
+            "metadata": metadata,
+            "attempt": result.get("attempt"),
+            "retries": result.get("retries"),
+            "parsed_at": datetime.now().isoformat()
+        }
+
+        # 近似重複：同一篇稿件在其他網域已經處理過時標記 duplicate_of（skip 模式另外移除正文）
+        dedup = dedup or DEDUP_MODE
+        if dedup != "off" and parsed_data:
+            match = SERVER_STATE.dedup_index.check(
+                article_id or str((metadata or {}).get("id") or canonical_url), parsed_data.get("text_content")
+            )
+            webhook_data["simhash"] = match["simhash"]
+            if match["duplicate_of"] is not None:
+                print(f"🔁 近似重複（距離 {match['distance']}）: {canonical_url} 同 {match['duplicate_of']}")
+                webhook_data["duplicate_of"] = match["duplicate_of"]
+                webhook_data["duplicate_distance"] = match["distance"]
+                if dedup == "skip":
+                    parsed_data = drop_duplicate_content(parsed_data)
+        webhook_data["parsed_data"] = select_fields(parsed_data, fields)
+        
+        # 回調 webhook
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            response = await client.post(
+                webhook_url,
+                content=dumps(webhook_data),
+                headers={"Content-Type": "application/json"}
+            )
+            
+            if response.status_code == 200:
+                print(f"✅ Webhook 回調成功: {webhook_url}")
+            else:
+                print(f"❌ Webhook 回調失敗 ({response.status_code}): {webhook_url}")
+                
+    except Exception as e:
+        print(f"解析或回調錯誤: {str(e)}")
+        
+        # 嘗試回調錯誤訊息
+        try:
+            error_data = {
+                "success": False,
+                "original_url": url,
+                "metadata": metadata,
+                "error": str(e),
+                "failed_at": datetime.now().isoformat()
+            }
+            
+            async with httpx.AsyncClient(timeout=30.0) as client:
+                await client.post(
+                    webhook_url,
+                    content=dumps(error_data),
+                    headers={"Content-Type": "application/json"}
+                )
+                
+        except Exception as webhook_error:
+            print(f"無法回調錯誤訊息: {str(webhook_error)}")
+
+
+@router.post("/api/parse-webhook")
+async def parse_url_webhook(request: ParseWebhookRequest, background_tasks: BackgroundTasks):
+    """
+    POST 方法：解析網頁並回調 webhook（用於 n8n 整合）
+    
+    網址先正規化（同一篇文章帶不同追蹤參數時使用同一個網址與 dedup ID），
+    回調資料同時帶 original_url 與 canonical_url。
+    
+    Args:
+        request: 包含 url、webhook_url、metadata、max_retries、skip_ssl、fields、format 和 deadline_ms 的請求物件
+        background_tasks: FastAPI 背景任務管理器
+        
+    Returns:
+        任務接收確認（含 canonical_url）
+    """
+    # 加入背景任務
+    background_tasks.add_task(
+        process_and_webhook,
+        request.url,
+        request.webhook_url,
+        request.metadata,
+        request.max_retries,
+        request.skip_ssl,
+        request.fields,
+        request.format,
+        request.deadline_ms,
+        request.article_id,
+        request.dedup
+    )
+    
+    return {
+        "success": True,
+        "message": "解析任務已接收，將在完成後回調 webhook",
+        "url": request.url,
+        "canonical_url": canonicalize_url(request.url),
+        "webhook_url": request.webhook_url,
+        "max_retries": request.max_retries
+    }
+
+
+@router.post("/api/reparse")
+async def reparse_snapshot(request: ReparseRequest):
+    """
+    POST 方法：由原始 HTML 快照重新提取（不重新下載）
+    
+    調整提取參數（fields / format）時使用：每次 /api/parse 下載到的 HTML 都存成快照
+    （需設定 SNAPSHOT_DIR），重新提取只花 trafilatura 的時間，不會再對網站發出請求。
+    
+    Args:
+        request: 包含 url 或 snapshot（內容 hash）、fields 和 format 的請求物件
+        
+    Returns:
+        提取結果、使用的快照資訊（hash、抓取時間、方式、大小）與提取耗時 extract_ms
+        
+    Example:
+        POST /api/reparse
+        {
+            "url": "https://example.com/article",
+            "fields": ["metadata", "text"],
+            "format": "markdown"
+        }
+    """
+    try:
+        result = await reparse(
+            SERVER_STATE.snapshot_store,
+            url=request.url,
+            content_hash=request.snapshot,
+            output_format=content_output_format(request.fields, request.format)
+        )
+        result["data"] = select_fields(result["data"], request.fields)
+        return FastJSONResponse(result)
+        
+    except ParseError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except Exception as e:
+        print(f"重新提取錯誤: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"由快照重新提取時發生錯誤: {str(e)}"
+        )
+
+
+async def ingest_and_webhook(feeds: List[str], webhook_url: str, options: ParseOptions, max_items: int):
+    """
+    背景任務：匯入 feed，每篇新文章處理完就回調 webhook
+    
+    Args:
+        feeds: feed 網址列表
+        webhook_url: webhook 回調 URL（每篇文章一次，最後再送一次匯入摘要）
+        options: 每篇文章的解析選項
+        max_items: 本次最多處理的新文章數
+    """
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        async def post(data: Dict[str, Any]):
+            try:
+                response = await client.post(
+                    webhook_url,
+                    content=dumps(data),
+                    headers={"Content-Type": "application/json"}
+                )
+                if response.status_code != 200:
+                    print(f"❌ Webhook 回調失敗 ({response.status_code}): {webhook_url}")
+            except Exception as e:
+                print(f"無法回調 webhook: {str(e)}")
+
+        async def on_result(article: Dict[str, Any]):
+            await post({**article, "type": "article", "parsed_at": datetime.now().isoformat()})
+
+        try:
+            result = await ingest(
+                feeds, SERVER_STATE.feed_store, options,
+                max_items=max_items,
+                browser_pool=SERVER_STATE.browser_pool,
+                snapshot_store=SERVER_STATE.snapshot_store,
+                on_result=on_result
+            )
+            await post({"type": "summary", "success": True, "feeds": result["feeds"], "stats": result["stats"],
+                        "finished_at": datetime.now().isoformat()})
+        except Exception as e:
+            print(f"匯入錯誤: {str(e)}")
+            await post({"type": "summary", "success": False, "feeds": feeds, "error": str(e),
+                        "failed_at": datetime.now().isoformat()})
+
+
+@router.post("/api/ingest")
+async def ingest_feeds(request: IngestRequest, background_tasks: BackgroundTasks):
+    """
+    POST 方法：由 RSS / Atom / 新聞 sitemap 匯入新文章
+    
+    讀取每個 feed（ETag / Last-Modified 條件請求），與已處理過的 GUID / 網址比對，
+    只把新文章送進解析流程（同時解析數量為 INGEST_CONCURRENCY）。
+    黑名單網域直接使用 feed 提供的標題與摘要（routing_decision 為 feed_summary），不請求文章頁面。
+    
+    Args:
+        request: 包含 feeds、max_items、webhook_url、max_retries、skip_ssl、fields、format 和 deadline_ms 的請求物件
+        background_tasks: FastAPI 背景任務管理器
+        
+    Returns:
+        沒有 webhook_url 時：{"success", "feeds": 每個 feed 的狀態, "articles": 新文章的解析結果, "stats"}；
+        有 webhook_url 時：任務接收確認（每篇文章與最後的匯入摘要各回調一次）
+        
+    Example:
+        POST /api/ingest
+        {
+            "feeds": ["https://example.com/rss", "https://example.com/news-sitemap.xml"],
+            "fields": ["metadata", "text"],
+            "max_items": 50
+        }
+    """
+    options = ParseOptions(
+        max_retries=request.max_retries,
+        skip_ssl=request.skip_ssl,
+        fields=request.fields,
+        content_format=request.format,
+        deadline_ms=request.deadline_ms
+    )
+    max_items = request.max_items or INGEST_MAX_ITEMS
+
+    if request.webhook_url:
+        background_tasks.add_task(ingest_and_webhook, request.feeds, request.webhook_url, options, max_items)
+        return {
+            "success": True,
+            "message": "匯入任務已接收，每篇新文章完成後回調 webhook",
+            "feeds": request.feeds,
+            "webhook_url": request.webhook_url,
+            "max_items": max_items
+        }
+
+    try:
+        result = await ingest(
+            request.feeds, SERVER_STATE.feed_store, options,
+            max_items=max_items,
+            browser_pool=SERVER_STATE.browser_pool,
+            snapshot_store=SERVER_STATE.snapshot_store
+        )
+        return FastJSONResponse({"success": True, **result})
+        
+    except Exception as e:
+        print(f"匯入錯誤: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"匯入 feed 時發生錯誤: {str(e)}"
+        )
+
+
+@router.post("/api/decode-google-url")
+async def decode_google_url_post(request: DecodeGoogleUrlRequest):
+    """
+    POST 方法：從 Google 重定向 URL 中提取真實的目標 URL
+    
+    支援的格式：
+    - Google News/Alerts: https://www.google.com/url?url=...
+    - Google RSS: https://news.google.com/rss/articles/...
+    
+    Args:
+        request: 包含 url 的請求物件
+        
+    Returns:
+        包含原始 URL 和解碼後 URL 的 JSON 回應
+        
+    Example:
+        POST /api/decode-google-url
+        {
+            "url": "https://www.google.com/url?url=https://example.com/article&..."
+        }
+        
+        Response:
+        {
+            "success": true,
+            "original_url": "https://www.google.com/url?url=...",
+            "decoded_url": "https://example.com/article",
+            "is_google_url": true
+        }
+    """
+    try:
+        return {
+            "success": True,
+            **build_decode_result(request.url)
+        }
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"解碼 URL 時發生錯誤: {str(e)}"
+        )
+
+
+@router.get("/api/decode-google-url")
+async def decode_google_url_get(url: str):
+    """
+    GET 方法：從 Google 重定向 URL 中提取真實的目標 URL
+    
+    Args:
+        url: Google 重定向 URL（作為查詢參數）
+        
+    Returns:
+        包含原始 URL 和解碼後 URL 的 JSON 回應
+        
+    Example:
+        GET /api/decode-google-url?url=https://www.google.com/url?url=https://example.com/article
+        
+        Response:
+        {
+            "success": true,
+            "original_url": "https://www.google.com/url?url=...",
+            "decoded_url": "https://example.com/article",
+            "is_google_url": true
+        }
+    """
+    if not url:
+        raise HTTPException(
+            status_code=400,
+            detail="請提供 URL 參數"
+        )
+    
+    try:
+        return {
+            "success": True,
+            **build_decode_result(url)
+        }
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"解碼 URL 時發生錯誤: {str(e)}"
+        )
+
+
+@router.post("/api/decode-google-url/batch")
+async def decode_google_url_batch(request: DecodeGoogleUrlBatchRequest):
+    """
+    POST 方法：批次解碼 Google 重定向 URL
+    
+    同一批次內重複的 URL 只解碼一次，結果依輸入順序回傳。
+    
+    Args:
+        request: 包含 urls 列表的請求物件（單次最多 GOOGLE_URL_MAX_BATCH 個）
+        
+    Returns:
+        每個 URL 的解碼結果
+        
+    Example:
+        POST /api/decode-google-url/batch
+        {
+            "urls": [
+                "https://www.google.com/url?url=https://example.com/article&...",
+                "https://news.google.com/rss/articles/CBMi..."
+            ]
+        }
+        
+        Response:
+        {
+            "success": true,
+            "count": 2,
+            "changed_count": 2,
+            "results": [{"original_url": ..., "decoded_url": ..., ...}, ...]
+        }
+    """
+    try:
+        results = decode_google_urls(request.urls)
+        
+        return FastJSONResponse({
+            "success": True,
+            "count": len(results),
+            "changed_count": sum(1 for r in results if r["changed"]),
+            "results": results
+        })
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"批次解碼 URL 時發生錯誤: {str(e)}"
+        )
+
+
+@router.get("/health")
+@router.head("/health")  # 支持 HEAD 請求
+async def health_check(raw_request: Request):
+    """
+    健康檢查端點（程序存活即回 200）
+
+    status 反映子系統實際狀態：healthy / warming_up（預熱中）/ degraded（例如瀏覽器無法啟動），
+    browser_pool 包含池大小、每個瀏覽器的分頁數、使用中與等待中的請求數、記憶體看門狗關閉的頁面數、最後一次啟動失敗原因。
+    cancellations 為客戶端斷線而取消的解析統計（浪費的工作時間、提早釋放的瀏覽器時間）。
+    """
+    state = SERVER_STATE.health()
+    return {
+        **state,
+        "timestamp": datetime.now().isoformat(),
+        "service": "parser-api",
+        "version": raw_request.app.version,
+        "features": [
+            "retry-mechanism",
+            "enhanced-headers",
+            "ssl-handling",
+            "exponential-backoff",
+            "playwright-dynamic-rendering",
+            "ad-blocking",
+            "anti-bot-detection",
+            "lazy-loading-support",
+            "concurrency-control",
+            "container-optimized",
+            "google-url-batch-decode",
+            "field-selection",
+            "response-compression",
+            "browser-pool",
+            "startup-warm-up"
+        ],
+        "decode_cache": decode_cache_info(),
+        "canonical_cache": canonical_cache_info()
+    }
+
+
+@router.get("/ready")
+@router.head("/ready")
+async def readiness_check():
+    """
+    就緒檢查端點：預熱完成且瀏覽器能啟動才回 200，否則 503
+
+    適合作為部署的 healthcheck，避免第一個動態請求付出瀏覽器冷啟動的時間。
+    """
+    readiness = SERVER_STATE.readiness()
+    return FastJSONResponse(readiness, status_code=200 if readiness["ready"] else 503)
+
+
+def create_app(version: str) -> FastAPI:
+    """
+    建立 Parser API 的 FastAPI app（lifespan 預熱、CORS、回應壓縮與所有端點）
+
+    Args:
+        version: API 版本（OpenAPI、首頁與 /health 顯示）
+    """
+    app = FastAPI(
+        lifespan=lifespan,
+        title="網頁內容解析器 API（增強版 + 智慧路由）",
+        description="使用 trafilatura 自動提取網頁文章內容，支援重試和錯誤處理，智慧路由優化",
+        default_response_class=FastJSONResponse,  # orjson 序列化
+        version=version
+    )
+
+    # ==================== CORS 配置 ====================
+    # 允許所有來源訪問 API（適用於公開 API）
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # 允許所有來源
+        allow_credentials=True,
+        allow_methods=["*"],  # 允許所有 HTTP 方法 (GET, POST, PUT, DELETE, HEAD, OPTIONS)
+        allow_headers=["*"],  # 允許所有 headers
+    )
+
+    # ==================== 回應壓縮 ====================
+    # 依 Accept-Encoding 使用 br（有安裝 brotli 時）或 gzip，1KB 以下的回應不壓縮
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    app.include_router(router)
+    return app
+
+
+def run(app: FastAPI):
+    """以 uvicorn 啟動（埠號讀取環境變數 PORT，Railway 會提供，預設 3000）"""
+    import uvicorn
+
+    port = int(os.getenv("PORT", 3000))
+    
+    print(f"🚀 Parser 伺服器已啟動！（Python 增強版 v{app.version}）")
+    print(f"📡 監聽埠號: {port}")
+    print(f"🌐 本地訪問: http://localhost:{port}")
+    print(f"📚 API 文件: http://localhost:{port}/docs")
+    print("\n🛡️  增強功能:")
+    print("  ✓ 自動重試機制（403/429 錯誤）")
+    print("  ✓ 隨機 User-Agent")
+    print("  ✓ SSL 錯誤處理")
+    print("  ✓ 指數退避重試")
+    print("\n使用範例:")
+    print(f"  POST http://localhost:{port}/api/parse")
+    print('  Body: {"url": "https://example.com/article", "max_retries": 3}')
+    print("\n  或使用 GET:")
+    print(f"  http://localhost:{port}/api/parse?url=https://example.com/article")
+    print("\n按 Ctrl+C 停止伺服器\n")
+    
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=port,
+        log_level="info"
+    )
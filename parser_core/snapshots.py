@@ -0,0 +1,300 @@
+"""
+原始 HTML 快照儲存（調整提取參數時不必重新抓取）
+
+靜態與 Playwright 路徑下載到的 HTML 以內容的 SHA-256 為鍵壓縮存檔，
+另有一個 SQLite 索引表記錄每次抓取（URL、時間、方式、hash）：
+
+    SNAPSHOT_DIR/
+        index.sqlite3             snapshots(url, fetched_at, method, hash) + blobs(hash, size, stored_size, codec)
+        objects/ab/abcdef....zst  壓縮後的 HTML（同一份內容只存一次）
+
+/api/reparse 由快照重新提取，只花 trafilatura 的時間（毫秒級），不會再對網站發出請求。
+
+- 壓縮使用 zstd（zstandard 套件）；沒有安裝時退回標準庫 zlib
+- 保留上限：超過 SNAPSHOT_MAX_AGE_DAYS 的抓取紀錄與超過 SNAPSHOT_MAX_MB 時最舊的紀錄會被刪除，
+  沒有紀錄引用的檔案一併刪除
+- 寫入在執行緒中進行，存檔失敗只記錄警告，不影響解析
+
+環境變數：
+- SNAPSHOT_DIR：快照目錄（未設定時不啟用）
+- SNAPSHOT_MAX_MB：壓縮後總大小上限（預設 1024）
+- SNAPSHOT_MAX_AGE_DAYS：保留天數（預設 30，0 表示不限）
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+try:
+    import zstandard
+except ImportError:  # 選用套件：沒有安裝時使用 zlib
+    zstandard = None
+
+SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR', '')
+SNAPSHOT_MAX_MB = float(os.getenv('SNAPSHOT_MAX_MB', '1024'))
+SNAPSHOT_MAX_AGE_DAYS = float(os.getenv('SNAPSHOT_MAX_AGE_DAYS', '30'))
+
+# 每存多少次檢查一次保留期限（大小上限每次存檔都檢查）
+PRUNE_EVERY = 100
+
+_CODEC_EXTENSIONS = {"zstd": ".zst", "zlib": ".zz"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    stored_size INTEGER NOT NULL,
+    codec TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    method TEXT NOT NULL,
+    hash TEXT NOT NULL REFERENCES blobs(hash)
+);
+CREATE INDEX IF NOT EXISTS snapshots_url ON snapshots(url, fetched_at);
+CREATE INDEX IF NOT EXISTS snapshots_fetched_at ON snapshots(fetched_at);
+"""
+
+
+def _compress(data: bytes, codec: str, level: int) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return zlib.compress(data, 6)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("快照以 zstd 壓縮，需要安裝 zstandard 套件")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+class SnapshotStore:
+    """以內容 hash 定址的 HTML 快照 + SQLite 索引"""
+
+    def __init__(self, directory: str, max_bytes: Optional[int] = None,
+                 max_age_days: float = SNAPSHOT_MAX_AGE_DAYS, level: int = 3):
+        """
+        Args:
+            directory: 快照目錄（不存在時建立）
+            max_bytes: 壓縮後總大小上限（None 為 SNAPSHOT_MAX_MB）
+            max_age_days: 保留天數（0 表示不限）
+            level: zstd 壓縮等級
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes if max_bytes is not None else int(SNAPSHOT_MAX_MB * 1024 * 1024)
+        self.max_age_days = max_age_days
+        self.level = level
+        self.codec = "zstd" if zstandard is not None else "zlib"
+        self.saved = 0
+        self.deduplicated = 0
+        self.failures = 0
+        self.pruned = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # 壓縮後總大小（連線時 SUM 一次，之後隨新增與刪除 blob 更新，save() 不必每次 SUM 整張表）
+        self._stored_bytes = 0
+
+    @classmethod
+    def from_env(cls) -> Optional['SnapshotStore']:
+        """依 SNAPSHOT_DIR 建立；未設定時回傳 None（不存快照）"""
+        if not SNAPSHOT_DIR:
+            return None
+        return cls(SNAPSHOT_DIR)
+
+    def _connect(self) -> sqlite3.Connection:
+        """第一次使用時才建立目錄與索引（呼叫端需持有 _lock）"""
+        if self._conn is None:
+            os.makedirs(os.path.join(self.directory, "objects"), exist_ok=True)
+            conn = sqlite3.connect(os.path.join(self.directory, "index.sqlite3"), check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+            self._stored_bytes = self._total_stored_bytes(conn)
+        return self._conn
+
+    def _path(self, content_hash: str, codec: str) -> str:
+        return os.path.join(self.directory, "objects", content_hash[:2], content_hash + _CODEC_EXTENSIONS[codec])
+
+    def save(self, url: str, html: str, method: str) -> Dict[str, Any]:
+        """
+        存一份抓取結果（同樣內容的 HTML 只壓縮存檔一次）
+
+        Args:
+            url: 網頁 URL
+            html: 原始 HTML
+            method: 抓取方式（static / playwright）
+
+        Returns:
+            快照資訊 {"hash", "url", "fetched_at", "method", "size", "stored_size"}
+        """
+        data = html.encode("utf-8")
+        content_hash = hashlib.sha256(data).hexdigest()
+        fetched_at = time.time()
+
+        with self._lock:
+            conn = self._connect()
+            blob = conn.execute("SELECT stored_size FROM blobs WHERE hash = ?", (content_hash,)).fetchone()
+            if blob is None:
+                stored = _compress(data, self.codec, self.level)
+                path = self._path(content_hash, self.codec)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.tmp{threading.get_ident()}"
+                with open(tmp_path, "wb") as f:
+                    f.write(stored)
+                os.replace(tmp_path, path)
+                stored_size = len(stored)
+                conn.execute(
+                    "INSERT INTO blobs (hash, size, stored_size, codec, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (content_hash, len(data), stored_size, self.codec, fetched_at)
+                )
+                self._stored_bytes += stored_size
+            else:
+                stored_size = blob["stored_size"]
+                self.deduplicated += 1
+            conn.execute(
+                "INSERT INTO snapshots (url, fetched_at, method, hash) VALUES (?, ?, ?, ?)",
+                (url, fetched_at, method, content_hash)
+            )
+            conn.commit()
+            self.saved += 1
+
+            if self.saved % PRUNE_EVERY == 0 or self._stored_bytes > self.max_bytes:
+                self._prune(conn)
+
+        return {
+            "hash": content_hash,
+            "url": url,
+            "fetched_at": datetime.fromtimestamp(fetched_at).isoformat(),
+            "method": method,
+            "size": len(data),
+            "stored_size": stored_size,
+        }
+
+    async def asave(self, url: str, html: str, method: str) -> Optional[Dict[str, Any]]:
+        """在執行緒中存檔；失敗只記錄警告（快照不影響解析結果）"""
+        try:
+            return await asyncio.to_thread(self.save, url, html, method)
+        except Exception as e:
+            self.failures += 1
+            print(f"[快照] ⚠️ 存檔失敗: {type(e).__name__}: {e}")
+            return None
+
+    def find(self, url: Optional[str] = None, content_hash: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        查詢快照：指定 hash 時回傳該內容最新的一筆，否則回傳 url 最新的一筆
+
+        Returns:
+            快照資訊（同 save() 的回傳值）；找不到時為 None
+        """
+        query = ("SELECT s.url, s.fetched_at, s.method, s.hash, b.size, b.stored_size, b.codec "
+                 "FROM snapshots s JOIN blobs b ON b.hash = s.hash WHERE {} "
+                 "ORDER BY s.fetched_at DESC LIMIT 1")
+        if content_hash:
+            sql, params = query.format("s.hash = ?"), (content_hash,)
+        else:
+            sql, params = query.format("s.url = ?"), (url,)
+        with self._lock:
+            row = self._connect().execute(sql, params).fetchone()
+        if row is None:
+            return None
+        return {
+            "hash": row["hash"],
+            "url": row["url"],
+            "fetched_at": datetime.fromtimestamp(row["fetched_at"]).isoformat(),
+            "method": row["method"],
+            "size": row["size"],
+            "stored_size": row["stored_size"],
+            "codec": row["codec"],
+        }
+
+    def load(self, snapshot: Dict[str, Any]) -> str:
+        """讀取並解壓縮快照的 HTML（snapshot 為 find() 的回傳值）"""
+        with open(self._path(snapshot["hash"], snapshot["codec"]), "rb") as f:
+            return _decompress(f.read(), snapshot["codec"]).decode("utf-8")
+
+    @staticmethod
+    def _total_stored_bytes(conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT COALESCE(SUM(stored_size), 0) FROM blobs").fetchone()[0]
+
+    def _prune(self, conn: sqlite3.Connection) -> int:
+        """刪除過期紀錄、超過大小上限時最舊的紀錄，以及沒有被引用的檔案（呼叫端需持有 _lock）"""
+        # 其他程序可能共用同一個目錄：清理時重新校正一次總大小
+        self._stored_bytes = self._total_stored_bytes(conn)
+        removed = 0
+        if self.max_age_days > 0:
+            cutoff = time.time() - self.max_age_days * 86400
+            removed += conn.execute("DELETE FROM snapshots WHERE fetched_at < ?", (cutoff,)).rowcount
+        removed_blobs = self._delete_orphans(conn)
+
+        while self._stored_bytes > self.max_bytes:
+            # 一次刪掉最舊的一批紀錄，直到沒有被引用的檔案讓總大小降到上限以下
+            deleted = conn.execute(
+                "DELETE FROM snapshots WHERE id IN (SELECT id FROM snapshots ORDER BY fetched_at LIMIT 50)"
+            ).rowcount
+            if not deleted:
+                break
+            removed += deleted
+            removed_blobs += self._delete_orphans(conn)
+
+        conn.commit()
+        if removed or removed_blobs:
+            self.pruned += removed
+            print(f"[快照] 🧹 刪除 {removed} 筆紀錄、{removed_blobs} 個檔案（剩餘 {self._stored_bytes / 1024 / 1024:.1f} MB）")
+        return removed
+
+    def _delete_orphans(self, conn: sqlite3.Connection) -> int:
+        orphans = conn.execute(
+            "SELECT hash, codec, stored_size FROM blobs WHERE hash NOT IN (SELECT DISTINCT hash FROM snapshots)"
+        ).fetchall()
+        for row in orphans:
+            try:
+                os.remove(self._path(row["hash"], row["codec"]))
+            except FileNotFoundError:
+                pass
+        conn.executemany("DELETE FROM blobs WHERE hash = ?", [(row["hash"],) for row in orphans])
+        self._stored_bytes -= sum(row["stored_size"] for row in orphans)
+        return len(orphans)
+
+    def prune(self) -> int:
+        """依保留期限與大小上限清理，回傳刪除的紀錄數"""
+        with self._lock:
+            return self._prune(self._connect())
+
+    def stats(self) -> Dict[str, Any]:
+        """/health 的快照狀態"""
+        with self._lock:
+            conn = self._connect()
+            snapshots = conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+            blobs, size, stored = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0) FROM blobs"
+            ).fetchone()
+        return {
+            "codec": self.codec,
+            "snapshots": snapshots,
+            "blobs": blobs,
+            "raw_mb": round(size / 1024 / 1024, 2),
+            "stored_mb": round(stored / 1024 / 1024, 2),
+            "max_mb": round(self.max_bytes / 1024 / 1024, 2),
+            "saved": self.saved,
+            "deduplicated": self.deduplicated,
+            "failures": self.failures,
+            "pruned": self.pruned,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,158 @@
+"""
+每個域名的瀏覽器狀態快取（cookies、localStorage）
+
+每次動態解析都開一個全新的 context，cookie 同意視窗、地區選擇等插頁每次都會重新出現，
+有些網站對第一次造訪的訪客還會多幾次轉址或送出較重的頁面。
+render_page 成功取得內容後，以 context.storage_state() 擷取該域名的狀態存進 LRU 快取，
+下次同一域名開 context 時以 storage_state= 帶入。
+
+- 以 routing.extract_domain() 為鍵（www. 與埠號不同仍是同一個域名）
+- 只保留該域名（含子網域）的 cookies 與 localStorage，第三方（廣告、追蹤）的狀態不存
+- 超過 STORAGE_STATE_TTL 秒的狀態視為過期；單一狀態超過 STORAGE_STATE_MAX_KB 不存
+- 超過 STORAGE_STATE_CACHE_SIZE 個域名時淘汰最久沒用到的
+
+環境變數：
+- STORAGE_STATE_CACHE_SIZE：最多保留的域名數（預設 200，0 表示停用）
+- STORAGE_STATE_TTL：狀態保留秒數（預設 21600，6 小時）
+- STORAGE_STATE_MAX_KB：單一域名狀態的大小上限（預設 256 KB）
+"""
+
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from parser_core.routing import extract_domain
+
+STORAGE_STATE_CACHE_SIZE = int(os.getenv('STORAGE_STATE_CACHE_SIZE', '200'))
+STORAGE_STATE_TTL = float(os.getenv('STORAGE_STATE_TTL', '21600'))
+STORAGE_STATE_MAX_KB = int(os.getenv('STORAGE_STATE_MAX_KB', '256'))
+
+
+def _same_site(host: str, domain: str) -> bool:
+    """host 是否為 domain 本身或其子網域（cookie 的 domain 可能以 "." 開頭）"""
+    host = host.lstrip(".").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return host == domain or host.endswith("." + domain)
+
+
+def filter_state(state: Dict[str, Any], domain: str) -> Dict[str, Any]:
+    """只保留 domain（含子網域）的 cookies 與 localStorage"""
+    return {
+        "cookies": [cookie for cookie in state.get("cookies", []) if _same_site(cookie.get("domain", ""), domain)],
+        "origins": [origin for origin in state.get("origins", [])
+                    if _same_site(extract_domain(origin.get("origin", "")), domain)],
+    }
+
+
+class StorageStateCache:
+    """每個域名的 Playwright storage state（LRU + TTL）"""
+
+    def __init__(self, max_domains: int = STORAGE_STATE_CACHE_SIZE, ttl: float = STORAGE_STATE_TTL,
+                 max_bytes: int = STORAGE_STATE_MAX_KB * 1024):
+        """
+        Args:
+            max_domains: 最多保留的域名數
+            ttl: 狀態保留秒數
+            max_bytes: 單一狀態（JSON）大小上限
+        """
+        self.max_domains = max_domains
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        # 域名 → (擷取時間, 狀態, JSON 大小)
+        self._states: "OrderedDict[str, Tuple[float, Dict[str, Any], int]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.expired = 0
+        self.evicted = 0
+        self.too_large = 0
+
+    @classmethod
+    def from_env(cls) -> Optional['StorageStateCache']:
+        """依 STORAGE_STATE_CACHE_SIZE 建立；0 時回傳 None（每次都用全新的 context）"""
+        if STORAGE_STATE_CACHE_SIZE <= 0:
+            return None
+        return cls()
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """url 所屬域名的狀態（沒有或已過期時為 None），可直接傳給 browser.new_context(storage_state=...)"""
+        domain = extract_domain(url)
+        entry = self._states.get(domain)
+        if entry is None:
+            self.misses += 1
+            return None
+        captured_at, state, _ = entry
+        if time.monotonic() - captured_at > self.ttl:
+            del self._states[domain]
+            self.expired += 1
+            self.misses += 1
+            return None
+        self._states.move_to_end(domain)
+        self.hits += 1
+        return state
+
+    def put(self, url: str, state: Dict[str, Any]) -> bool:
+        """
+        存入 url 所屬域名的狀態（只保留該域名的部分）
+
+        Returns:
+            是否已存入（沒有任何 cookie / localStorage 或超過大小上限時不存）
+        """
+        domain = extract_domain(url)
+        if not domain:
+            return False
+        state = filter_state(state, domain)
+        if not state["cookies"] and not state["origins"]:
+            return False
+        size = len(json.dumps(state, ensure_ascii=False).encode("utf-8"))
+        if size > self.max_bytes:
+            self.too_large += 1
+            return False
+
+        self._states[domain] = (time.monotonic(), state, size)
+        self._states.move_to_end(domain)
+        self.stored += 1
+        while len(self._states) > self.max_domains:
+            self._states.popitem(last=False)
+            self.evicted += 1
+        return True
+
+    async def capture(self, context, *urls: str) -> bool:
+        """
+        擷取 Playwright context 目前的狀態並存入（失敗時不影響解析）
+
+        Args:
+            context: Playwright BrowserContext
+            urls: 要存入的網址（請求的網址與轉址後的網址屬於不同域名時兩個都存）
+        """
+        try:
+            state = await context.storage_state()
+        except Exception as e:
+            print(f"[Playwright] ⚠️ 無法擷取瀏覽器狀態: {type(e).__name__}: {e}")
+            return False
+        domains = {extract_domain(url): url for url in urls}
+        return any([self.put(url, state) for url in domains.values()])
+
+    def clear(self):
+        self._states.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """/health 的快取狀態"""
+        return {
+            "domains": len(self._states),
+            "max_domains": self.max_domains,
+            "kb": round(sum(size for _, _, size in self._states.values()) / 1024, 1),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stored": self.stored,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "too_large": self.too_large,
+        }
+
+
+# render_page 共用的快取（STORAGE_STATE_CACHE_SIZE=0 時為 None）
+STORAGE_STATES = StorageStateCache.from_env()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for QualcommCareersScraper.parse_job_description
+=================================================================
+Compares the single-pass section parser against the previous
+implementation (seven extract_section() calls, each running nine marker
+regexes on a fresh html[start_pos:] copy), checks both return identical
+results, and reports the speedup.
+
+Corpus sources (first match wins):
+- --corpus DIR   directory of *.html job descriptions, e.g. collected with
+                 `python qualcomm_careers_scraper.py --save-descriptions DIR`
+- --corpus FILE  JSON file with detail API responses ("job_description" keys)
+- otherwise      synthetic descriptions shaped like the real ones
+
+Usage:
+    python benchmark_parse_job_description.py
+    python benchmark_parse_job_description.py --corpus descriptions/ --repeat 20
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import re
+import time
+from html import unescape
+from typing import Dict, List
+
+from qualcomm_careers_scraper import QualcommCareersScraper, SECTION_MARKERS
+
+
+# ---------------------------------------------------------------------------
+# Previous implementation (kept verbatim for the equivalence check)
+# ---------------------------------------------------------------------------
+
+def legacy_clean_html(html: str) -> str:
+    if not html:
+        return ""
+    text = re.sub(r'<[^>]+>', ' ', html)
+    text = unescape(text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text
+
+
+def legacy_extract_section(html: str, start_pattern: str, end_patterns: List[str]) -> str:
+    if not html:
+        return ""
+    start_match = re.search(start_pattern, html, re.IGNORECASE | re.DOTALL)
+    if not start_match:
+        return ""
+    start_pos = start_match.end()
+    end_pos = len(html)
+    for end_pattern in end_patterns:
+        end_match = re.search(end_pattern, html[start_pos:], re.IGNORECASE | re.DOTALL)
+        if end_match:
+            end_pos = min(end_pos, start_pos + end_match.start())
+    return legacy_clean_html(html[start_pos:end_pos])
+
+
+def legacy_parse_job_description(html: str) -> Dict[str, str]:
+    result = {
+        'company': '',
+        'job_area': '',
+        'general_summary': '',
+        'responsibilities': '',
+        'minimum_qualifications': '',
+        'preferred_qualifications': '',
+        'educational_requirements': '',
+    }
+    if not html:
+        return result
+    markers = SECTION_MARKERS
+    result['company'] = legacy_extract_section(html, r'<h2[^>]*>.*?<b>Company:?</b>.*?</h2>', markers)
+    result['job_area'] = legacy_extract_section(html, r'<h2[^>]*>.*?<b>Job Area:?</b>.*?</h2>', markers)
+    result['general_summary'] = legacy_extract_section(html, r'<[ub]><b>General Summary:?</b></[ub]>', markers)
+    result['responsibilities'] = legacy_extract_section(html, r'<b[^>]*>.*?Job responsibilities.*?:?</b>', markers)
+    result['minimum_qualifications'] = legacy_extract_section(html, r'<[ub]><b>Minimum Qualifications:?</b></[ub]>', markers)
+    result['preferred_qualifications'] = legacy_extract_section(html, r'<b[^>]*>Preferred Qualifications:?</b>', markers)
+    result['educational_requirements'] = legacy_extract_section(html, r'<b[^>]*>Educational Requirements:?</b>', markers)
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Corpus
+# ---------------------------------------------------------------------------
+
+SENTENCES = [
+    "Develop and validate embedded software for Snapdragon platforms.",
+    "Collaborate with hardware, systems and test teams across sites.",
+    "Analyze performance and power of <i>multimedia</i> pipelines &amp; drivers.",
+    "Own features end to end from design through commercialization.",
+    "Write clear technical documentation and review peers' code.",
+]
+
+
+def _paragraph(rng: random.Random, sentences: int) -> str:
+    return " ".join(rng.choice(SENTENCES) for _ in range(sentences))
+
+
+def synthetic_description(rng: random.Random) -> str:
+    """Build one description with the same markup as the detail API."""
+    bullets = "".join(f"<li>{_paragraph(rng, 1)}</li>" for _ in range(rng.randint(3, 10)))
+    parts = [
+        "<h2><b>Company:</b></h2>Qualcomm Technologies, Inc.<br><br>",
+        "<h2><b>Job Area:</b></h2>Engineering Group, Engineering Group &gt; Software Engineering<br><br>",
+        f"<u><b>General Summary:</b></u><br><br>{_paragraph(rng, rng.randint(5, 25))}<br><br>",
+        f"<b>Job responsibilities include:</b><ul>{bullets}</ul>",
+        "<u><b>Minimum Qualifications:</b></u><br>&bull; Bachelor's degree in Engineering and 2+ years of experience.<br><br>",
+        f"<b>Preferred Qualifications:</b><ul>{bullets}</ul>",
+        "<b>Educational Requirements:</b> Required: Bachelor's, Computer Engineering.<br>",
+        f"<p>{_paragraph(rng, 3)}</p>",
+        "<b>To all Staffing and Recruiting Agencies</b>: Our Careers Site is only for individuals seeking a job.<br>",
+        "Qualcomm is an equal opportunity employer. " + _paragraph(rng, 4),
+    ]
+    # Some postings omit sections
+    return "".join(part for part in parts if rng.random() > 0.1)
+
+
+def load_corpus(path: str, size: int) -> List[str]:
+    if path and os.path.isdir(path):
+        corpus = []
+        for file_path in sorted(glob.glob(os.path.join(path, "*.html"))):
+            with open(file_path, encoding="utf-8") as f:
+                corpus.append(f.read())
+        return corpus
+    if path:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        items = data if isinstance(data, list) else data.get("positions", [])
+        return [item["job_description"] for item in items if item.get("job_description")]
+    rng = random.Random(42)
+    return [synthetic_description(rng) for _ in range(size)]
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def time_parser(func, corpus: List[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for html in corpus:
+            func(html)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parse_job_description")
+    parser.add_argument("--corpus", default=None, help="Directory of *.html files or JSON file with job_description")
+    parser.add_argument("--size", type=int, default=1000, help="Synthetic corpus size (default: 1000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions, best is reported (default: 5)")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus, args.size)
+    if not corpus:
+        raise SystemExit("Empty corpus")
+    scraper = QualcommCareersScraper(verbose=False)
+
+    mismatches = 0
+    for html in corpus:
+        if scraper.parse_job_description(html) != legacy_parse_job_description(html):
+            mismatches += 1
+
+    total_kb = sum(len(html) for html in corpus) / 1024
+    print("=" * 60)
+    print("parse_job_description benchmark")
+    print("=" * 60)
+    print(f"Corpus: {len(corpus)} descriptions, {total_kb:.0f} KB "
+          f"({'synthetic' if not args.corpus else args.corpus})")
+    print(f"Equivalence: {'OK' if mismatches == 0 else f'{mismatches} MISMATCHES'}")
+
+    legacy = time_parser(legacy_parse_job_description, corpus, args.repeat)
+    current = time_parser(scraper.parse_job_description, corpus, args.repeat)
+    print(f"\nPrevious:    {legacy * 1000:8.1f} ms  ({legacy / len(corpus) * 1e6:7.1f} us/job)")
+    print(f"Single-pass: {current * 1000:8.1f} ms  ({current / len(corpus) * 1e6:7.1f} us/job)")
+    print(f"Speedup:     {legacy / current:8.1f}x")
+    print("=" * 60)
+
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
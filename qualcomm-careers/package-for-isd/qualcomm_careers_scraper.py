@@ -9,20 +9,325 @@ This scraper extracts job listings with detailed information including:
 - Detail info: Company, Job Area, General Summary, Responsibilities, Qualifications
 
 Author: ISD Team
-Version: 1.0
-Last Updated: 2024-11-26
+Version: 1.1
+Last Updated: 2026-10-19
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import Dict, List, Any, Optional
+from bisect import bisect_left
+import hashlib
+import random
+import sqlite3
+import threading
 import time
 import json
+import os
 import re
 from html import unescape
 import argparse
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional: only needed for --parquet
+    pa = None
+    pq = None
+
+
+# Section markers used to detect the end of each job description section.
+# Most markers have the form "<tag ...>.*?keyword": with DOTALL such a marker
+# matches at an opening <tag> exactly when the keyword occurs anywhere after
+# that tag, so they are described as (tag, keyword) pairs.
+_TAG_KEYWORD_MARKERS = [
+    ('h2', 'Company'),
+    ('h2', 'Job Area'),
+    ('b', 'Job responsibilities'),
+    ('b', 'Minimum Qualifications'),
+    ('b', 'Preferred Qualifications'),
+    ('b', 'Educational Requirements'),
+    ('b', 'To all Staffing'),
+]
+_LITERAL_MARKERS = [
+    r'<[ub]><b>General Summary',
+    r'Qualcomm is an equal opportunity',
+]
+SECTION_MARKERS = (
+    [f'<{tag}[^>]*>.*?{re.escape(keyword)}' for tag, keyword in _TAG_KEYWORD_MARKERS]
+    + _LITERAL_MARKERS
+)
+
+_MARKER_TAGS = sorted({tag for tag, _ in _TAG_KEYWORD_MARKERS})
+_MARKER_KEYWORDS = [keyword for _, keyword in _TAG_KEYWORD_MARKERS]
+
+# Single tokenizer for all markers: a zero-width lookahead alternation, so
+# one finditer() pass reports every opening tag, keyword and literal marker
+# (including overlapping ones) with the group that matched. Literal markers
+# come first: "<b><b>General Summary" is also a <b> tag, but the literal
+# marker already makes that position a boundary. The leading character class
+# lets the engine skip positions that cannot start any alternative.
+_TOKEN_FIRST_CHARS = sorted(
+    {'<'} | {keyword[0] for keyword in _MARKER_KEYWORDS} | {'Q'}  # 'Q'ualcomm is an equal opportunity
+)
+_SECTION_TOKEN_RE = re.compile(
+    f'(?=[{re.escape("".join(_TOKEN_FIRST_CHARS))}])'
+    + '(?=(?:'
+    + '|'.join(
+        [f'(?P<lit{i}>{pattern})' for i, pattern in enumerate(_LITERAL_MARKERS)]
+        + [f'(?P<tag_{tag}><{tag}[^>]*>)' for tag in _MARKER_TAGS]
+        + [f'(?P<kw{i}>{re.escape(keyword)})' for i, keyword in enumerate(_MARKER_KEYWORDS)]
+    )
+    + '))',
+    re.IGNORECASE | re.DOTALL
+)
+
+# Start pattern of each section (output key -> compiled regex)
+SECTION_START_PATTERNS = {
+    key: re.compile(pattern, re.IGNORECASE | re.DOTALL)
+    for key, pattern in [
+        ('company', r'<h2[^>]*>.*?<b>Company:?</b>.*?</h2>'),
+        ('job_area', r'<h2[^>]*>.*?<b>Job Area:?</b>.*?</h2>'),
+        ('general_summary', r'<[ub]><b>General Summary:?</b></[ub]>'),
+        ('responsibilities', r'<b[^>]*>.*?Job responsibilities.*?:?</b>'),
+        ('minimum_qualifications', r'<[ub]><b>Minimum Qualifications:?</b></[ub]>'),
+        ('preferred_qualifications', r'<b[^>]*>Preferred Qualifications:?</b>'),
+        ('educational_requirements', r'<b[^>]*>Educational Requirements:?</b>'),
+    ]
+}
+
+# Fields added to a position by apply_job_detail()
+DETAIL_FIELDS = [
+    'detail_company',
+    'detail_job_area',
+    'general_summary',
+    'responsibilities',
+    'minimum_qualifications',
+    'preferred_qualifications',
+    'educational_requirements',
+]
+
+# Low-cardinality output columns stored dictionary-encoded in Parquet
+CATEGORICAL_COLUMNS = [
+    'department',
+    'business_unit',
+    'city',
+    'region',
+    'country',
+    'work_type',
+    'company',
+    'job_area',
+]
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+class AdaptiveRateLimiter:
+    """
+    Thread-safe request pacer shared by all worker threads.
+
+    Requests are spaced 1/rate seconds apart. Every successful response
+    nudges the rate up (additive increase); an HTTP 429 halves it and pauses
+    all workers for the server's Retry-After (multiplicative decrease).
+    A burst of 429s from requests already in flight only halves the rate once.
+    """
+
+    def __init__(self, initial_rate: float = 5.0, min_rate: float = 0.5,
+                 max_rate: float = 20.0, increase_step: float = 0.1):
+        """
+        Initialize the limiter.
+
+        Args:
+            initial_rate: Starting requests per second
+            min_rate: Lowest rate the limiter backs off to
+            max_rate: Highest rate the limiter ramps up to
+            increase_step: Requests/second added after each success
+        """
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase_step = increase_step
+        self.throttled_count = 0
+        self._next_slot = time.monotonic()
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until the caller may send its next request."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1.0 / self.rate
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+
+    def on_success(self):
+        """Record a successful response (additive increase)."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttled(self, retry_after: Optional[float] = None):
+        """
+        Record an HTTP 429 (multiplicative decrease).
+
+        Args:
+            retry_after: Seconds from the Retry-After header, if any
+        """
+        with self._lock:
+            self.throttled_count += 1
+            now = time.monotonic()
+            if now - self._last_decrease >= 1.0:
+                self._last_decrease = now
+                self.rate = max(self.min_rate, self.rate / 2)
+            pause = retry_after if retry_after is not None else 1.0 / self.rate
+            self._next_slot = max(self._next_slot, now + pause)
+
+
+class PositionStore:
+    """
+    SQLite store of previously scraped positions for incremental runs.
+    
+    One row per position id with the list API's t_update, a hash of the
+    list API fields, open/closed status and the last full position record
+    (including parsed detail fields). Only the main thread touches the
+    connection.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS positions (
+            id INTEGER PRIMARY KEY,
+            t_update INTEGER,
+            content_hash TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'open',
+            has_details INTEGER NOT NULL DEFAULT 0,
+            first_seen TEXT NOT NULL,
+            last_seen TEXT NOT NULL,
+            closed_at TEXT,
+            data TEXT NOT NULL
+        )
+    """
+    
+    def __init__(self, path: str):
+        """
+        Open (or create) the store.
+        
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute(self.SCHEMA)
+        self.conn.commit()
+    
+    @staticmethod
+    def content_hash(pos: Dict[str, Any]) -> str:
+        """
+        Hash the list API fields of a position (detail fields excluded).
+        
+        Args:
+            pos: Position dict
+        
+        Returns:
+            Hex digest that changes whenever any list field changes
+        """
+        fields = {key: value for key, value in pos.items() if key not in DETAIL_FIELDS}
+        payload = json.dumps(fields, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+    
+    def load(self) -> Dict[int, sqlite3.Row]:
+        """Return all stored rows keyed by position id."""
+        return {row['id']: row for row in self.conn.execute("SELECT * FROM positions")}
+    
+    def compare(self, positions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Classify listed positions against the stored ones.
+        
+        A position is "changed" when its t_update or content hash differs
+        from the stored row; "reopened" when a closed row is listed again.
+        
+        Args:
+            positions: Positions from the list API
+        
+        Returns:
+            Dict with lists "new", "changed", "reopened", "unchanged"
+            (position dicts), "closed" (stored rows no longer listed)
+            and "stored" (all stored rows keyed by id)
+        """
+        stored = self.load()
+        delta = {'new': [], 'changed': [], 'reopened': [], 'unchanged': [], 'closed': [], 'stored': stored}
+        listed_ids = set()
+        
+        for pos in positions:
+            pos_id = pos['id']
+            listed_ids.add(pos_id)
+            row = stored.get(pos_id)
+            if row is None:
+                delta['new'].append(pos)
+            elif row['t_update'] != pos.get('t_update') or row['content_hash'] != self.content_hash(pos):
+                delta['changed'].append(pos)
+            elif row['status'] == 'closed':
+                delta['reopened'].append(pos)
+            else:
+                delta['unchanged'].append(pos)
+        
+        delta['closed'] = [
+            row for pos_id, row in stored.items()
+            if row['status'] == 'open' and pos_id not in listed_ids
+        ]
+        return delta
+    
+    def save(self, positions: List[Dict[str, Any]], closed_ids: List[int], scraped_at: str):
+        """
+        Upsert listed positions and mark removed ones closed, in one transaction.
+        
+        Args:
+            positions: All listed positions (with detail fields when fetched)
+            closed_ids: Ids of stored positions no longer listed
+            scraped_at: ISO timestamp of this run
+        """
+        rows = [
+            (
+                pos['id'],
+                pos.get('t_update'),
+                self.content_hash(pos),
+                int('detail_company' in pos),
+                scraped_at,
+                scraped_at,
+                json.dumps(pos, ensure_ascii=False, default=str),
+            )
+            for pos in positions
+        ]
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO positions (id, t_update, content_hash, has_details, first_seen, last_seen, data)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    t_update = excluded.t_update,
+                    content_hash = excluded.content_hash,
+                    status = 'open',
+                    has_details = excluded.has_details,
+                    last_seen = excluded.last_seen,
+                    closed_at = NULL,
+                    data = excluded.data
+                """,
+                rows
+            )
+            self.conn.executemany(
+                "UPDATE positions SET status = 'closed', closed_at = ? WHERE id = ?",
+                [(scraped_at, pos_id) for pos_id in closed_ids]
+            )
+    
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
+
 
 class QualcommCareersScraper:
     """
@@ -38,17 +343,31 @@ class QualcommCareersScraper:
     No authentication required - public API.
     """
     
-    def __init__(self, verbose: bool = True):
+    def __init__(self, verbose: bool = True, max_workers: int = 8, max_retries: int = 3,
+                 description_dir: Optional[str] = None, max_rate: float = 20.0):
         """
         Initialize the scraper.
         
         Args:
             verbose: Whether to print progress messages
+            max_workers: Number of concurrent list/detail requests
+            max_retries: Retries per request on 429/5xx/network errors
+            description_dir: If set, save each raw job_description HTML here
+                             (corpus for benchmark_parse_job_description.py)
+            max_rate: Request budget in requests/second shared by all workers
         """
         self.base_url = "https://careers.qualcomm.com/api/apply/v2/jobs"
         self.domain = "qualcomm.com"
         self.session = requests.Session()
         self.verbose = verbose
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max_retries
+        self.description_dir = description_dir
+        self.rate_limiter = AdaptiveRateLimiter(initial_rate=min(5.0, max_rate), max_rate=max_rate)
+        
+        # Connection pool sized for the worker threads
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self.session.mount("https://", adapter)
         
         # Standard browser headers
         self.headers = {
@@ -65,6 +384,9 @@ class QualcommCareersScraper:
         self.all_positions = []
         self.all_departments = set()
         self.failed_requests = 0
+        self.total_count = 0
+        self.list_complete = False
+        self._stats_lock = threading.Lock()
     
     def log(self, message: str):
         """Print message if verbose mode is enabled."""
@@ -83,19 +405,7 @@ class QualcommCareersScraper:
             JSON response containing job listings
         """
         url = f"{self.base_url}?domain={self.domain}&start={start}&num={limit}&sort_by=relevance"
-        
-        try:
-            response = self.session.get(url, timeout=30)
-            if response.status_code == 200:
-                return response.json()
-            else:
-                self.log(f"   [ERROR] HTTP {response.status_code}")
-                self.failed_requests += 1
-                return {}
-        except requests.exceptions.RequestException as e:
-            self.log(f"   [ERROR] Request failed: {str(e)}")
-            self.failed_requests += 1
-            return {}
+        return self.get_json_with_retry(url)
     
     def fetch_job_detail(self, position_id: int) -> Dict[str, Any]:
         """
@@ -108,17 +418,61 @@ class QualcommCareersScraper:
             JSON response containing job details
         """
         url = f"{self.base_url}/{position_id}?domain={self.domain}"
+        return self.get_json_with_retry(url)
+    
+    def record_failure(self):
+        """Increment the failed request counter (thread-safe)."""
+        with self._stats_lock:
+            self.failed_requests += 1
+    
+    def get_json_with_retry(self, url: str) -> Dict[str, Any]:
+        """
+        GET a JSON endpoint through the shared rate limiter.
         
-        try:
-            response = self.session.get(url, timeout=30)
+        HTTP 429, 5xx and network errors are retried with exponential
+        backoff (honoring Retry-After); other HTTP errors are not retried.
+        
+        Args:
+            url: Full request URL
+        
+        Returns:
+            Parsed JSON response, or {} after the final failure
+        """
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt > 0:
+                backoff = min(30.0, 2 ** attempt) * random.uniform(0.5, 1.0)
+                time.sleep(backoff)
+            
+            self.rate_limiter.acquire()
+            try:
+                response = self.session.get(url, timeout=30)
+            except requests.exceptions.RequestException as e:
+                last_error = f"Request failed: {str(e)}"
+                continue
+            
             if response.status_code == 200:
-                return response.json()
-            else:
-                self.failed_requests += 1
-                return {}
-        except requests.exceptions.RequestException as e:
-            self.failed_requests += 1
-            return {}
+                self.rate_limiter.on_success()
+                try:
+                    return response.json()
+                except ValueError as e:
+                    last_error = f"Invalid JSON: {str(e)}"
+                    continue
+            
+            last_error = f"HTTP {response.status_code}"
+            if response.status_code == 429:
+                retry_after = response.headers.get('Retry-After')
+                try:
+                    retry_after = float(retry_after) if retry_after else None
+                except ValueError:
+                    retry_after = None
+                self.rate_limiter.on_throttled(retry_after)
+            elif response.status_code < 500:
+                break
+        
+        self.log(f"   [ERROR] {last_error}: {url}")
+        self.record_failure()
+        return {}
     
     def clean_html(self, html: str) -> str:
         """
@@ -133,11 +487,11 @@ class QualcommCareersScraper:
         if not html:
             return ""
         # Remove HTML tags
-        text = re.sub(r'<[^>]+>', ' ', html)
+        text = _TAG_RE.sub(' ', html)
         # Decode HTML entities
         text = unescape(text)
         # Clean up whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = _WHITESPACE_RE.sub(' ', text).strip()
         return text
     
     def extract_section(self, html: str, start_pattern: str, end_patterns: List[str]) -> str:
@@ -162,16 +516,57 @@ class QualcommCareersScraper:
         
         start_pos = start_match.end()
         
-        # Find end position (next section)
+        # Find end position (next section), searching in place instead of
+        # on a copied html[start_pos:] slice
         end_pos = len(html)
         for end_pattern in end_patterns:
-            end_match = re.search(end_pattern, html[start_pos:], re.IGNORECASE | re.DOTALL)
+            end_match = re.compile(end_pattern, re.IGNORECASE | re.DOTALL).search(html, start_pos)
             if end_match:
-                end_pos = min(end_pos, start_pos + end_match.start())
+                end_pos = min(end_pos, end_match.start())
         
         section_html = html[start_pos:end_pos]
         return self.clean_html(section_html)
     
+    def find_section_boundaries(self, html: str) -> List[int]:
+        """
+        Find every position where a section marker matches, in one scan.
+        
+        A single pass of the combined marker tokenizer collects opening tags,
+        keyword occurrences and literal markers. A "<tag ...>.*?keyword"
+        marker matches at a tag if the keyword's last occurrence starts at or
+        after the end of that tag.
+        
+        Args:
+            html: Full HTML content
+        
+        Returns:
+            Sorted list of boundary offsets (same positions as searching
+            every pattern in SECTION_MARKERS)
+        """
+        boundaries = []
+        tags = {tag: [] for tag in _MARKER_TAGS}
+        last_keyword = [-1] * len(_MARKER_KEYWORDS)
+        
+        for match in _SECTION_TOKEN_RE.finditer(html):
+            group = match.lastgroup
+            if group.startswith('lit'):
+                boundaries.append(match.start())
+            elif group.startswith('tag_'):
+                tags[group[4:]].append((match.start(), match.end(group)))
+            else:
+                last_keyword[int(group[2:])] = match.start()
+        
+        # Latest keyword occurrence per tag: a tag is a boundary if any of its
+        # keywords still occurs after the tag ends
+        latest = {tag: -1 for tag in _MARKER_TAGS}
+        for (tag, _), position in zip(_TAG_KEYWORD_MARKERS, last_keyword):
+            latest[tag] = max(latest[tag], position)
+        for tag, spans in tags.items():
+            boundaries.extend(start for start, end in spans if latest[tag] >= end)
+        
+        boundaries.sort()
+        return boundaries
+    
     def parse_job_description(self, html: str) -> Dict[str, str]:
         """
         Parse job_description HTML and extract structured sections.
@@ -185,80 +580,32 @@ class QualcommCareersScraper:
         - Preferred Qualifications
         - Educational Requirements
         
+        Section boundaries are found in a single pass; each section then
+        ends at the first boundary at or after its start. The result is the
+        same as calling extract_section() with SECTION_MARKERS per section.
+        
         Args:
             html: The job_description HTML from the API
         
         Returns:
             Dictionary with extracted sections
         """
-        result = {
-            'company': '',
-            'job_area': '',
-            'general_summary': '',
-            'responsibilities': '',
-            'minimum_qualifications': '',
-            'preferred_qualifications': '',
-            'educational_requirements': '',
-        }
+        result = {key: '' for key in SECTION_START_PATTERNS}
         
         if not html:
             return result
         
-        # Section markers used to detect end of each section
-        section_markers = [
-            r'<h2[^>]*>.*?Company',
-            r'<h2[^>]*>.*?Job Area',
-            r'<[ub]><b>General Summary',
-            r'<b[^>]*>.*?Job responsibilities',
-            r'<b[^>]*>.*?Minimum Qualifications',
-            r'<b[^>]*>.*?Preferred Qualifications',
-            r'<b[^>]*>.*?Educational Requirements',
-            r'<b[^>]*>.*?To all Staffing',
-            r'Qualcomm is an equal opportunity',
-        ]
-        
-        # Extract each section
-        result['company'] = self.extract_section(
-            html,
-            r'<h2[^>]*>.*?<b>Company:?</b>.*?</h2>',
-            section_markers
-        )
-        
-        result['job_area'] = self.extract_section(
-            html,
-            r'<h2[^>]*>.*?<b>Job Area:?</b>.*?</h2>',
-            section_markers
-        )
-        
-        result['general_summary'] = self.extract_section(
-            html,
-            r'<[ub]><b>General Summary:?</b></[ub]>',
-            section_markers
-        )
-        
-        result['responsibilities'] = self.extract_section(
-            html,
-            r'<b[^>]*>.*?Job responsibilities.*?:?</b>',
-            section_markers
-        )
-        
-        result['minimum_qualifications'] = self.extract_section(
-            html,
-            r'<[ub]><b>Minimum Qualifications:?</b></[ub]>',
-            section_markers
-        )
+        boundaries = self.find_section_boundaries(html)
+        html_length = len(html)
         
-        result['preferred_qualifications'] = self.extract_section(
-            html,
-            r'<b[^>]*>Preferred Qualifications:?</b>',
-            section_markers
-        )
-        
-        result['educational_requirements'] = self.extract_section(
-            html,
-            r'<b[^>]*>Educational Requirements:?</b>',
-            section_markers
-        )
+        for key, start_re in SECTION_START_PATTERNS.items():
+            start_match = start_re.search(html)
+            if not start_match:
+                continue
+            start_pos = start_match.end()
+            index = bisect_left(boundaries, start_pos)
+            end_pos = boundaries[index] if index < len(boundaries) else html_length
+            result[key] = self.clean_html(html[start_pos:end_pos])
         
         return result
     
@@ -275,68 +622,73 @@ class QualcommCareersScraper:
             self.log("   [ERROR] Failed to get data")
             return 0
         total = data.get('count', 0)
+        self.total_count = total
         self.log(f"   [OK] Total jobs: {total}")
         return total
     
-    def scrape_job_list(self) -> List[Dict]:
+    def scrape_job_list(self, page_size: int = 50) -> List[Dict]:
         """
         Scrape all job listings (basic info only).
         
+        The total count is known up front, so every page offset is requested
+        concurrently through the shared rate limiter. Each page gets the
+        bounded retries of get_json_with_retry(); pages that still fail make
+        the listing incomplete (list_complete = False) instead of blocking.
+        Pages are merged in offset order and deduplicated by position id.
+        
+        Args:
+            page_size: Jobs per list API request
+        
         Returns:
             List of job positions
         """
         total_count = self.get_total_count()
         if total_count == 0:
+            self.list_complete = False
             return []
         
-        self.log(f"\n[Step 2] Scraping {total_count} job listings...")
+        offsets = list(range(0, total_count, page_size))
+        self.log(f"\n[Step 2] Scraping {total_count} job listings "
+                 f"({len(offsets)} pages, {self.max_workers} workers)...")
         
-        batch_size = 50
-        start = 0
-        seen_ids = set()
-        batch_num = 1
-        
-        while start < total_count:
-            remaining = total_count - start
-            current_batch = min(batch_size, remaining)
-            
-            self.log(f"   Batch {batch_num} (jobs {start+1}-{start+current_batch})...", )
-            
-            data = self.fetch_jobs(start=start, limit=batch_size)
-            
-            if not data:
-                self.log("   Retrying...")
-                time.sleep(2)
-                continue
-            
-            positions = data.get('positions', [])
-            
-            if not positions:
-                self.log("   No more data")
-                break
-            
-            new_count = 0
-            for pos in positions:
+        pages = {}
+        failed_offsets = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self.fetch_jobs, start, page_size): start
+                for start in offsets
+            }
+            for future in as_completed(futures):
+                start = futures[future]
+                data = future.result()
+                if not data:
+                    failed_offsets.append(start)
+                    self.log(f"   [ERROR] Page jobs {start+1}-{start+page_size} failed")
+                    continue
+                pages[start] = data.get('positions', [])
+                if len(pages) % 10 == 0 or len(pages) + len(failed_offsets) == len(offsets):
+                    self.log(f"   Pages: {len(pages)}/{len(offsets)}")
+        
+        seen_ids = {pos.get('id') for pos in self.all_positions}
+        for start in sorted(pages):
+            for pos in pages[start]:
                 pos_id = pos.get('id')
                 if pos_id and pos_id not in seen_ids:
                     seen_ids.add(pos_id)
                     self.all_positions.append(pos)
-                    new_count += 1
                     
                     dept = pos.get('department')
                     if dept:
                         self.all_departments.add(dept)
-            
-            self.log(f"   [OK] Added {new_count}, Total: {len(self.all_positions)}")
-            
-            start += len(positions)
-            batch_num += 1
-            time.sleep(0.3)  # Rate limiting
         
+        self.list_complete = not failed_offsets
+        if failed_offsets:
+            self.log(f"   [WARN] {len(failed_offsets)} pages failed after retries, listing is incomplete")
         self.log(f"\n   [DONE] List scraping complete: {len(self.all_positions)} jobs")
         return self.all_positions
     
-    def scrape_job_details(self, limit: Optional[int] = None) -> None:
+    def scrape_job_details(self, limit: Optional[int] = None,
+                           positions: Optional[List[Dict]] = None) -> None:
         """
         Scrape detailed information for each job.
         
@@ -345,42 +697,195 @@ class QualcommCareersScraper:
         
         Args:
             limit: Maximum number of details to fetch (for testing)
+            positions: Positions to fetch (default: all listed positions)
         """
-        total = len(self.all_positions)
+        if positions is None:
+            positions = self.all_positions
+        total = len(positions)
         if limit:
             total = min(total, limit)
         
-        self.log(f"\n[Step 3] Scraping details for {total} jobs...")
-        self.log("   (This may take several minutes)")
+        self.log(f"\n[Step 3] Scraping details for {total} jobs ({self.max_workers} workers)...")
         
-        for i, pos in enumerate(self.all_positions[:total]):
-            pos_id = pos.get('id')
-            if not pos_id:
-                continue
-            
-            # Progress update every 50 jobs
-            if (i + 1) % 50 == 0 or i == 0:
-                self.log(f"   Progress: {i+1}/{total} ({(i+1)/total*100:.1f}%)")
-            
-            detail = self.fetch_job_detail(pos_id)
-            
-            if detail:
-                job_desc = detail.get('job_description', '')
-                parsed = self.parse_job_description(job_desc)
-                
-                # Add parsed fields to position data
-                pos['detail_company'] = parsed['company']
-                pos['detail_job_area'] = parsed['job_area']
-                pos['general_summary'] = parsed['general_summary']
-                pos['responsibilities'] = parsed['responsibilities']
-                pos['minimum_qualifications'] = parsed['minimum_qualifications']
-                pos['preferred_qualifications'] = parsed['preferred_qualifications']
-                pos['educational_requirements'] = parsed['educational_requirements']
-            
-            time.sleep(0.2)  # Rate limiting
+        positions = [pos for pos in positions[:total] if pos.get('id')]
+        if not positions:
+            self.log(f"   [DONE] Detail scraping complete")
+            return
+        
+        start_time = time.monotonic()
+        last_report = start_time
+        done = 0
         
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self.fetch_job_detail, pos['id']): pos
+                for pos in positions
+            }
+            for future in as_completed(futures):
+                pos = futures[future]
+                detail = future.result()
+                done += 1
+                
+                if detail:
+                    self.apply_job_detail(pos, detail)
+                
+                # Progress update every 50 jobs or 10 seconds
+                now = time.monotonic()
+                if done == 1 or done % 50 == 0 or done == len(positions) or now - last_report >= 10:
+                    last_report = now
+                    elapsed = now - start_time
+                    speed = done / elapsed if elapsed > 0 else 0
+                    eta = (len(positions) - done) / speed if speed > 0 else 0
+                    self.log(
+                        f"   Progress: {done}/{len(positions)} ({done/len(positions)*100:.1f}%) "
+                        f"- {speed:.1f} jobs/s, ETA {eta:.0f}s, "
+                        f"rate limit {self.rate_limiter.rate:.1f} req/s, failed {self.failed_requests}"
+                    )
+        
+        if self.rate_limiter.throttled_count:
+            self.log(f"   [WARN] Server throttled {self.rate_limiter.throttled_count} requests (HTTP 429)")
         self.log(f"   [DONE] Detail scraping complete")
     
+    def apply_job_detail(self, pos: Dict[str, Any], detail: Dict[str, Any]) -> None:
+        """
+        Parse a detail API response and add its sections to a position.
+        
+        Args:
+            pos: Position dict from the list API (updated in place)
+            detail: JSON response from the detail API
+        """
+        job_desc = detail.get('job_description', '')
+        parsed = self.parse_job_description(job_desc)
+        
+        if self.description_dir and job_desc:
+            os.makedirs(self.description_dir, exist_ok=True)
+            path = os.path.join(self.description_dir, f"{pos.get('id')}.html")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(job_desc)
+        
+        # Add parsed fields to position data
+        pos['detail_company'] = parsed['company']
+        pos['detail_job_area'] = parsed['job_area']
+        pos['general_summary'] = parsed['general_summary']
+        pos['responsibilities'] = parsed['responsibilities']
+        pos['minimum_qualifications'] = parsed['minimum_qualifications']
+        pos['preferred_qualifications'] = parsed['preferred_qualifications']
+        pos['educational_requirements'] = parsed['educational_requirements']
+    
+    def scrape_incremental(self, store: PositionStore, fetch_details: bool = True,
+                           detail_limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        List all positions and fetch details only for new or changed ones.
+        
+        Unchanged positions reuse the detail fields stored by a previous run.
+        Stored positions missing from the list are marked closed, but only
+        when the listing completed; a partial listing must not close jobs.
+        
+        Args:
+            store: Position store from previous runs
+            fetch_details: Whether to fetch detail pages
+            detail_limit: Limit number of details to fetch (for testing)
+        
+        Returns:
+            Change report (see build_change_report)
+        """
+        self.scrape_job_list()
+        scraped_at = datetime.now().isoformat()
+        
+        listed = [pos for pos in self.all_positions if pos.get('id')]
+        delta = store.compare(listed)
+        stored = delta['stored']
+        
+        # Carry over details of positions whose list data did not change
+        needs_detail = delta['new'] + delta['changed']
+        for pos in delta['unchanged'] + delta['reopened']:
+            row = stored[pos['id']]
+            if row['has_details']:
+                previous = json.loads(row['data'])
+                for field in DETAIL_FIELDS:
+                    pos[field] = previous.get(field, '')
+            else:
+                needs_detail.append(pos)
+        
+        self.log(
+            f"\n[Delta] {len(delta['new'])} new, {len(delta['changed'])} changed, "
+            f"{len(delta['reopened'])} reopened, {len(delta['unchanged'])} unchanged, "
+            f"{len(delta['closed'])} removed ({store.path})"
+        )
+        
+        if fetch_details:
+            self.scrape_job_details(limit=detail_limit, positions=needs_detail)
+        
+        closed = delta['closed']
+        if closed and not self.list_complete:
+            self.log(f"   [WARN] Listing incomplete, not closing {len(closed)} missing positions")
+            closed = []
+        store.save(listed, [row['id'] for row in closed], scraped_at)
+        
+        delta['closed'] = closed
+        return self.build_change_report(delta, scraped_at)
+    
+    def build_change_report(self, delta: Dict[str, Any], scraped_at: str) -> Dict[str, Any]:
+        """
+        Summarize a store comparison for humans and downstream jobs.
+        
+        Args:
+            delta: Result of PositionStore.compare() (closed rows filtered)
+            scraped_at: ISO timestamp of this run
+        
+        Returns:
+            Dict with counts and a short record per new/changed/reopened/closed job
+        """
+        def summary(pos: Dict[str, Any]) -> Dict[str, Any]:
+            return {
+                'position_id': pos.get('id'),
+                'job_id': pos.get('ats_job_id') or pos.get('display_job_id'),
+                'title': pos.get('name'),
+                'department': pos.get('department'),
+                'location': pos.get('location'),
+                'url': pos.get('canonicalPositionUrl'),
+            }
+        
+        closed = [json.loads(row['data']) for row in delta['closed']]
+        return {
+            'scraped_at': scraped_at,
+            'list_complete': self.list_complete,
+            'counts': {
+                'open': len(self.all_positions),
+                'new': len(delta['new']),
+                'changed': len(delta['changed']),
+                'reopened': len(delta['reopened']),
+                'unchanged': len(delta['unchanged']),
+                'closed': len(closed),
+            },
+            'new': [summary(pos) for pos in delta['new']],
+            'changed': [summary(pos) for pos in delta['changed']],
+            'reopened': [summary(pos) for pos in delta['reopened']],
+            'closed': [summary(pos) for pos in closed],
+        }
+    
+    def save_change_report(self, report: Dict[str, Any], filename: Optional[str] = None) -> str:
+        """
+        Save a change report to JSON.
+        
+        Args:
+            report: Result of scrape_incremental()
+            filename: Output filename (auto-generated if not provided)
+        
+        Returns:
+            Path to saved file
+        """
+        if filename is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"qualcomm_careers_changes_{timestamp}.json"
+        
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        
+        self.log(f"[OUTPUT] Change report saved: {filename}")
+        
+        return filename
+    
     def build_dataframe(self) -> pd.DataFrame:
         """
         Convert job data to pandas DataFrame.
@@ -491,6 +996,42 @@ class QualcommCareersScraper:
         
         return filename
     
+    def save_to_parquet(self, df: pd.DataFrame, root_dir: str,
+                        scrape_date: Optional[str] = None) -> str:
+        """
+        Save data to a date-partitioned Parquet dataset (requires pyarrow).
+        
+        Each run writes one file under root_dir/scrape_date=YYYY-MM-DD/,
+        so pd.read_parquet(root_dir) loads the whole history with a
+        scrape_date column. CATEGORICAL_COLUMNS are dictionary-encoded.
+        
+        Args:
+            df: DataFrame to save
+            root_dir: Dataset root directory
+            scrape_date: Partition date (default: today)
+        
+        Returns:
+            Path to saved file
+        """
+        if pa is None:
+            raise RuntimeError("Parquet output requires pyarrow: pip install pyarrow")
+        
+        now = datetime.now()
+        scrape_date = scrape_date or now.strftime("%Y-%m-%d")
+        directory = os.path.join(root_dir, f"scrape_date={scrape_date}")
+        os.makedirs(directory, exist_ok=True)
+        filename = os.path.join(directory, f"qualcomm_careers_{now.strftime('%H%M%S')}.parquet")
+        
+        columns = {
+            column: df[column].astype('string').astype('category')
+            for column in CATEGORICAL_COLUMNS if column in df.columns
+        }
+        table = pa.Table.from_pandas(df.assign(**columns), preserve_index=False)
+        pq.write_table(table, filename, compression='zstd')
+        self.log(f"[OUTPUT] Parquet saved: {filename}")
+        
+        return filename
+    
     def print_summary(self, df: pd.DataFrame):
         """Print summary statistics."""
         self.log("\n" + "="*60)
@@ -511,8 +1052,23 @@ class QualcommCareersScraper:
                 rate = filled.sum() / len(df) * 100
                 self.log(f"   {field}: {rate:.1f}%")
     
+    def print_change_summary(self, report: Dict[str, Any]):
+        """Print the change report of an incremental run."""
+        counts = report['counts']
+        self.log(f"\nChanges since last run:")
+        self.log(f"   New: {counts['new']}")
+        self.log(f"   Changed: {counts['changed']}")
+        self.log(f"   Reopened: {counts['reopened']}")
+        self.log(f"   Closed: {counts['closed']}")
+        self.log(f"   Unchanged: {counts['unchanged']}")
+        for key in ('new', 'closed'):
+            for job in report[key][:10]:
+                self.log(f"   [{key.upper()}] {job['job_id']} {job['title']} ({job['location']})")
+    
     def run(self, fetch_details: bool = True, detail_limit: Optional[int] = None, 
-            output_excel: Optional[str] = None, output_json: Optional[str] = None) -> pd.DataFrame:
+            output_excel: Optional[str] = None, output_json: Optional[str] = None,
+            state_db: Optional[str] = None, output_changes: Optional[str] = None,
+            output_parquet: Optional[str] = None) -> pd.DataFrame:
         """
         Run the complete scraping process.
         
@@ -521,6 +1077,10 @@ class QualcommCareersScraper:
             detail_limit: Limit number of details to fetch (for testing)
             output_excel: Custom Excel filename
             output_json: Custom JSON filename
+            state_db: SQLite file of previous runs; enables incremental mode
+                      (details only for new/changed jobs, plus a change report)
+            output_changes: Custom change report filename (incremental mode)
+            output_parquet: Also save a date-partitioned Parquet dataset here
         
         Returns:
             DataFrame with all scraped data
@@ -533,13 +1093,24 @@ class QualcommCareersScraper:
         self.log(f"Fetch Details: {'Yes' if fetch_details else 'No'}")
         if detail_limit:
             self.log(f"Detail Limit: {detail_limit}")
-        
-        # Step 1-2: Scrape job list
-        self.scrape_job_list()
-        
-        # Step 3: Scrape details (optional)
-        if fetch_details:
-            self.scrape_job_details(limit=detail_limit)
+        if state_db:
+            self.log(f"Incremental: {state_db}")
+        
+        change_report = None
+        if state_db:
+            # Step 1-3: Scrape job list, details only for new/changed jobs
+            store = PositionStore(state_db)
+            try:
+                change_report = self.scrape_incremental(store, fetch_details, detail_limit)
+            finally:
+                store.close()
+        else:
+            # Step 1-2: Scrape job list
+            self.scrape_job_list()
+            
+            # Step 3: Scrape details (optional)
+            if fetch_details:
+                self.scrape_job_details(limit=detail_limit)
         
         # Step 4: Build DataFrame
         df = self.build_dataframe()
@@ -547,9 +1118,15 @@ class QualcommCareersScraper:
         # Save outputs
         self.save_to_excel(df, output_excel)
         self.save_to_json(output_json)
+        if output_parquet:
+            self.save_to_parquet(df, output_parquet)
+        if change_report is not None:
+            self.save_change_report(change_report, output_changes)
         
         # Print summary
         self.print_summary(df)
+        if change_report is not None:
+            self.print_change_summary(change_report)
         
         self.log("\n" + "="*60)
         self.log("SCRAPING COMPLETE!")
@@ -574,6 +1151,9 @@ def main():
         
         # Custom output filename
         python qualcomm_careers_scraper.py --output my_output.xlsx
+        
+        # Daily incremental run (details only for new/changed jobs)
+        python qualcomm_careers_scraper.py --state-db qualcomm_careers.db
     """
     parser = argparse.ArgumentParser(
         description='Qualcomm Careers Scraper - Extract job listings from Qualcomm Careers website'
@@ -599,11 +1179,65 @@ def main():
         action='store_true',
         help='Quiet mode - suppress progress messages'
     )
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=8,
+        help='Number of concurrent list/detail requests (default: 8)'
+    )
+    parser.add_argument(
+        '--max-rate',
+        type=float,
+        default=20.0,
+        help='Maximum requests per second across all workers (default: 20)'
+    )
+    parser.add_argument(
+        '--max-retries',
+        type=int,
+        default=3,
+        help='Retries per request on HTTP 429/5xx or network errors (default: 3)'
+    )
+    parser.add_argument(
+        '--save-descriptions',
+        type=str,
+        default=None,
+        metavar='DIR',
+        help='Save raw job_description HTML files to DIR (benchmark corpus)'
+    )
+    parser.add_argument(
+        '--state-db',
+        type=str,
+        default=None,
+        metavar='FILE',
+        help='SQLite state of previous runs; only fetch details for new/changed jobs and write a change report'
+    )
+    parser.add_argument(
+        '--parquet',
+        type=str,
+        default=None,
+        metavar='DIR',
+        help='Also save a Parquet dataset partitioned by scrape date to DIR (requires pyarrow)'
+    )
+    parser.add_argument(
+        '--changes-output',
+        type=str,
+        default=None,
+        help='Change report JSON filename (default: auto-generated with timestamp)'
+    )
     
     args = parser.parse_args()
     
+    if args.parquet and pa is None:
+        parser.error("--parquet requires pyarrow: pip install pyarrow")
+    
     # Create scraper
-    scraper = QualcommCareersScraper(verbose=not args.quiet)
+    scraper = QualcommCareersScraper(
+        verbose=not args.quiet,
+        max_workers=args.workers,
+        max_retries=args.max_retries,
+        description_dir=args.save_descriptions,
+        max_rate=args.max_rate
+    )
     
     # Determine settings
     fetch_details = not args.no_details
@@ -613,7 +1247,10 @@ def main():
     df = scraper.run(
         fetch_details=fetch_details,
         detail_limit=detail_limit,
-        output_excel=args.output
+        output_excel=args.output,
+        state_db=args.state_db,
+        output_changes=args.changes_output,
+        output_parquet=args.parquet
     )
     
     return df
@@ -6,36 +6,13 @@
 python3 test-complete-workflow.py
 """
 
-from urllib.parse import urlparse, parse_qs, unquote
-from typing import Optional
+from parser_core.google_url import decode_google_url
 import time
 
 # ============================================================
 # 第一步：測試 Google URL 解碼功能（不需要伺服器）
 # ============================================================
 
-def decode_google_url(google_url: str) -> Optional[str]:
-    """從 Google 重定向 URL 中提取真實的目標 URL"""
-    try:
-        parsed = urlparse(google_url)
-        
-        if 'google.com' not in parsed.netloc:
-            return google_url
-        
-        query_params = parse_qs(parsed.query)
-        
-        for param in ['url', 'q', 'u']:
-            if param in query_params and query_params[param]:
-                decoded_url = unquote(query_params[param][0])
-                if decoded_url.startswith(('http://', 'https://')):
-                    return decoded_url
-        
-        return google_url
-        
-    except Exception as e:
-        return google_url
-
-
 def test_decode_all_urls():
     """測試所有 URL 的解碼"""
     print("=" * 80)
@@ -2,41 +2,7 @@
 直接測試 Google URL 解碼函數（不需要啟動伺服器）
 """
 
-from urllib.parse import urlparse, parse_qs, unquote
-from typing import Optional
-
-
-def decode_google_url(google_url: str) -> Optional[str]:
-    """
-    從 Google 重定向 URL 中提取真實的目標 URL
-    """
-    try:
-        # 解析 URL
-        parsed = urlparse(google_url)
-        
-        # 檢查是否為 Google URL
-        if 'google.com' not in parsed.netloc:
-            # 不是 Google URL，直接返回原 URL
-            return google_url
-        
-        # 解析查詢參數
-        query_params = parse_qs(parsed.query)
-        
-        # 嘗試從不同的參數中提取 URL
-        # 常見參數：url, q, u
-        for param in ['url', 'q', 'u']:
-            if param in query_params and query_params[param]:
-                decoded_url = unquote(query_params[param][0])
-                # 確保是完整的 URL
-                if decoded_url.startswith(('http://', 'https://')):
-                    return decoded_url
-        
-        # 如果沒有找到，返回原 URL
-        return google_url
-        
-    except Exception as e:
-        # 解析失敗，返回原 URL
-        return google_url
+from parser_core.google_url import decode_google_url
 
 
 def test_decode():
@@ -71,6 +37,11 @@ def test_decode():
             "input": "https://technews.tw/2025/10/31/tsmc-news/",
             "expected": "https://technews.tw/2025/10/31/tsmc-news/"
         },
+        {
+            "name": "Google News RSS 文章 ID（離線解碼）",
+            "input": "https://news.google.com/rss/articles/CBMiKWh0dHBzOi8vdGVjaG5ld3MudHcvMjAyNS8xMC8zMS90c21jLW5ld3Mv0gEA?oc=5",
+            "expected": "https://technews.tw/2025/10/31/tsmc-news/"
+        },
         {
             "name": "台積電相關新聞",
             "input": "https://www.google.com/url?url=https://www.bnext.com.tw/article/80198/tsmc-2024",
@@ -0,0 +1,107 @@
+"""
+直接測試 feed 匯入（不需要啟動伺服器、不連網）
+
+feed 以 httpx.MockTransport 回應（第二次起依 ETag 回 304），文章解析以假的 parse() 取代。
+檢查超過 max_items 的文章會留到下一次匯入（feed 回 304 時也不會遺失）。
+
+使用方法：
+python test-feed-ingest.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+import httpx
+
+import parser_core.feeds as feeds
+from parser_core.feeds import FeedStore, ingest
+
+FEED_URL = "https://news.example.com/rss.xml"
+ETAG = '"v1"'
+ARTICLE_URLS = [f"https://news.example.com/article/{i}" for i in range(4)] + [
+    "https://www.reuters.com/world/article-4/",  # 黑名單網域：使用 feed 摘要
+]
+RSS = (
+    '<?xml version="1.0"?><rss version="2.0"><channel><title>Example</title>'
+    + "".join(
+        f"<item><title>Article {i}</title><link>{url}</link><guid>guid-{i}</guid>"
+        f"<description>Summary {i}</description></item>"
+        for i, url in enumerate(ARTICLE_URLS)
+    )
+    + "</channel></rss>"
+).encode("utf-8")
+
+
+def feed_handler(request: httpx.Request) -> httpx.Response:
+    if request.headers.get("if-none-match") == ETAG:
+        return httpx.Response(304)
+    return httpx.Response(200, content=RSS, headers={"content-type": "application/rss+xml", "etag": ETAG})
+
+
+class FakeResult:
+    def __init__(self, url: str):
+        self.url = url
+
+    def to_dict(self):
+        return {"success": True, "data": {"url": self.url}, "routing_decision": "static"}
+
+
+async def fake_parse(url, options=None, **kwargs):
+    return FakeResult(url)
+
+
+async def run_ingest(store: FeedStore):
+    result = await ingest([FEED_URL], store, max_items=2, concurrency=2)
+    return result["feeds"][0]["status"], result["stats"], result["articles"]
+
+
+def test_deferred_entries():
+    """max_items=2、5 篇文章：3 次匯入處理完全部，第 4 次沒有新文章"""
+    print("=" * 80)
+    print("🧪 測試 feed 匯入：超過上限的文章留到下一次")
+    print("=" * 80)
+
+    feeds.httpx_transport = lambda: httpx.MockTransport(feed_handler)
+    feeds.parse = fake_parse
+
+    expected = [
+        ("ok", 2, 3),
+        ("not_modified", 2, 1),
+        ("not_modified", 1, 0),
+        ("not_modified", 0, 0),
+    ]
+    processed = []
+    fail_count = 0
+    with tempfile.TemporaryDirectory() as directory:
+        store = FeedStore(path=os.path.join(directory, "feed-state.sqlite3"))
+        for run, (status, new, deferred) in enumerate(expected, 1):
+            actual_status, stats, articles = asyncio.run(run_ingest(store))
+            processed.extend(article["url"] for article in articles)
+            ok = (actual_status, stats["new"], stats["deferred"]) == (status, new, deferred)
+            fail_count += not ok
+            print(f"{'✅' if ok else '❌'} 第 {run} 次: {actual_status}, 新文章 {stats['new']}, 留到下一次 {stats['deferred']}"
+                  f"（預期 {status}, {new}, {deferred}）")
+
+        summaries = [article for article in processed if "reuters" in article]
+        store_stats = store.stats()
+        store.close()
+
+    ok = sorted(processed) == sorted(ARTICLE_URLS)
+    fail_count += not ok
+    print(f"{'✅' if ok else '❌'} 每篇文章剛好處理一次: {len(processed)} / {len(ARTICLE_URLS)}")
+    ok = store_stats.get("pending") == 0 and store_stats.get("feed_summaries") == len(summaries) == 1
+    fail_count += not ok
+    print(f"{'✅' if ok else '❌'} pending 已清空、黑名單文章使用 feed 摘要: {store_stats}")
+
+    print("=" * 80)
+    if fail_count == 0:
+        print("🎉 所有測試通過！")
+    else:
+        print(f"⚠️ 有 {fail_count} 個測試失敗")
+    return fail_count == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if test_deferred_entries() else 1)